@@ -0,0 +1,110 @@
+"""
+Compares the memory and time needed to read vacations as tuples converted to plain dataclasses by hand,
+against reading them straight into slotted VacationDTOs with a psycopg row factory.
+
+The target database is reset and filled with generated vacations, so never point it at a database whose
+data matters.
+
+Usage:
+    python -m benchmarks.row_mapping --dsn "<connection details>" --rows 100000 [--output row_mapping.json]
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import datetime
+import gc
+import json
+import time
+import tracemalloc
+
+
+from benchmarks.run_benchmarks import reset_database, seed_vacations
+from src import config
+from src.dal.DAO.vacations_dao import VacationsDAO
+
+
+@dataclass
+class PlainVacationDTO:
+    """
+    VacationDTO as it was before it became slotted and frozen, each instance carrying a __dict__.
+    """
+    vacation_id: str
+    country_id: str
+    vacation_description: str
+    vacation_beginning_date: datetime.date
+    vacation_end_date: datetime.date
+    vacation_price: int
+    vacation_image_filename: str
+
+
+def measure(load: Callable[[], List[Any]], rounds: int = 3) -> Dict[str, float]:
+    """
+    Measures the best wall time of a load over a few rounds, then its peak allocation and the memory its
+    result retains in a separate traced round, as tracing slows allocations down.
+
+    Args:
+        load (Callable[[], List[Any]]): Reads the vacations and returns them.
+        rounds (int): The number of timed rounds.
+
+    Returns:
+        Dict[str, float]: 'seconds', 'peak_mb' and 'retained_mb'.
+    """
+    seconds = float('inf')
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        result = load()
+        seconds = min(seconds, time.perf_counter() - start)
+        del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {'seconds': seconds, 'peak_mb': peak / 2 ** 20, 'retained_mb': retained / 2 ** 20}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Seeds the vacations, measures both ways of reading them and prints and saves the comparison.
+
+    Returns:
+        int: The process exit code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dsn', default=config.settings.db_config_tests, help='connection details of a throwaway database; it is wiped')
+    parser.add_argument('--rows', type=int, default=100000, help='number of vacations to read')
+    parser.add_argument('--output', help='where to write the JSON results')
+    args = parser.parse_args(argv)
+
+    reset_database(args.dsn)
+    seed_vacations(args.dsn, args.rows)
+    dao = VacationsDAO(args.dsn)
+    query = f'SELECT {", ".join(dao.columns)} FROM {dao.table_name};'
+
+    def tuples_then_dataclasses() -> List[Any]:
+        rows = dao.base_connect_and_change_table(query)
+        return [PlainVacationDTO(*row) for row in rows]
+
+    def slotted_dtos() -> List[Any]:
+        return dao.base_connect_and_change_table(query, row_factory=dao.row_factory)
+
+    results = {
+        'rows': args.rows,
+        'tuples_then_dataclasses': measure(tuples_then_dataclasses),
+        'slotted_dtos': measure(slotted_dtos),
+    }
+    for name in ('tuples_then_dataclasses', 'slotted_dtos'):
+        result = results[name]
+        print(f"{name:24} {result['seconds']:7.3f}s  peak {result['peak_mb']:8.1f}MB  "
+              f"retained {result['retained_mb']:8.1f}MB")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,445 @@
+"""
+Benchmarks the DAO and facade hot paths against a local throwaway Postgres database.
+
+The schema of the target database is dropped, recreated with the migrations and filled with the test data
+of src/init_test_database.sql and a generated dataset, so never point it at a database whose data matters.
+
+Besides the hot path scenarios, a run measures the validation throughput of --validation-rows generated
+users and vacations in rows per second, the time and WAL of syncing a --resync-rows vacation catalogue and
+of sending it again unchanged, and the cost of --summary-writes vacation updates with and without the
+per-country summaries against one full summary refresh. With --compare, every scenario slower than the
+earlier results by more than --threshold is reported as a regression, e.g. between releases.
+
+Usage:
+    python -m benchmarks.run_benchmarks --dsn "<connection details>" --concurrency 8 --dataset-size 10000 \
+        --operations 1000 --output bench_results.json [--compare previous_results.json] [--threshold 0.1] \
+        [--scenarios NAME ...] [--validation-rows 100000] [--resync-rows 100000] [--summary-writes 500]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import threading
+import time
+
+
+import psycopg as pg
+
+
+from src.bll import password_hashing
+from src.bll.user_facade import UserFacade
+from src.bll.vacation_facade import VacationFacade
+from src import config
+from src.dal.DAO.users_dao import UsersDAO
+from src.dal.DAO.vacations_dao import VacationsDAO
+from src.dal.connection_pool import configure_pool, get_pool_metrics
+from src.dal.migrate import migrate
+from src.models.users_dto import UserDTO
+from src.models.vacations_dto import VacationDTO
+
+
+SEED_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'init_test_database.sql')
+BENCHMARK_PASSWORD = 'benchmark-password'
+COUNTRIES = 10
+
+
+def reset_database(dsn: str) -> None:
+    """
+    Drops the schema of the benchmark database, recreates it with the migrations and loads the test data.
+
+    Args:
+        dsn (str): The connection details of the throwaway benchmark database.
+    """
+    with pg.connect(dsn, autocommit=True) as connection:
+        connection.execute('DROP SCHEMA public CASCADE; CREATE SCHEMA public;')
+    migrate(dsn)
+    with open(SEED_FILE, 'r', encoding='utf-8-sig') as file:
+        sql_commands = file.read()
+    with pg.connect(dsn) as connection:
+        connection.execute(sql_commands)
+
+
+def seed_vacations(dsn: str, dataset_size: int) -> None:
+    """
+    Loads dataset_size generated vacations with COPY.
+
+    Args:
+        dsn (str): The connection details of the throwaway benchmark database.
+        dataset_size (int): The number of vacations to generate.
+    """
+    first_day = datetime.date.today() + datetime.timedelta(days=30)
+    vacations = (
+        VacationDTO(vacation_id, vacation_id % COUNTRIES + 1, f'Benchmark vacation {vacation_id}',
+                    first_day + datetime.timedelta(days=vacation_id % 365),
+                    first_day + datetime.timedelta(days=vacation_id % 365 + 7),
+                    1000 + vacation_id % 9000, f'vacation_{vacation_id}.jpg')
+        for vacation_id in range(1000, 1000 + dataset_size)
+    )
+    VacationsDAO(dsn).copy_from(vacations)
+
+
+def seed_dataset(dsn: str, dataset_size: int) -> None:
+    """
+    Loads dataset_size vacations and dataset_size users with COPY. Every generated user shares one
+    password hash, so seeding does not pay the hashing cost once per user.
+
+    Args:
+        dsn (str): The connection details of the throwaway benchmark database.
+        dataset_size (int): The number of vacations and of users to generate.
+    """
+    seed_vacations(dsn, dataset_size)
+    password = password_hashing.hash_password(BENCHMARK_PASSWORD)
+    users = (
+        UserDTO(user_id, 'Bench', 'User', f'user{user_id}@example.com', password, 2)
+        for user_id in range(1000, 1000 + dataset_size)
+    )
+    UsersDAO(dsn).copy_from(users)
+
+
+def percentile_summary(latencies: List[float], wall_time: float) -> Dict[str, float]:
+    """
+    Summarizes the latencies of one scenario.
+
+    Args:
+        latencies (List[float]): The latency of every operation, in seconds.
+        wall_time (float): The wall-clock time of the whole scenario, in seconds.
+
+    Returns:
+        Dict[str, float]: The operation count, ops/sec and the mean, p50, p95 and p99 latencies in milliseconds.
+    """
+    cut_points = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        'operations': len(latencies),
+        'ops_per_sec': len(latencies) / wall_time if wall_time else 0.0,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'p50_ms': cut_points[49] * 1000,
+        'p95_ms': cut_points[94] * 1000,
+        'p99_ms': cut_points[98] * 1000,
+    }
+
+
+def run_scenario(operation: Callable[[int], Any], operations: int, concurrency: int) -> Dict[str, float]:
+    """
+    Runs an operation the given number of times across concurrency threads and measures every call.
+
+    Args:
+        operation (Callable[[int], Any]): The operation, called with the index of the call.
+        operations (int): The number of calls.
+        concurrency (int): The number of threads calling the operation at the same time.
+
+    Returns:
+        Dict[str, float]: The summary returned by percentile_summary.
+    """
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def timed(index: int) -> None:
+        start = time.perf_counter()
+        operation(index)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(timed, index) for index in range(operations)]:
+            future.result()
+    return percentile_summary(latencies, time.perf_counter() - start)
+
+
+def build_scenarios(dsn: str, dataset_size: int) -> Dict[str, Callable[[int], Any]]:
+    """
+    Builds the benchmarked operations. Each one is called with a distinct index, which the writing
+    scenarios use to generate new, non-colliding IDs.
+
+    Args:
+        dsn (str): The connection details of the throwaway benchmark database.
+        dataset_size (int): The number of seeded vacations and users.
+
+    Returns:
+        Dict[str, Callable[[int], Any]]: The operations by scenario name.
+    """
+    user_facade = UserFacade(dsn)
+    vacation_facade = VacationFacade(dsn)
+    beginning_date = str(datetime.date.today() + datetime.timedelta(days=60))
+    end_date = str(datetime.date.today() + datetime.timedelta(days=67))
+    new_ids = itertools.count(1000 + dataset_size)
+    id_lock = threading.Lock()
+
+    def next_id() -> int:
+        with id_lock:
+            return next(new_ids)
+
+    def seeded_id() -> int:
+        return random.randrange(1000, 1000 + dataset_size)
+
+    def log_in(index: int) -> None:
+        user_facade.log_in(f'user{seeded_id()}@example.com', BENCHMARK_PASSWORD)
+
+    def register_user(index: int) -> None:
+        user_id = next_id()
+        user_facade.register_user(str(user_id), 'New', 'User', f'new{user_id}@example.com', BENCHMARK_PASSWORD, '2')
+
+    def like_and_unlike_vacation(index: int) -> None:
+        user_id, vacation_id = seeded_id(), seeded_id()
+        if user_facade.like_vacation(user_id, vacation_id):
+            user_facade.unlike_vacation(user_id, vacation_id)
+
+    def add_vacation(index: int) -> None:
+        vacation_facade.add_vacation(str(next_id()), '1', 'Benchmark vacation', beginning_date, end_date, 2500, 'bench.jpg')
+
+    def update_vacation(index: int) -> None:
+        vacation_facade.update_vacation(str(seeded_id()), '2', 'Updated benchmark vacation', beginning_date, end_date, 3000)
+
+    def list_vacation_pages(index: int) -> None:
+        _, cursor = vacation_facade.print_vacations_page(20)
+        vacation_facade.print_vacations_page(20, cursor)
+
+    return {
+        'log_in': log_in,
+        'register_user': register_user,
+        'like_unlike_vacation': like_and_unlike_vacation,
+        'add_vacation': add_vacation,
+        'update_vacation': update_vacation,
+        'list_vacation_pages': list_vacation_pages,
+    }
+
+
+def measure_validation(rows: int) -> Dict[str, Dict[str, float]]:
+    """
+    Measures the batch validation throughput of a bulk import of generated users and vacations,
+    one in every hundred of them invalid.
+
+    Args:
+        rows (int): The number of users and of vacations to validate.
+
+    Returns:
+        Dict[str, Dict[str, float]]: The rows, invalid rows, seconds and rows/sec of 'users' and 'vacations'.
+    """
+    first_day = datetime.date.today() + datetime.timedelta(days=30)
+    vacations = [
+        (str(index), '1', 'Imported vacation', str(first_day + datetime.timedelta(days=index % 365)),
+         str(first_day + datetime.timedelta(days=index % 365 + 7)), 20000 if index % 100 == 0 else 1000 + index % 9000,
+         'imported.jpg')
+        for index in range(rows)
+    ]
+    users = [
+        (str(index), 'Imported', 'User', f'import{index}@example' if index % 100 == 0 else f'import{index}@example.com',
+         BENCHMARK_PASSWORD, '2')
+        for index in range(rows)
+    ]
+    results = {}
+    # The validation does not touch the database, so the facades never connect.
+    for name, validate, records in (('users', UserFacade().validate_users, users),
+                                    ('vacations', VacationFacade().validate_vacations, vacations)):
+        start = time.perf_counter()
+        report = validate(records)
+        seconds = time.perf_counter() - start
+        results[name] = {'rows': rows, 'invalid_rows': len(report.errors), 'seconds': seconds,
+                         'rows_per_sec': rows / seconds if seconds else 0.0}
+    return results
+
+
+def measure_resync(dsn: str, rows: int) -> Dict[str, Dict[str, float]]:
+    """
+    Measures a partner catalogue sync through upsert_vacations: the first sync of rows generated vacations,
+    the same catalogue sent again unchanged, and again with one in every hundred vacations repriced. The
+    WAL each sync generates shows how much it actually wrote.
+
+    Args:
+        dsn (str): The connection details of the throwaway benchmark database.
+        rows (int): The number of vacations in the catalogue.
+
+    Returns:
+        Dict[str, Dict[str, float]]: The seconds, WAL bytes and inserted, updated and unchanged counts of
+            'initial', 'unchanged' and 'one_percent_changed'.
+    """
+    first_day = datetime.date.today() + datetime.timedelta(days=30)
+
+    def catalogue(repriced: int):
+        for index in range(rows):
+            price = 1000 + index % 9000 + (1 if index % 100 == 0 else 0) * repriced
+            yield (str(10 ** 6 + index), str(index % COUNTRIES + 1), f'Partner vacation {index}',
+                   str(first_day + datetime.timedelta(days=index % 365)),
+                   str(first_day + datetime.timedelta(days=index % 365 + 7)), price, 'partner.jpg')
+
+    facade = VacationFacade(dsn)
+    results = {}
+    for name, repriced in (('initial', 0), ('unchanged', 0), ('one_percent_changed', 1)):
+        with pg.connect(dsn) as connection:
+            wal_start = connection.execute('SELECT pg_current_wal_lsn();').fetchone()[0]
+        start = time.perf_counter()
+        report = facade.upsert_vacations(catalogue(repriced))
+        seconds = time.perf_counter() - start
+        with pg.connect(dsn) as connection:
+            wal_bytes = connection.execute('SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s);', (wal_start,)).fetchone()[0]
+        results[name] = {'rows': rows, 'seconds': seconds, 'wal_bytes': int(wal_bytes), 'inserted': report.inserted,
+                         'updated': report.updated, 'unchanged': report.unchanged}
+    return results
+
+
+SUMMARY_TRIGGERS = ('vacations_summarize_added', 'vacations_summarize_removed', 'vacations_summarize_changed')
+
+
+def measure_summaries(dsn: str, writes: int) -> Dict[str, float]:
+    """
+    Measures the upcoming vacations per country: the cost one vacation write pays to keep the per-day
+    summaries current, with and without the summary triggers, against a full refresh of the summaries, and
+    reading the summaries against aggregating the vacations.
+
+    Args:
+        dsn (str): The connection details of the throwaway benchmark database.
+        writes (int): The number of single vacation updates timed with and without the triggers.
+
+    Returns:
+        Dict[str, float]: The mean milliseconds of 'write_ms', 'write_without_summaries_ms', 'full_refresh_ms',
+            'read_ms' and 'read_aggregate_ms', and the number of 'summaries'.
+    """
+    facade = VacationFacade(dsn)
+    dao = facade.vacation_dao
+    today = datetime.date.today()
+    random_generator = random.Random(25)
+    with pg.connect(dsn) as connection:
+        vacation_ids = [row[0] for row in connection.execute('SELECT vacation_id FROM vacations;')]
+
+    def mean_ms(operation: Callable[[], Any], runs: int) -> float:
+        start = time.perf_counter()
+        for _ in range(runs):
+            operation()
+        return (time.perf_counter() - start) / runs * 1000
+
+    def reprice() -> None:
+        dao.update(('price',), (random_generator.randint(1000, 9999),), random_generator.choice(vacation_ids))
+
+    def set_triggers(enabled: bool) -> None:
+        with pg.connect(dsn) as connection:
+            for trigger in SUMMARY_TRIGGERS:
+                connection.execute(f"ALTER TABLE vacations {'ENABLE' if enabled else 'DISABLE'} TRIGGER {trigger};")
+
+    results = {'write_ms': mean_ms(reprice, writes)}
+    set_triggers(False)
+    try:
+        results['write_without_summaries_ms'] = mean_ms(reprice, writes)
+    finally:
+        set_triggers(True)
+    facade.refresh_destination_summaries()
+    results['full_refresh_ms'] = mean_ms(facade.refresh_destination_summaries, 5)
+    results['read_ms'] = mean_ms(lambda: facade.print_upcoming_per_destination(today), 20)
+    with pg.connect(dsn) as connection:
+        results['read_aggregate_ms'] = mean_ms(lambda: connection.execute(
+            'SELECT country_id, COUNT(*), MIN(price), MIN(beginning_date) FROM vacations '
+            'WHERE beginning_date >= %s GROUP BY country_id;', (today,)).fetchall(), 20)
+        results['summaries'] = connection.execute('SELECT COUNT(*) FROM vacation_day_summaries;').fetchone()[0]
+    return results
+
+
+def git_revision() -> Optional[str]:
+    """
+    Returns the current git commit, so results can be matched to the code that produced them.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(previous: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Lists the scenarios whose p95 latency grew, or whose throughput dropped, by more than the threshold.
+
+    Args:
+        previous (Dict[str, Any]): The results of an earlier run.
+        current (Dict[str, Any]): The results of this run.
+        threshold (float): The allowed relative change, e.g. 0.1 for 10%.
+
+    Returns:
+        List[str]: One description per regression.
+    """
+    regressions = []
+    for name, result in current['scenarios'].items():
+        before = previous.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        if before['p95_ms'] and result['p95_ms'] > before['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms")
+        if before['ops_per_sec'] and result['ops_per_sec'] < before['ops_per_sec'] * (1 - threshold):
+            regressions.append(f"{name}: {before['ops_per_sec']:.1f} -> {result['ops_per_sec']:.1f} ops/sec")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the benchmark suite and writes its results as JSON.
+
+    Returns:
+        int: The process exit code, 1 if a comparison found regressions.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dsn', default=config.settings.db_config_tests, help='connection details of a throwaway database; it is wiped')
+    parser.add_argument('--concurrency', type=int, default=8, help='number of concurrent callers')
+    parser.add_argument('--dataset-size', type=int, default=10000, help='number of seeded vacations and users')
+    parser.add_argument('--operations', type=int, default=1000, help='number of calls per scenario')
+    parser.add_argument('--scenarios', nargs='*', help='only run these scenarios')
+    parser.add_argument('--output', default='bench_results.json', help='where to write the JSON results')
+    parser.add_argument('--compare', help='JSON results of an earlier run to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative change counted as a regression')
+    parser.add_argument('--validation-rows', type=int, default=100000, help='number of rows of the bulk validation run')
+    parser.add_argument('--resync-rows', type=int, default=100000, help='number of vacations of the catalogue sync run')
+    parser.add_argument('--summary-writes', type=int, default=500, help='number of vacation updates timed against a summary refresh')
+    args = parser.parse_args(argv)
+
+    reset_database(args.dsn)
+    seed_dataset(args.dsn, args.dataset_size)
+    configure_pool(args.dsn, max_size=max(args.concurrency, 1))
+
+    results: Dict[str, Any] = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'settings': {'concurrency': args.concurrency, 'dataset_size': args.dataset_size, 'operations': args.operations},
+        'password_hash_ms': password_hashing.measure_hash_cost() * 1000,
+        'scenarios': {},
+    }
+    for name, operation in build_scenarios(args.dsn, args.dataset_size).items():
+        if args.scenarios and name not in args.scenarios:
+            continue
+        results['scenarios'][name] = run_scenario(operation, args.operations, args.concurrency)
+        summary = results['scenarios'][name]
+        print(f"{name:24} {summary['ops_per_sec']:9.1f} ops/sec  p50 {summary['p50_ms']:8.2f}ms  "
+              f"p95 {summary['p95_ms']:8.2f}ms  p99 {summary['p99_ms']:8.2f}ms")
+    results['pool'] = get_pool_metrics(args.dsn)
+    results['validation'] = measure_validation(args.validation_rows)
+    for name, summary in results['validation'].items():
+        print(f"validate_{name:15} {summary['rows_per_sec']:9.1f} rows/sec  {summary['invalid_rows']} invalid "
+              f"of {summary['rows']}")
+    results['resync'] = measure_resync(args.dsn, args.resync_rows)
+    for name, summary in results['resync'].items():
+        print(f"resync_{name:17} {summary['seconds']:9.2f}s  {summary['wal_bytes'] / 1024 / 1024:8.2f} MiB WAL  "
+              f"{summary['inserted']} inserted, {summary['updated']} updated, {summary['unchanged']} unchanged")
+    results['summaries'] = summary = measure_summaries(args.dsn, args.summary_writes)
+    print(f"summaries: write {summary['write_ms']:.2f}ms (without summaries {summary['write_without_summaries_ms']:.2f}ms), "
+          f"full refresh of {summary['summaries']} {summary['full_refresh_ms']:.2f}ms, "
+          f"read {summary['read_ms']:.2f}ms (aggregating vacations {summary['read_aggregate_ms']:.2f}ms)")
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            regressions = compare_results(json.load(file), results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+from src.bll import password_hashing
+from src.bll.user_facade import UserValidation
+from src.dal.DAO import async_users_dao
+from src import config
+from src.models import likes_dto
+
+from typing import Optional
+import asyncio
+
+
+class AsyncUserFacade(UserValidation):
+    """
+    An asynchronous counterpart of UserFacade, so a single event loop can serve many concurrent
+    registration, login and like requests. It shares only the validation rules with UserFacade.
+
+    Attributes:
+        users_dao (AsyncCachedUsersDAO): Asynchronous Data Access Object (DAO) for user-related database operations,
+            whose likes invalidate the liked sets UserFacade caches.
+    """
+
+    def __init__(self, connection_details: Optional[str] = None):
+        """
+        Initializes the AsyncUserFacade with the given database connection details.
+
+        Args:
+            connection_details (Optional[str]): The connection details for the database, defaults to config.settings.db_config.
+        """
+        self.users_dao = async_users_dao.AsyncCachedUsersDAO(connection_details or config.settings.db_config)
+
+    async def register_user(self, user_id: str = None, first_name: str = None, last_name: str = None, email: str = None, password: str = None, role_id: str = None):
+        """
+        Registers a new user with the provided details.
+
+        Args:
+            user_id (str): The unique identifier for the user.
+            first_name (str): The user's first name.
+            last_name (str): The user's last name.
+            email (str): The user's email address.
+            password (str): The user's password.
+            role_id (str): The role ID for the user.
+
+        Raises:
+            ValueError: If any field is missing or invalid.
+            Exception: If the email is already registered.
+        """
+        user_dto = self._create_user_dto(user_id, first_name, last_name, email, password, role_id)
+        columns, values = await asyncio.to_thread(self._user_dto_columns_and_values, user_dto)
+        if not await self.users_dao.add_unless_email_registered(columns, values):
+            raise Exception("Cannot register with an email that is already registered.")
+
+    async def log_in(self, email: str = None, password: str = None):
+        """
+        Logs in a user by validating email and password, with a single query by email.
+
+        Password hashing runs in a worker thread so it does not block the event loop.
+
+        Args:
+            email (str): The user's email address.
+            password (str): The user's password.
+
+        Returns:
+            The (user_id, role_id) of the user if login is successful, False if the email is not registered.
+
+        Raises:
+            ValueError: If email or password is missing or invalid, or if login fails.
+        """
+        self._check_log_in_fields(email, password)
+
+        login = await self.users_dao.print_login_by_email(email)
+        if login is None:
+            await asyncio.to_thread(password_hashing.verify_dummy_password, password)
+            return False
+        user_id, role_id, stored_password = login
+        await asyncio.to_thread(self._check_password_matches, password, stored_password)
+        if password_hashing.needs_rehash(stored_password):
+            new_password = await asyncio.to_thread(password_hashing.hash_password, password)
+            await self.users_dao.update(('password',), (new_password,), user_id)
+        return user_id, role_id
+
+    async def like_vacation(self, user_id: str = None, vacation_id: str = None) -> bool:
+        """
+        Likes a vacation on behalf of a user.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+            vacation_id (str): The unique identifier of the vacation.
+
+        Returns:
+            bool: True if the like was added, False if the user already liked the vacation.
+        """
+        like_dto = likes_dto.LikeDTO(user_id, vacation_id)
+        return await self.users_dao.like_vacation(like_dto.user_id, like_dto.vacation_id)
+
+    async def unlike_vacation(self, user_id: str = None, vacation_id: str = None):
+        """
+        Removes a 'like' for a specific vacation by a user.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+            vacation_id (str): The unique identifier of the vacation.
+        """
+        return await self.users_dao.unlike_vacation(user_id, vacation_id)
@@ -0,0 +1,81 @@
+from src.bll.vacation_facade import VacationValidation
+from src.dal.DAO import async_vacations_dao
+from src import config
+from typing import Optional
+
+
+class AsyncVacationFacade(VacationValidation):
+    """
+    An asynchronous counterpart of VacationFacade for single vacation writes and the full listing. It shares
+    only the validation rules with VacationFacade; searches, pages and batch imports stay on VacationFacade.
+
+    Attributes:
+        vacation_dao (AsyncCachedVacationsDAO): Asynchronous Data Access Object (DAO) for vacation-related database
+            operations, whose writes invalidate the vacations cache VacationFacade reads from.
+    """
+
+    def __init__(self, connection_details: Optional[str] = None):
+        """
+        Initializes the AsyncVacationFacade with connection details.
+
+        Args:
+            connection_details (Optional[str]): The details required to connect to the database, defaults to config.settings.db_config.
+        """
+        self.vacation_dao = async_vacations_dao.AsyncCachedVacationsDAO(connection_details or config.settings.db_config)
+
+    async def delete_vacation(self, vacation_id: str) -> None:
+        """
+        Deletes a vacation record by its ID.
+
+        Args:
+            vacation_id (str): The ID of the vacation to be deleted.
+
+        Raises:
+            ValueError: If the vacation with the given ID does not exist.
+        """
+        if not await self.vacation_dao.delete_by_id(vacation_id):
+            raise ValueError(f"Vacation with ID {vacation_id} does not exist.")
+
+    async def print_all_vacation_ordered_by_beginning_date(self):
+        """
+        Returns all vacation records ordered by the beginning date.
+        """
+        return await self.vacation_dao.print_all('ORDER BY beginning_date')
+
+    async def add_vacation(self, vacation_id: str = None, country_id: str = None, vacation_description: str = None, beginning_date: str = None, end_date: str = None, price: int = None, picture_file_name: str = None) -> None:
+        """
+        Adds a new vacation record.
+
+        Args:
+            vacation_id (str): The ID of the vacation.
+            country_id (str): The ID of the country.
+            vacation_description (str): The description of the vacation.
+            beginning_date (str): The beginning date of the vacation.
+            end_date (str): The end date of the vacation.
+            price (int): The price of the vacation.
+            picture_file_name (str): The file name of the picture.
+        """
+        columns, values = self._create_vacation_dto_columns_and_values(
+            vacation_id, country_id, vacation_description, beginning_date, end_date, price, picture_file_name)
+        await self.vacation_dao.add(columns, values)
+
+    async def update_vacation(self, vacation_id: str = None, country_id: str = None, vacation_description: str = None, beginning_date: str = None, end_date: str = None, price: int = None, picture_file_name: str = None) -> None:
+        """
+        Updates an existing vacation record.
+
+        Args:
+            vacation_id (str): The ID of the vacation.
+            country_id (str): The ID of the country.
+            vacation_description (str): The description of the vacation.
+            beginning_date (str): The beginning date of the vacation.
+            end_date (str): The end date of the vacation.
+            price (int): The price of the vacation.
+            picture_file_name (str): The file name of the picture.
+
+        Raises:
+            ValueError: If any field is invalid, or if the vacation with the given ID does not exist.
+        """
+        columns, values = self._create_update_columns_and_values(
+            vacation_id, country_id, vacation_description, beginning_date, end_date, price, picture_file_name)
+        if not await self.vacation_dao.update(columns, values, vacation_id):
+            raise ValueError(f"Vacation with ID {vacation_id} does not exist.")
@@ -0,0 +1,387 @@
+"""
+Streams vacations, countries and users between CSV or JSON Lines files and the database.
+
+Exports write a table in primary key order, CSV through COPY ... TO STDOUT and JSON Lines through a
+server-side cursor. User password hashes are left out unless --include-credentials is given; a users
+export without them cannot be imported back.
+
+Imports read the file one batch at a time, validate the batch with the facade rules, load its valid rows
+with COPY and store a checkpoint in the same transaction, so an interrupted import resumes after its last
+committed batch; --restart starts over from the first row. Invalid rows are appended to a '<file>.rejected.jsonl' file, and
+made durable before their batch commits; rejects of batches that never committed are dropped on resume.
+Memory use depends on the batch size only, never on the size of the file or the table.
+
+Usage:
+    python -m src.bll.catalogue_transfer export vacations vacations.csv [--include-credentials]
+    python -m src.bll.catalogue_transfer import vacations vacations.csv [--batch-size 10000] [--restart] [--allow-past-dates]
+"""
+from src.bll import password_hashing
+from src.bll.user_facade import UserFacade
+from src.bll.vacation_facade import VacationFacade
+from src.dal.DAO.import_checkpoints_dao import ImportCheckpointsDAO
+from src.dal.connection_pool import unit_of_work
+from src import config
+from src.models.countries_dto import CountryDTO
+from src.models.import_checkpoints_dto import ImportCheckpointDTO
+from src.models.validation_report_dto import RowErrorDTO, ValidationReportDTO
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+import argparse
+import csv
+import dataclasses
+import datetime
+import itertools
+import json
+import os
+import sys
+
+
+ENTITIES = ('vacations', 'countries', 'users')
+FORMATS = ('csv', 'jsonl')
+REJECTS_SUFFIX = '.rejected.jsonl'
+CREDENTIAL_COLUMNS = ('password',)
+MAX_COUNTRY_NAME_LENGTH = 50
+PROGRESS_BYTES = 1024 * 1024
+
+
+def detect_format(path: str) -> str:
+    """
+    Tells the format of a file from its extension, '.csv' or '.jsonl'.
+
+    Raises:
+        ValueError: If the extension is neither.
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension not in FORMATS:
+        raise ValueError(f'Cannot tell the format of {path}; use a .csv or .jsonl file or pass the format.')
+    return extension
+
+
+def read_records(file, file_format: str) -> Iterator[Union[Dict[str, Any], str]]:
+    """
+    Lazily reads the records of an open text file: a dict per CSV row, with empty fields as None, or the
+    text of each non-blank JSON line, parsed later so a malformed line is rejected like any invalid row.
+    """
+    if file_format == 'csv':
+        for record in csv.DictReader(file):
+            yield {key: value if value != '' else None for key, value in record.items()}
+    else:
+        for line in file:
+            if line.strip():
+                yield line
+
+
+class CatalogueTransfer:
+    """
+    Exports and imports the vacations, countries and users tables.
+
+    Attributes:
+        connection_details (str): The connection details for the database.
+        vacation_facade (VacationFacade): Validates imported vacations; its DAO loads them.
+        user_facade (UserFacade): Validates imported users; its DAO loads them.
+        countries_dao (CountriesDAO): Loads imported countries; the DAO of vacation_facade, so imports invalidate
+            the countries cache.
+        checkpoints_dao (ImportCheckpointsDAO): Stores how far the import of each file got.
+    """
+
+    def __init__(self, connection_details: Optional[str] = None):
+        """
+        Initializes the CatalogueTransfer with the given connection details.
+
+        Args:
+            connection_details (Optional[str]): The connection details for the database, defaults to config.settings.db_config.
+        """
+        self.connection_details = connection_details or config.settings.db_config
+        self.vacation_facade = VacationFacade(self.connection_details)
+        self.user_facade = UserFacade(self.connection_details)
+        self.countries_dao = self.vacation_facade.countries_dao
+        self.checkpoints_dao = ImportCheckpointsDAO(self.connection_details)
+
+    def _dao(self, entity: str):
+        """
+        Returns the DAO of an entity's table.
+
+        Raises:
+            ValueError: If the entity is unknown.
+        """
+        if entity == 'vacations':
+            return self.vacation_facade.vacation_dao
+        if entity == 'users':
+            return self.user_facade.users_dao
+        if entity == 'countries':
+            return self.countries_dao
+        raise ValueError(f"Unknown entity {entity}; expected one of {', '.join(ENTITIES)}.")
+
+    def export(self, entity: str, path: str, file_format: Optional[str] = None, progress: Optional[Callable[[int], None]] = None, include_credentials: bool = False) -> int:
+        """
+        Writes every row of an entity's table to a file, in primary key order.
+
+        The rows go to '<path>.part' first, which replaces the file once complete, so an interrupted export
+        never leaves a truncated file behind. Credential columns, the users' password hashes, are left out
+        unless asked for.
+
+        Args:
+            entity (str): 'vacations', 'countries' or 'users'.
+            path (str): The file to write.
+            file_format (Optional[str]): 'csv' or 'jsonl', defaults to the extension of the path.
+            progress (Optional[Callable[[int], None]]): Called with the number of bytes written so far, after
+                every block.
+            include_credentials (bool): True to also write the credential columns, e.g. for a backup that
+                is imported back.
+
+        Returns:
+            int: The number of bytes written.
+
+        Raises:
+            ValueError: If the entity or the format is unknown.
+        """
+        dao = self._dao(entity)
+        file_format = file_format or detect_format(path)
+        columns = tuple(column for column in dao.columns if include_credentials or column not in CREDENTIAL_COLUMNS)
+        if file_format == 'csv':
+            blocks = dao.base_copy_to(dao.table_name, columns, dao.columns[0])
+        elif file_format == 'jsonl':
+            blocks = (f'{line}\n'.encode() for line in dao.base_stream_json_lines(dao.table_name, columns, dao.columns[0]))
+        else:
+            raise ValueError(f"Unknown format {file_format}; expected one of {', '.join(FORMATS)}.")
+
+        written = 0
+        temporary_path = f'{path}.part'
+        with open(temporary_path, 'wb') as file:
+            for block in blocks:
+                file.write(block)
+                written += len(block)
+                if progress:
+                    progress(written)
+        os.replace(temporary_path, path)
+        return written
+
+    def _prepare(self, entity: str, record: Union[Dict[str, Any], str]) -> Dict[str, Any]:
+        """
+        Picks the columns of an entity out of a record and converts the numeric ones read as text.
+
+        Raises:
+            ValueError: If a JSON line is malformed or a number is not a whole number.
+        """
+        if isinstance(record, str):
+            try:
+                record = json.loads(record)
+            except ValueError as e:
+                raise ValueError(f'Invalid JSON: {e}.') from None
+            if not isinstance(record, dict):
+                raise ValueError('Each JSON line must be an object.')
+        values = {column: record.get(column) for column in self._dao(entity).columns}
+        if entity == 'vacations' and isinstance(values['price'], str):
+            try:
+                values['price'] = int(values['price'])
+            except ValueError:
+                raise ValueError('Vacation price must be a whole number.') from None
+        return values
+
+    def _validate_countries(self, countries: List[Dict[str, Any]]) -> ValidationReportDTO:
+        """
+        Validates countries: both fields are required, the ID is a whole number and the name fits its column.
+        """
+        report = ValidationReportDTO()
+        for index, country in enumerate(countries):
+            if country['country_id'] is None or not country['country_name']:
+                report.errors.append(RowErrorDTO(index, 'All fields are required.'))
+            elif not str(country['country_id']).isdigit():
+                report.errors.append(RowErrorDTO(index, 'Country ID must be a whole number.'))
+            elif len(country['country_name']) > MAX_COUNTRY_NAME_LENGTH:
+                report.errors.append(RowErrorDTO(index, f'Country name cannot be longer than {MAX_COUNTRY_NAME_LENGTH} characters.'))
+            else:
+                report.valid.append(CountryDTO(country['country_id'], country['country_name']))
+        return report
+
+    def validate_batch(self, entity: str, records: List[Union[Dict[str, Any], str]], today: Optional[datetime.date] = None) -> ValidationReportDTO:
+        """
+        Validates a batch of read records with the rules of the entity's facade.
+
+        Users must not be admins, like UsersDAO.add requires, and their plain text passwords are hashed;
+        passwords that are already hashes, e.g. in an export, are kept.
+
+        Args:
+            entity (str): 'vacations', 'countries' or 'users'.
+            records (List[Union[Dict[str, Any], str]]): The records, as yielded by read_records.
+            today (Optional[datetime.date]): The earliest allowed vacation beginning date, defaults to today.
+
+        Returns:
+            ValidationReportDTO: The DTOs to load, and the index in records and first error of every invalid record.
+        """
+        prepared: List[Dict[str, Any]] = []
+        positions: List[int] = []
+        errors: List[RowErrorDTO] = []
+        for index, record in enumerate(records):
+            try:
+                prepared.append(self._prepare(entity, record))
+                positions.append(index)
+            except ValueError as e:
+                errors.append(RowErrorDTO(index, str(e)))
+
+        if entity == 'vacations':
+            report = self.vacation_facade.validate_vacations(prepared, today)
+        elif entity == 'users':
+            report = self.user_facade.validate_users(prepared)
+        else:
+            report = self._validate_countries(prepared)
+        errors.extend(RowErrorDTO(positions[error.index], error.message) for error in report.errors)
+
+        valid = report.valid
+        if entity == 'users':
+            invalid = {error.index for error in report.errors}
+            valid_positions = [position for number, position in enumerate(positions) if number not in invalid]
+            valid = []
+            for position, user in zip(valid_positions, report.valid):
+                if str(user.role_id) == '1':
+                    errors.append(RowErrorDTO(position, 'admins can only be added through the database itself'))
+                elif password_hashing.is_hashed(user.password):
+                    valid.append(user)
+                else:
+                    valid.append(dataclasses.replace(user, password=password_hashing.hash_password(user.password)))
+        return ValidationReportDTO(valid, sorted(errors, key=lambda error: error.index))
+
+    def import_file(self, entity: str, path: str, file_format: Optional[str] = None, batch_size: Optional[int] = None, restart: bool = False, allow_past_dates: bool = False, progress: Optional[Callable[[ImportCheckpointDTO, float], None]] = None) -> ImportCheckpointDTO:
+        """
+        Imports a file into an entity's table, resuming after the last committed batch of an earlier import.
+
+        Each batch is validated, its valid rows are loaded with COPY and the checkpoint is saved in one
+        transaction, so every row is loaded exactly once however often the import is interrupted. Rows
+        that clash with stored ones, e.g. a duplicate ID, fail the batch and stop the import there.
+
+        The rejected rows of a batch are written to the rejects file and flushed to disk before the batch
+        commits, so a crash cannot lose them. An import starting from the first row empties the rejects
+        file, and a resumed one drops the rejects of the batches that did not commit.
+
+        Args:
+            entity (str): 'vacations', 'countries' or 'users'.
+            path (str): The file to read.
+            file_format (Optional[str]): 'csv' or 'jsonl', defaults to the extension of the path.
+            batch_size (Optional[int]): The number of rows validated and committed together, defaults to config.settings.copy_batch_size.
+            restart (bool): True to forget the checkpoint and the rejects of the file and import it from the first row.
+            allow_past_dates (bool): True to accept vacations that already began, e.g. when restoring an export.
+            progress (Optional[Callable[[ImportCheckpointDTO, float], None]]): Called after every committed
+                batch with the checkpoint and the fraction of the file read.
+
+        Returns:
+            ImportCheckpointDTO: The final checkpoint, with the numbers of rows read, imported and rejected.
+
+        Raises:
+            ValueError: If the entity or the format is unknown, or the file changed since its interrupted import.
+        """
+        dao = self._dao(entity)
+        file_format = file_format or detect_format(path)
+        if file_format not in FORMATS:
+            raise ValueError(f"Unknown format {file_format}; expected one of {', '.join(FORMATS)}.")
+        batch_size = batch_size or config.settings.copy_batch_size
+        today = datetime.date.min if allow_past_dates else datetime.date.today()
+        source = os.path.abspath(path)
+        file_size = os.path.getsize(source)
+
+        if restart:
+            self.checkpoints_dao.delete_by_source(source)
+        checkpoint = self.checkpoints_dao.print_by_source(source) or ImportCheckpointDTO(source, entity, file_size)
+        if (checkpoint.entity, checkpoint.file_size) != (entity, file_size):
+            raise ValueError(f'{path} changed since it was last imported; import it with restart to start over.')
+        if checkpoint.completed:
+            return checkpoint
+
+        self._trim_rejects(source, checkpoint.rows_done)
+        with open(source, 'r', encoding='utf-8-sig', newline='') as file:
+            records = itertools.islice(read_records(file, file_format), checkpoint.rows_done, None)
+            for batch in iter(lambda: list(itertools.islice(records, batch_size)), []):
+                report = self.validate_batch(entity, batch, today)
+                first_row = checkpoint.rows_done + 1
+                with unit_of_work(self.connection_details):
+                    imported = dao.copy_from(report.valid, len(report.valid) or 1)
+                    checkpoint = dataclasses.replace(
+                        checkpoint, rows_done=checkpoint.rows_done + len(batch),
+                        imported=checkpoint.imported + imported, rejected=checkpoint.rejected + len(report.errors))
+                    self.checkpoints_dao.save(checkpoint)
+                    self._write_rejects(source, first_row, batch, report.errors)
+                if progress:
+                    progress(checkpoint, file.buffer.tell() / file_size if file_size else 1.0)
+
+        checkpoint = dataclasses.replace(checkpoint, completed=True)
+        self.checkpoints_dao.save(checkpoint)
+        return checkpoint
+
+    def _write_rejects(self, source: str, first_row: int, batch: List[Union[Dict[str, Any], str]], errors: List[RowErrorDTO]) -> None:
+        """
+        Appends the rejected records of a batch to the rejects file, one JSON object per record with its
+        row number in the imported file, counting from 1 after any CSV header, and flushes them to disk.
+        """
+        if not errors:
+            return
+        with open(source + REJECTS_SUFFIX, 'a', encoding='utf-8') as file:
+            for error in errors:
+                file.write(json.dumps({'row': first_row + error.index, 'error': error.message,
+                                       'record': batch[error.index]}, default=str) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _trim_rejects(self, source: str, rows_done: int) -> None:
+        """
+        Keeps only the rejects of the rows an import committed: none when it starts from the first row,
+        otherwise those up to its checkpoint, dropping the ones written by a batch that never committed.
+        """
+        path = source + REJECTS_SUFFIX
+        if not os.path.exists(path):
+            return
+        if not rows_done:
+            os.remove(path)
+            return
+        with open(path, 'r', encoding='utf-8') as file, open(f'{path}.part', 'w', encoding='utf-8') as kept:
+            kept.writelines(line for line in file if json.loads(line)['row'] <= rows_done)
+        os.replace(f'{path}.part', path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs an export or an import from the command line, reporting progress on stderr.
+
+    Returns:
+        int: The process exit code, 1 if any row was rejected.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=('export', 'import'))
+    parser.add_argument('entity', choices=ENTITIES)
+    parser.add_argument('path', help='the .csv or .jsonl file to write or read')
+    parser.add_argument('--format', choices=FORMATS, help='the file format, defaults to the extension of the path')
+    parser.add_argument('--dsn', default=config.settings.db_config, help='connection details of the database')
+    parser.add_argument('--batch-size', type=int, default=config.settings.copy_batch_size, help='rows validated and committed together')
+    parser.add_argument('--restart', action='store_true', help='ignore the checkpoint of an interrupted import')
+    parser.add_argument('--allow-past-dates', action='store_true', help='accept vacations that already began')
+    parser.add_argument('--include-credentials', action='store_true', help='export the password hashes of users too')
+    args = parser.parse_args(argv)
+
+    transfer = CatalogueTransfer(args.dsn)
+    if args.command == 'export':
+        shown = [0]
+
+        def show_written(written: int) -> None:
+            # The server sends about one block per row, so only every megabyte is reported.
+            if written - shown[0] >= PROGRESS_BYTES:
+                shown[0] = written
+                print(f'\r{written:,} bytes written', end='', file=sys.stderr)
+
+        written = transfer.export(args.entity, args.path, args.format, show_written, args.include_credentials)
+        print(file=sys.stderr)
+        print(f'Exported {args.entity} to {args.path} ({written:,} bytes).')
+        return 0
+
+    def report(checkpoint: ImportCheckpointDTO, fraction: float) -> None:
+        print(f'\r{checkpoint.rows_done:,} rows read ({fraction:.0%}), {checkpoint.imported:,} imported, '
+              f'{checkpoint.rejected:,} rejected', end='', file=sys.stderr)
+
+    checkpoint = transfer.import_file(args.entity, args.path, args.format, args.batch_size, args.restart,
+                                      args.allow_past_dates, report)
+    print(file=sys.stderr)
+    print(f'Imported {checkpoint.imported:,} of {checkpoint.rows_done:,} {args.entity} from {args.path}.')
+    if checkpoint.rejected:
+        print(f'Rejected {checkpoint.rejected:,} rows, listed in {os.path.abspath(args.path)}{REJECTS_SUFFIX}.')
+    return 1 if checkpoint.rejected else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+from typing import Optional
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+
+from src import config
+
+
+ALGORITHM = 'pbkdf2_sha256'
+SALT_BYTES = 16
+
+
+def hash_password(password: str, iterations: Optional[int] = None) -> str:
+    """
+    Hashes a password with PBKDF2-HMAC-SHA256 and a random salt.
+
+    Args:
+        password (str): The password to hash.
+        iterations (Optional[int]): The PBKDF2 iteration count, defaults to config.settings.password_hash_iterations.
+
+    Returns:
+        str: The hash, encoded as 'pbkdf2_sha256$<iterations>$<salt>$<hash>' so it can be verified later.
+    """
+    iterations = iterations or config.settings.password_hash_iterations
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return f'{ALGORITHM}${iterations}${base64.b64encode(salt).decode()}${base64.b64encode(digest).decode()}'
+
+
+def is_hashed(stored_password: str) -> bool:
+    """
+    Tells whether a stored password is a hash made by hash_password rather than legacy plain text.
+
+    Args:
+        stored_password (str): The stored password.
+
+    Returns:
+        bool: True if the password is a hash.
+    """
+    return stored_password.startswith(f'{ALGORITHM}$')
+
+
+def verify_password(password: str, stored_password: str) -> bool:
+    """
+    Checks a password against a stored hash in constant time.
+
+    Stored values that are not hashes are treated as legacy plain text passwords.
+
+    Args:
+        password (str): The password to check.
+        stored_password (str): The stored hash, or a legacy plain text password.
+
+    Returns:
+        bool: True if the password matches, False otherwise.
+    """
+    if not is_hashed(stored_password):
+        return hmac.compare_digest(password.encode(), stored_password.encode())
+    try:
+        _, iterations, salt, digest = stored_password.split('$')
+        expected = base64.b64decode(digest)
+        actual = hashlib.pbkdf2_hmac('sha256', password.encode(), base64.b64decode(salt), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+_dummy_hash: Optional[str] = None
+
+
+def verify_dummy_password(password: str) -> None:
+    """
+    Verifies a password against a throwaway hash, so a login with an unknown email takes as long as a
+    login with a wrong password and does not reveal which emails are registered.
+
+    Args:
+        password (str): The password given at login.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(secrets.token_hex(SALT_BYTES))
+    verify_password(password, _dummy_hash)
+
+
+def needs_rehash(stored_password: str) -> bool:
+    """
+    Tells whether a stored password should be hashed again: it is legacy plain text, or its iteration
+    count differs from config.settings.password_hash_iterations.
+
+    Args:
+        stored_password (str): The stored hash, or a legacy plain text password.
+
+    Returns:
+        bool: True if the password should be hashed again on the next successful login.
+    """
+    if not is_hashed(stored_password):
+        return True
+    return stored_password.split('$')[1] != str(config.settings.password_hash_iterations)
+
+
+def measure_hash_cost(iterations: Optional[int] = None, rounds: int = 5) -> float:
+    """
+    Measures how long one password verification takes with the given iteration count.
+
+    Args:
+        iterations (Optional[int]): The PBKDF2 iteration count, defaults to config.settings.password_hash_iterations.
+        rounds (int): The number of verifications to average.
+
+    Returns:
+        float: The average time of one verification, in seconds.
+    """
+    stored_password = hash_password('benchmark-password', iterations)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        verify_password('benchmark-password', stored_password)
+    return (time.perf_counter() - start) / rounds
@@ -1,29 +1,23 @@
+from src.bll import password_hashing
 from src.dal.DAO import users_dao
+from src import config
 from src.models import likes_dto, users_dto
+from src.models.validation_report_dto import RowErrorDTO, ValidationReportDTO
 
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, Union
 import re
 
 
 import psycopg as pg
 
 
+EMAIL_PATTERN = re.compile(r"^(?!\.)[a-zA-Z0-9._%+-]{1,64}@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
 
-class UserFacade:
-    """
-    A facade class providing user-related functionality, such as registration, login, and vacation interactions.
 
-    Attributes:
-        users_dao (UsersDAO): Data Access Object (DAO) for user-related database operations.
+class UserValidation:
+    """
+    The validation rules of users and logins, shared by UserFacade and AsyncUserFacade. They never touch the database.
     """
-
-    def __init__(self, connection_details: str):
-        """
-        Initializes the UserFacade with the given database connection details.
-
-        Args:
-            connection_details (str): The connection details for the database.
-        """
-        self.users_dao = users_dao.UsersDAO(connection_details)
 
     def check_password_contains_more_than_3(self, password: str):
         """
@@ -38,6 +32,7 @@ class UserFacade:
         if len(password) < 4:
             raise ValueError("Password must be at least 4 characters long")
     
+
     def check_email_valid(self, email: str):
         """
         Validates the email format.
@@ -48,12 +43,12 @@ class UserFacade:
         Raises:
             ValueError: If the email format is invalid.
         """
-        if not re.match(r"^(?!\.)[a-zA-Z0-9._%+-]{1,64}@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", email):
+        if not EMAIL_PATTERN.match(email):
             raise ValueError("Invalid email format")
 
-    def register_user(self, user_id: str = None, first_name: str = None, last_name: str = None, email: str = None, password: str = None, role_id: str = None):
+    def _create_user_dto(self, user_id: str, first_name: str, last_name: str, email: str, password: str, role_id: str) -> users_dto.UserDTO:
         """
-        Registers a new user with the provided details.
+        Validates the registration fields and creates the corresponding user DTO.
 
         Args:
             user_id (str): The unique identifier for the user.
@@ -63,9 +58,11 @@ class UserFacade:
             password (str): The user's password.
             role_id (str): The role ID for the user.
 
+        Returns:
+            users_dto.UserDTO: The validated user DTO.
+
         Raises:
             ValueError: If any field is missing or invalid.
-            Exception: If the email is already registered.
         """
         if not user_id or not first_name or not last_name or not email or not password or not role_id:
             raise ValueError("All fields are required.")
@@ -80,28 +77,59 @@ class UserFacade:
 
         if not user_dto.first_name.isalpha() or not user_dto.last_name.isalpha():
             raise ValueError("Both first name and last name can contain alphabet letters only.")
+        return user_dto
 
-        if self.users_dao.check_if_email_exists(user_dto.user_email):
-            raise Exception("Cannot register with an email that is already registered.")
+    def validate_users(self, users: Iterable[Union[Tuple[Any, ...], Dict[str, Any]]]) -> ValidationReportDTO:
+        """
+        Validates many users in one pass with the same rules as register_user, reporting every invalid
+        user instead of stopping at the first one. Emails repeated within the batch are reported too.
+
+        Args:
+            users (Iterable[Union[Tuple[Any, ...], Dict[str, Any]]]): The users, each as a tuple in the argument
+                order of register_user or as a dict of its keyword arguments.
+
+        Returns:
+            ValidationReportDTO: The DTOs of the valid users, and the index and first error of every invalid one.
+        """
+        report = ValidationReportDTO()
+        emails: Set[str] = set()
+        for index, user in enumerate(users):
+            try:
+                user_dto = self._create_user_dto(**user) if isinstance(user, dict) else self._create_user_dto(*user)
+                if user_dto.user_email in emails:
+                    raise ValueError("Cannot register with an email that is already registered.")
+            except (TypeError, ValueError) as e:
+                report.errors.append(RowErrorDTO(index, str(e)))
+            else:
+                emails.add(user_dto.user_email)
+                report.valid.append(user_dto)
+        return report
+
+    def _user_dto_columns_and_values(self, user_dto: users_dto.UserDTO) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        """
+        Returns the users table columns and the matching values of a user DTO, with the password hashed.
 
+        Args:
+            user_dto (users_dto.UserDTO): The user DTO to insert.
+
+        Returns:
+            tuple[tuple[str, ...], tuple[str, ...]]: A tuple of (columns, values).
+        """
         columns = ('user_id', 'first_name', 'last_name', 'email', 'password', 'role_id')
-        values = (user_dto.user_id, user_dto.first_name, user_dto.last_name, user_dto.user_email, user_dto.password, user_dto.role_id)
+        values = (user_dto.user_id, user_dto.first_name, user_dto.last_name, user_dto.user_email,
+                  password_hashing.hash_password(user_dto.password), user_dto.role_id)
+        return columns, values
 
-        self.users_dao.add(columns, values)
-    
-    def log_in(self, email: str = None, password: str = None) -> bool:
+    def _check_log_in_fields(self, email: str, password: str):
         """
-        Logs in a user by validating email and password.
+        Validates the login fields before any database lookup.
 
         Args:
             email (str): The user's email address.
             password (str): The user's password.
 
-        Returns:
-            bool: True if login is successful, False otherwise.
-
         Raises:
-            ValueError: If email or password is missing or invalid, or if login fails.
+            ValueError: If email or password is missing or invalid.
         """
         if not email or not password:
             raise ValueError("All fields are required.")
@@ -109,24 +137,111 @@ class UserFacade:
         self.check_password_contains_more_than_3(password)
         self.check_email_valid(email)
 
-        email_exists = self.users_dao.check_if_email_exists(email)
-        if email_exists:
-            check = self.users_dao.print_user_by_email_and_password(email, password)
-            if check == []:
-                raise ValueError("Wrong email or password.")
-            return check
-        return email_exists
+    def _check_password_matches(self, password: str, stored_password: str):
+        """
+        Verifies a login password against the stored one.
+
+        Args:
+            password (str): The password given at login.
+            stored_password (str): The stored password hash.
 
-    def like_vacation(self, user_id: str = None, vacation_id: str = None):
+        Raises:
+            ValueError: If the password does not match.
+        """
+        if not password_hashing.verify_password(password, stored_password):
+            raise ValueError("Wrong email or password.")
+
+
+class UserFacade(UserValidation):
+    """
+    A facade class providing user-related functionality, such as registration, login, and vacation interactions.
+
+    Attributes:
+        users_dao (UsersDAO): Data Access Object (DAO) for user-related database operations.
+    """
+
+    def __init__(self, connection_details: Optional[str] = None, cache_likes: bool = False):
+        """
+        Initializes the UserFacade with the given database connection details.
+
+        Args:
+            connection_details (Optional[str]): The connection details for the database, defaults to config.settings.db_config.
+            cache_likes (bool): True to keep the liked vacations of each user in memory, kept up to date by
+                like_vacation and unlike_vacation.
+        """
+        if cache_likes:
+            self.users_dao = users_dao.CachedUsersDAO(connection_details or config.settings.db_config)
+        else:
+            self.users_dao = users_dao.UsersDAO(connection_details or config.settings.db_config)
+
+    def register_user(self, user_id: str = None, first_name: str = None, last_name: str = None, email: str = None, password: str = None, role_id: str = None):
+        """
+        Registers a new user with the provided details.
+
+        The insert itself skips an email that is already registered, so two concurrent registrations with
+        the same email cannot both pass a separate check.
+
+        Args:
+            user_id (str): The unique identifier for the user.
+            first_name (str): The user's first name.
+            last_name (str): The user's last name.
+            email (str): The user's email address.
+            password (str): The user's password.
+            role_id (str): The role ID for the user.
+
+        Raises:
+            ValueError: If any field is missing or invalid.
+            Exception: If the email is already registered.
+        """
+        user_dto = self._create_user_dto(user_id, first_name, last_name, email, password, role_id)
+
+        columns, values = self._user_dto_columns_and_values(user_dto)
+        if not self.users_dao.add_unless_email_registered(columns, values):
+            raise Exception("Cannot register with an email that is already registered.")
+    
+    def log_in(self, email: str = None, password: str = None):
+        """
+        Logs in a user by validating email and password.
+
+        The user is looked up with a single query by email, and the password is verified against its
+        salted hash in constant time. Passwords stored in plain text or with an outdated iteration count
+        are hashed again after a successful login.
+
+        Args:
+            email (str): The user's email address.
+            password (str): The user's password.
+
+        Returns:
+            The (user_id, role_id) of the user if login is successful, False if the email is not registered.
+
+        Raises:
+            ValueError: If email or password is missing or invalid, or if login fails.
+        """
+        self._check_log_in_fields(email, password)
+
+        login = self.users_dao.print_login_by_email(email)
+        if login is None:
+            password_hashing.verify_dummy_password(password)
+            return False
+        user_id, role_id, stored_password = login
+        self._check_password_matches(password, stored_password)
+        if password_hashing.needs_rehash(stored_password):
+            self.users_dao.update(('password',), (password_hashing.hash_password(password),), user_id)
+        return user_id, role_id
+
+    def like_vacation(self, user_id: str = None, vacation_id: str = None) -> bool:
         """
         Likes a vacation on behalf of a user.
 
         Args:
             user_id (str): The unique identifier of the user.
             vacation_id (str): The unique identifier of the vacation.
+
+        Returns:
+            bool: True if the like was added, False if the user already liked the vacation.
         """
         like_dto = likes_dto.LikeDTO(user_id, vacation_id)
-        self.users_dao.like_vacation(like_dto.user_id, like_dto.vacation_id)
+        return self.users_dao.like_vacation(like_dto.user_id, like_dto.vacation_id)
 
     def unlike_vacation(self, user_id: str = None, vacation_id: str = None):
         """
@@ -138,10 +253,32 @@ class UserFacade:
         """
         return self.users_dao.unlike_vacation(user_id, vacation_id)
 
+    def print_liked_vacations(self, user_id: str, vacation_ids: Iterable[Union[str, int]]) -> Set[int]:
+        """
+        Returns which of the given vacations a user liked, with one query for the whole list.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+            vacation_ids (Iterable[Union[str, int]]): The IDs of the vacations, e.g. those of a listing page.
+
+        Returns:
+            Set[int]: The IDs of the given vacations the user liked.
+
+        Raises:
+            ValueError: If an ID is not a number.
+        """
+        try:
+            ids = [int(vacation_id) for vacation_id in vacation_ids]
+        except (TypeError, ValueError):
+            raise ValueError('Vacation IDs must be numbers.')
+        if not ids:
+            return set()
+        return self.users_dao.print_liked_vacation_ids(user_id, ids)
+
 
 
 
 
 
 
-        
\ No newline at end of file
+        
@@ -1,44 +1,45 @@
-from src.dal.DAO import vacations_dao
+from src.dal.DAO import countries_dao, vacations_dao
+from src import config
 from src.models import vacations_dto
+from src.models.countries_dto import CountryDTO
+from src.models.country_summary_dto import CountrySummaryDTO
+from src.models.upsert_report_dto import UpsertReportDTO
+from src.models.validation_report_dto import RowErrorDTO, ValidationReportDTO
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import base64
+import binascii
 import datetime
+import functools
+import itertools
+import re
 
 
-class VacationFacade:
-    """
-    A facade class providing vacation-related functionality, such as adding, updating, and deleting vacation records.
+# 'YYYY-MM-DD', with one digit months and days accepted like strptime's %m and %d do.
+DATE_PATTERN = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
 
-    Attributes:
-        vacation_dao (VacationsDAO): Data Access Object (DAO) for vacation-related database operations.
-    """
 
-    def __init__(self, connection_details: str):
-        """
-        Initializes the VacationFacade with connection details.
-
-        Args:
-            connection_details (str): The details required to connect to the database.
-        """
-        self.vacation_dao = vacations_dao.VacationsDAO(connection_details)
+@functools.lru_cache(maxsize=4096)
+def parse_date(date_str: str) -> datetime.date:
+    """
+    Parses a 'YYYY-MM-DD' date. Results are cached, as imported vacations share few distinct dates.
 
-    def delete_vacation(self, vacation_id: str) -> None:
-        """
-        Deletes a vacation record by its ID.
+    Raises:
+        ValueError: If the date format is invalid.
+    """
+    match = DATE_PATTERN.fullmatch(date_str)
+    try:
+        if match is None:
+            raise ValueError(date_str)
+        return datetime.date(*map(int, match.groups()))
+    except ValueError:
+        raise ValueError(
+            f"Invalid date format: {date_str}. Please use 'YYYY-MM-DD'.") from None
 
-        Args:
-            vacation_id (str): The ID of the vacation to be deleted.
 
-        Raises:
-            ValueError: If the vacation with the given ID does not exist.
-        """
-        if not self.vacation_dao.print_wanted_column_value_by_id('*', vacation_id):
-            raise ValueError(f"Vacation with ID {vacation_id} does not exist.")
-        self.vacation_dao.delete_by_id(vacation_id)
-
-    def print_all_vacation_ordered_by_beginning_date(self) -> None:
-        """
-        Prints all vacation records ordered by the beginning date.
-        """
-        return self.vacation_dao.print_all('ORDER BY beginning_date')
+class VacationValidation:
+    """
+    The validation rules of vacations, shared by VacationFacade and AsyncVacationFacade. They never touch the database.
+    """
 
     def _is_valid_date_format(self, date_str: str) -> datetime.date:
         """
@@ -53,11 +54,7 @@ class VacationFacade:
         Raises:
             ValueError: If the date format is invalid.
         """
-        try:
-            return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            raise ValueError(
-                f"Invalid date format: {date_str}. Please use 'YYYY-MM-DD'.")
+        return parse_date(date_str)
 
     def _compare_dates(self, beginning_date: str, end_date: str) -> tuple[datetime.date, datetime.date]:
         """
@@ -103,9 +100,9 @@ class VacationFacade:
         if price > 10000:
             raise ValueError('Vacation cannot be priced higher than 10,000')
 
-    def _create_vacation_dto_columns_and_values(self, vacation_id: str, country_id: str, vacation_description: str, beginning_date: str, end_date: str, price: int, picture_file_name: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    def _create_vacation_dto(self, vacation_id: str, country_id: str, vacation_description: str, beginning_date: str, end_date: str, price: int, picture_file_name: str, today: Optional[datetime.date] = None) -> vacations_dto.VacationDTO:
         """
-        Creates a vacation DTO and returns the corresponding columns and values.
+        Validates the fields of a new vacation and creates the corresponding vacation DTO.
 
         Args:
             vacation_id (str): The ID of the vacation.
@@ -115,9 +112,11 @@ class VacationFacade:
             end_date (str): The end date of the vacation.
             price (int): The price of the vacation.
             picture_file_name (str): The file name of the picture.
+            today (Optional[datetime.date]): The earliest allowed beginning date, defaults to today; batches
+                pass it once instead of reading the clock for every vacation.
 
         Returns:
-            tuple[tuple[str, ...], tuple[str, ...]]: A tuple of (columns, values).
+            vacations_dto.VacationDTO: The validated vacation DTO.
 
         Raises:
             ValueError: If any required field is missing or invalid.
@@ -128,20 +127,15 @@ class VacationFacade:
             raise ValueError("All fields are required.")
         beginning_date_new, end_date_new = self._compare_dates(
             beginning_date, end_date)
-        if beginning_date_new < datetime.datetime.today().date():
+        if beginning_date_new < (today or datetime.date.today()):
             raise ValueError(
                 'Vacation beginning date cannot be earlier than today.')
-        vacation_dto = vacations_dto.VacationDTO(
+        return vacations_dto.VacationDTO(
             vacation_id, country_id, vacation_description, beginning_date_new, end_date_new, price, picture_file_name)
-        columns = ('vacation_id', 'country_id', 'vacation_description',
-                   'beginning_date', 'end_date', 'price', 'picture_file_name')
-        values = (vacation_dto.vacation_id, vacation_dto.country_id, vacation_dto.vacation_description, vacation_dto.vacation_beginning_date,
-                  vacation_dto.vacation_end_date, vacation_dto.vacation_price, vacation_dto.vacation_image_filename)
-        return columns, values
 
-    def add_vacation(self, vacation_id: str = None, country_id: str = None, vacation_description: str = None, beginning_date: str = None, end_date: str = None, price: int = None, picture_file_name: str = None) -> None:
+    def _create_vacation_dto_columns_and_values(self, vacation_id: str, country_id: str, vacation_description: str, beginning_date: str, end_date: str, price: int, picture_file_name: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
         """
-        Adds a new vacation record.
+        Creates a vacation DTO and returns the corresponding columns and values.
 
         Args:
             vacation_id (str): The ID of the vacation.
@@ -151,14 +145,26 @@ class VacationFacade:
             end_date (str): The end date of the vacation.
             price (int): The price of the vacation.
             picture_file_name (str): The file name of the picture.
+
+        Returns:
+            tuple[tuple[str, ...], tuple[str, ...]]: A tuple of (columns, values).
+
+        Raises:
+            ValueError: If any required field is missing or invalid.
         """
-        columns, values = self._create_vacation_dto_columns_and_values(
+        vacation_dto = self._create_vacation_dto(
             vacation_id, country_id, vacation_description, beginning_date, end_date, price, picture_file_name)
-        self.vacation_dao.add(columns, values)
+        columns = ('vacation_id', 'country_id', 'vacation_description',
+                   'beginning_date', 'end_date', 'price', 'picture_file_name')
+        values = (vacation_dto.vacation_id, vacation_dto.country_id, vacation_dto.vacation_description, vacation_dto.vacation_beginning_date,
+                  vacation_dto.vacation_end_date, vacation_dto.vacation_price, vacation_dto.vacation_image_filename)
+        return columns, values
 
-    def update_vacation(self, vacation_id: str = None, country_id: str = None, vacation_description: str = None, beginning_date: str = None, end_date: str = None, price: int = None, picture_file_name: str = None) -> None:
+    def _create_update_columns_and_values(self, vacation_id: str, country_id: str, vacation_description: str, beginning_date: str, end_date: str, price: int, picture_file_name: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
         """
-        Updates an existing vacation record.
+        Validates the fields of a vacation update and returns the columns and values to write.
+
+        The picture column is only included when a picture file name is given.
 
         Args:
             vacation_id (str): The ID of the vacation.
@@ -167,14 +173,18 @@ class VacationFacade:
             beginning_date (str): The beginning date of the vacation.
             end_date (str): The end date of the vacation.
             price (int): The price of the vacation.
-            picture_file_name (str): The file name of the picture.
+            picture_file_name (str): The file name of the picture, or None to keep the current one.
+
+        Returns:
+            tuple[tuple[str, ...], tuple[str, ...]]: A tuple of (columns, values).
+
+        Raises:
+            ValueError: If any required field is missing or invalid.
         """
         self.check_all_fields_but_image(
             vacation_id, country_id, vacation_description, beginning_date, end_date, price)
         beginning_date_new, end_date_new = self._compare_dates(
             beginning_date, end_date)
-        if not self.vacation_dao.print_wanted_column_value_by_id('*', vacation_id):
-            raise ValueError(f"Vacation with ID {vacation_id} does not exist.")
 
         if picture_file_name is not None:
             vacation_dto = vacations_dto.VacationDTO(
@@ -183,10 +193,408 @@ class VacationFacade:
                        'beginning_date', 'end_date', 'price', 'picture_file_name')
             values = (vacation_dto.vacation_id, vacation_dto.country_id, vacation_dto.vacation_description, vacation_dto.vacation_beginning_date,
                       vacation_dto.vacation_end_date, vacation_dto.vacation_price, vacation_dto.vacation_image_filename)
-            self.vacation_dao.update(columns, values, vacation_id)
         else:
             columns = ('vacation_id', 'country_id', 'vacation_description',
                        'beginning_date', 'end_date', 'price')
             values = (vacation_id, country_id, vacation_description,
                       beginning_date_new, end_date_new, price)
-            self.vacation_dao.update(columns, values, vacation_id)
+        return columns, values
+
+    def _create_vacation_dtos(self, vacations: Iterable[Union[Tuple[Any, ...], Dict[str, Any]]]) -> Iterator[vacations_dto.VacationDTO]:
+        """
+        Lazily validates vacations given as tuples or dicts and yields their DTOs.
+        """
+        today = datetime.date.today()
+        for vacation in vacations:
+            if isinstance(vacation, dict):
+                yield self._create_vacation_dto(**vacation, today=today)
+            else:
+                yield self._create_vacation_dto(*vacation, today=today)
+
+    def validate_vacations(self, vacations: Iterable[Union[Tuple[Any, ...], Dict[str, Any]]], today: Optional[datetime.date] = None) -> ValidationReportDTO:
+        """
+        Validates many vacations in one pass with the same rules as add_vacation, reporting every invalid
+        vacation instead of stopping at the first one.
+
+        Args:
+            vacations (Iterable[Union[Tuple[Any, ...], Dict[str, Any]]]): The vacations, each as a tuple in the
+                argument order of add_vacation or as a dict of its keyword arguments.
+            today (Optional[datetime.date]): The earliest allowed beginning date, defaults to today;
+                datetime.date.min accepts past vacations, e.g. when restoring an export.
+
+        Returns:
+            ValidationReportDTO: The DTOs of the valid vacations, and the index and first error of every
+                invalid one.
+        """
+        report = ValidationReportDTO()
+        today = today or datetime.date.today()
+        for index, vacation in enumerate(vacations):
+            try:
+                if isinstance(vacation, dict):
+                    report.valid.append(self._create_vacation_dto(**vacation, today=today))
+                else:
+                    report.valid.append(self._create_vacation_dto(*vacation, today=today))
+            except (TypeError, ValueError) as e:
+                report.errors.append(RowErrorDTO(index, str(e)))
+        return report
+
+
+class VacationFacade(VacationValidation):
+    """
+    A facade class providing vacation-related functionality, such as adding, updating, and deleting vacation records.
+
+    Attributes:
+        vacation_dao (VacationsDAO): Data Access Object (DAO) for vacation-related database operations, a
+            CachedVacationsDAO serving repeated reads from the process's vacations cache unless caching is off.
+        countries_dao (CountriesDAO): Data Access Object (DAO) for the countries vacations take place in, a
+            CachedCountriesDAO unless caching is off.
+    """
+
+    def __init__(self, connection_details: Optional[str] = None, cache_reads: bool = True):
+        """
+        Initializes the VacationFacade with connection details.
+
+        Args:
+            connection_details (Optional[str]): The details required to connect to the database, defaults to config.settings.db_config.
+            cache_reads (bool): True to serve repeated vacation and country reads from the in-process caches
+                shared by every facade with the same connection details, False to always read the database.
+        """
+        connection_details = connection_details or config.settings.db_config
+        if cache_reads:
+            self.vacation_dao = vacations_dao.CachedVacationsDAO(connection_details)
+            self.countries_dao = countries_dao.CachedCountriesDAO(connection_details)
+        else:
+            self.vacation_dao = vacations_dao.VacationsDAO(connection_details)
+            self.countries_dao = countries_dao.CountriesDAO(connection_details)
+
+    def delete_vacation(self, vacation_id: str) -> None:
+        """
+        Deletes a vacation record by its ID.
+
+        The delete itself reports whether the vacation existed, so a concurrent delete cannot come between
+        a separate existence check and the delete.
+
+        Args:
+            vacation_id (str): The ID of the vacation to be deleted.
+
+        Raises:
+            ValueError: If the vacation with the given ID does not exist.
+        """
+        if not self.vacation_dao.delete_by_id(vacation_id):
+            raise ValueError(f"Vacation with ID {vacation_id} does not exist.")
+
+    def print_all_countries(self) -> List[CountryDTO]:
+        """
+        Retrieves every country a vacation can take place in, e.g. to offer them when adding a vacation.
+
+        Returns:
+            List[CountryDTO]: The countries.
+        """
+        return self.countries_dao.print_all()
+
+    def print_all_vacation_ordered_by_beginning_date(self) -> None:
+        """
+        Prints all vacation records ordered by the beginning date.
+        """
+        return self.vacation_dao.print_all('ORDER BY beginning_date')
+
+    def print_vacations_page(self, page_size: int = 20, cursor: Optional[str] = None) -> Tuple[List[vacations_dto.VacationDTO], Optional[str]]:
+        """
+        Returns one page of vacation records ordered by the beginning date.
+
+        Pages are read with keyset pagination, so every page costs the same however deep it is.
+
+        Args:
+            page_size (int): The maximum number of vacations on the page.
+            cursor (Optional[str]): The cursor returned with the previous page, or None for the first page.
+
+        Returns:
+            Tuple[List[vacations_dto.VacationDTO], Optional[str]]: The vacation records of the page, and the cursor of the
+                next page, or None if this is the last page.
+
+        Raises:
+            ValueError: If the page size is not positive or the cursor is invalid.
+        """
+        if page_size < 1:
+            raise ValueError('Page size must be a positive number.')
+        after = self._decode_page_cursor(cursor) if cursor else None
+        return self._split_page(self.vacation_dao.print_page(page_size + 1, after), page_size)
+
+    def search(self, date_from: Optional[str] = None, date_to: Optional[str] = None, min_price: Optional[int] = None,
+               max_price: Optional[int] = None, country_id: Optional[str] = None, text: Optional[str] = None,
+               upcoming_only: bool = False, active_now: bool = False, page_size: int = 20,
+               cursor: Optional[str] = None) -> Tuple[List[vacations_dto.VacationDTO], Optional[str]]:
+        """
+        Returns one page of the vacations matching every given filter, ordered by the beginning date.
+
+        Filtering and pagination happen in the database, on indexed columns.
+
+        Args:
+            date_from (Optional[str]): With date_to, the 'YYYY-MM-DD' range the vacations must overlap.
+            date_to (Optional[str]): With date_from, the end of the range; either bound may be left open.
+            min_price (Optional[int]): The lowest price.
+            max_price (Optional[int]): The highest price.
+            country_id (Optional[str]): The ID of the country.
+            text (Optional[str]): Words to look for in the description, e.g. 'beaches -nightlife'.
+            upcoming_only (bool): True for vacations that have not begun yet.
+            active_now (bool): True for vacations taking place today.
+            page_size (int): The maximum number of vacations on the page.
+            cursor (Optional[str]): The cursor returned with the previous page, or None for the first page.
+
+        Returns:
+            Tuple[List[vacations_dto.VacationDTO], Optional[str]]: The vacation records of the page, and the cursor of the
+                next page, or None if this is the last page.
+
+        Raises:
+            ValueError: If a filter, the page size or the cursor is invalid.
+        """
+        if page_size < 1:
+            raise ValueError('Page size must be a positive number.')
+        if upcoming_only and active_now:
+            raise ValueError('A vacation cannot be both upcoming and active now.')
+        date_from_new = self._is_valid_date_format(date_from) if date_from else None
+        date_to_new = self._is_valid_date_format(date_to) if date_to else None
+        if date_from_new and date_to_new and date_from_new > date_to_new:
+            raise ValueError('Search start date must be before the end date.')
+        for price in (min_price, max_price):
+            if price is not None and (not isinstance(price, int) or price < 0):
+                raise ValueError('Prices must be non-negative whole numbers.')
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError('Minimum price cannot be higher than maximum price.')
+        if country_id is not None and not str(country_id).isdigit():
+            raise ValueError('Country ID must be a number.')
+
+        today = datetime.date.today()
+        after = self._decode_page_cursor(cursor) if cursor else None
+        rows = self.vacation_dao.search(
+            page_size + 1, after, date_from_new, date_to_new, min_price, max_price,
+            int(country_id) if country_id is not None else None, text.strip() if text and text.strip() else None,
+            today if upcoming_only else None, today if active_now else None)
+        return self._split_page(rows, page_size)
+
+    def _split_page(self, rows: List[vacations_dto.VacationDTO], page_size: int) -> Tuple[List[vacations_dto.VacationDTO], Optional[str]]:
+        """
+        Cuts rows fetched with one extra record down to a page, returning the cursor of the next page if there is one.
+        """
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        last_row = rows[-1]
+        return rows, self._encode_page_cursor(last_row.vacation_beginning_date, last_row.vacation_id)
+
+    def iter_vacations_ordered_by_beginning_date(self, batch_size: Optional[int] = None) -> Iterator[vacations_dto.VacationDTO]:
+        """
+        Yields all vacation records ordered by the beginning date, holding only one batch in memory.
+
+        Args:
+            batch_size (Optional[int]): The number of vacations fetched from the database per round trip.
+
+        Yields:
+            vacations_dto.VacationDTO: The vacation records, one at a time.
+        """
+        return self.vacation_dao.stream_all(batch_size)
+
+    def print_most_liked_vacations(self, limit: int = 10) -> List[Tuple[vacations_dto.VacationDTO, int]]:
+        """
+        Returns the most liked vacations with their like counts.
+
+        Args:
+            limit (int): The maximum number of vacations to return.
+
+        Returns:
+            List[Tuple[vacations_dto.VacationDTO, int]]: (vacation, like count) pairs, most liked first.
+
+        Raises:
+            ValueError: If the limit is not positive.
+        """
+        if limit < 1:
+            raise ValueError('Limit must be a positive number.')
+        return self.vacation_dao.print_most_liked(limit)
+
+    def print_like_counts(self, vacation_ids: Iterable[Union[str, int]]) -> Dict[int, int]:
+        """
+        Returns the like counts of many vacations at once.
+
+        Args:
+            vacation_ids (Iterable[Union[str, int]]): The IDs of the vacations.
+
+        Returns:
+            Dict[int, int]: The like count of every given vacation, 0 for vacations without likes.
+
+        Raises:
+            ValueError: If an ID is not a number.
+        """
+        try:
+            ids = [int(vacation_id) for vacation_id in vacation_ids]
+        except (TypeError, ValueError):
+            raise ValueError('Vacation IDs must be numbers.')
+        if not ids:
+            return {}
+        return self.vacation_dao.print_like_counts(ids)
+
+    def print_likes_per_destination(self) -> List[Tuple[Any, ...]]:
+        """
+        Returns the total likes of the vacations of every country, for the admin dashboard.
+
+        Returns:
+            List[Tuple[Any, ...]]: (country_id, country_name, likes) rows, most liked countries first.
+        """
+        return self.vacation_dao.print_likes_per_country()
+
+    def print_upcoming_per_destination(self, today: Optional[datetime.date] = None) -> List[CountrySummaryDTO]:
+        """
+        Returns the number of upcoming vacations and their lowest price per country, for the home page.
+
+        The summaries are kept up to date by the database on every vacation write, so this reads a few
+        rows per country instead of aggregating the vacations, and never waits for a refresh.
+
+        Args:
+            today (Optional[datetime.date]): The first beginning date counted, defaults to today.
+
+        Returns:
+            List[CountrySummaryDTO]: One summary per country with upcoming vacations, ordered by country name.
+        """
+        return self.vacation_dao.print_upcoming_per_country(today or datetime.date.today())
+
+    def refresh_destination_summaries(self) -> int:
+        """
+        Rebuilds the per-country summaries from the vacations without blocking their readers, e.g. from a
+        nightly job, to prune days left without vacations and repair summaries changed by hand.
+
+        Returns:
+            int: The number of summaries rewritten or removed.
+        """
+        return self.vacation_dao.refresh_day_summaries()
+
+    def _encode_page_cursor(self, beginning_date: datetime.date, vacation_id: int) -> str:
+        """
+        Encodes the position of the last vacation of a page as an opaque cursor.
+        """
+        position = f'{beginning_date.isoformat()}|{vacation_id}'
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def _decode_page_cursor(self, cursor: str) -> Tuple[datetime.date, int]:
+        """
+        Decodes a cursor created by _encode_page_cursor into (beginning_date, vacation_id).
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        try:
+            beginning_date, vacation_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return datetime.date.fromisoformat(beginning_date), int(vacation_id)
+        except (ValueError, binascii.Error):
+            raise ValueError('Invalid page cursor.')
+
+    def add_vacation(self, vacation_id: str = None, country_id: str = None, vacation_description: str = None, beginning_date: str = None, end_date: str = None, price: int = None, picture_file_name: str = None) -> None:
+        """
+        Adds a new vacation record.
+
+        Args:
+            vacation_id (str): The ID of the vacation.
+            country_id (str): The ID of the country.
+            vacation_description (str): The description of the vacation.
+            beginning_date (str): The beginning date of the vacation.
+            end_date (str): The end date of the vacation.
+            price (int): The price of the vacation.
+            picture_file_name (str): The file name of the picture.
+        """
+        columns, values = self._create_vacation_dto_columns_and_values(
+            vacation_id, country_id, vacation_description, beginning_date, end_date, price, picture_file_name)
+        self.vacation_dao.add(columns, values)
+
+    def add_vacations(self, vacations: Iterable[Union[Tuple[Any, ...], Dict[str, Any]]], batch_size: Optional[int] = None) -> int:
+        """
+        Adds many vacation records in batches, validating each one with the same rules as add_vacation.
+
+        Vacations are validated and sent to the database lazily, so batches before an invalid vacation
+        are already committed when its ValueError is raised.
+
+        Args:
+            vacations (Iterable[Union[Tuple[Any, ...], Dict[str, Any]]]): The vacations, each as a tuple in the
+                argument order of add_vacation or as a dict of its keyword arguments.
+            batch_size (Optional[int]): The number of vacations per batch and commit.
+
+        Returns:
+            int: The number of vacations added.
+
+        Raises:
+            ValueError: If any vacation is missing fields or invalid.
+        """
+        return self.vacation_dao.add_many(self._create_vacation_dtos(vacations), batch_size)
+
+    def upsert_vacation(self, vacation_id: str = None, country_id: str = None, vacation_description: str = None, beginning_date: str = None, end_date: str = None, price: int = None, picture_file_name: str = None) -> UpsertReportDTO:
+        """
+        Adds a vacation record, or replaces the stored one with the same ID, validating it with the same rules
+        as add_vacation. A vacation identical to the stored one is not written at all.
+
+        Args:
+            vacation_id (str): The ID of the vacation.
+            country_id (str): The ID of the country.
+            vacation_description (str): The description of the vacation.
+            beginning_date (str): The beginning date of the vacation.
+            end_date (str): The end date of the vacation.
+            price (int): The price of the vacation.
+            picture_file_name (str): The file name of the picture.
+
+        Returns:
+            UpsertReportDTO: A count of 1 under inserted, updated or unchanged.
+
+        Raises:
+            ValueError: If any required field is missing or invalid.
+        """
+        vacation_dto = self._create_vacation_dto(
+            vacation_id, country_id, vacation_description, beginning_date, end_date, price, picture_file_name)
+        written = self.vacation_dao.upsert(vacation_dto)
+        return UpsertReportDTO(inserted=int(written is True), updated=int(written is False), unchanged=int(written is None))
+
+    def upsert_vacations(self, vacations: Iterable[Union[Tuple[Any, ...], Dict[str, Any]]], batch_size: Optional[int] = None, today: Optional[datetime.date] = None) -> UpsertReportDTO:
+        """
+        Adds or replaces many vacation records in batches, e.g. a partner's whole catalogue, rewriting only
+        the stored vacations whose values changed. Invalid vacations are reported instead of stopping the sync.
+
+        Args:
+            vacations (Iterable[Union[Tuple[Any, ...], Dict[str, Any]]]): The vacations, each as a tuple in the
+                argument order of add_vacation or as a dict of its keyword arguments, consumed lazily.
+            batch_size (Optional[int]): The number of vacations per batch and commit, defaults to config.settings.copy_batch_size.
+            today (Optional[datetime.date]): The earliest allowed beginning date, defaults to today;
+                datetime.date.min accepts vacations that already began.
+
+        Returns:
+            UpsertReportDTO: The numbers of vacations inserted, updated and left unchanged, and the index and
+                first error of every invalid vacation.
+        """
+        batch_size = batch_size or config.settings.copy_batch_size
+        report = UpsertReportDTO()
+        vacations = iter(vacations)
+        offset = 0
+        for batch in iter(lambda: list(itertools.islice(vacations, batch_size)), []):
+            validation = self.validate_vacations(batch, today)
+            written = self.vacation_dao.upsert_many(validation.valid, batch_size)
+            report.inserted += written.inserted
+            report.updated += written.updated
+            report.unchanged += written.unchanged
+            report.errors.extend(RowErrorDTO(offset + error.index, error.message) for error in validation.errors)
+            offset += len(batch)
+        return report
+
+    def update_vacation(self, vacation_id: str = None, country_id: str = None, vacation_description: str = None, beginning_date: str = None, end_date: str = None, price: int = None, picture_file_name: str = None) -> None:
+        """
+        Updates an existing vacation record.
+
+        The update itself reports whether the vacation existed, so a concurrent delete cannot come between
+        a separate existence check and the update.
+
+        Args:
+            vacation_id (str): The ID of the vacation.
+            country_id (str): The ID of the country.
+            vacation_description (str): The description of the vacation.
+            beginning_date (str): The beginning date of the vacation.
+            end_date (str): The end date of the vacation.
+            price (int): The price of the vacation.
+            picture_file_name (str): The file name of the picture.
+        """
+        columns, values = self._create_update_columns_and_values(
+            vacation_id, country_id, vacation_description, beginning_date, end_date, price, picture_file_name)
+        if not self.vacation_dao.update(columns, values, vacation_id):
+            raise ValueError(f"Vacation with ID {vacation_id} does not exist.")
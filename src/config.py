@@ -1,4 +1,175 @@
+"""
+The settings of the application: connection details, pool, cache, batch and replica tuning.
+
+Every setting defaults to the constant of the same name below and can be overridden by a JSON file named
+by VACATIONS_CONFIG_FILE, e.g. {"pool_max_size": 20}, then by a VACATIONS_<NAME> environment variable,
+e.g. VACATIONS_POOL_MAX_SIZE=20 or VACATIONS_DB_REPLICAS="host=replica1 ...;host=replica2 ...". The loaded
+settings are config.settings.
+"""
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Mapping, Optional, Tuple
+import json
+import os
 
 
 DB_CONFIG = "host=localhost port=5432 dbname=vacation_website_database user=postgres password=Meitar1997!"
-DB_CONFIG_TESTS =  "host=localhost port=5432 dbname=vacation_website_database_tests user=postgres password=Meitar1997!"
+DB_CONFIG_TESTS = "host=localhost port=5432 dbname=vacation_website_database_tests user=postgres password=Meitar1997!"
+# Read replicas of DB_CONFIG, e.g. VACATIONS_DB_REPLICAS="host=replica1 ...;host=replica2 ...", and streaming
+# replicas of DB_CONFIG_TESTS, which only the replica routing tests read from.
+DB_REPLICAS: Tuple[str, ...] = ()
+DB_REPLICAS_TESTS: Tuple[str, ...] = ()
+
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 10
+POOL_MAX_IDLE = 300.0
+POOL_TIMEOUT = 30.0
+PREPARE_THRESHOLD = 2
+# Seconds to wait for a new connection to the server, and milliseconds a statement may run; 0 waits forever.
+CONNECT_TIMEOUT = 10
+STATEMENT_TIMEOUT_MS = 0
+
+# Seconds to wait for a replica connection before trying the next one, to skip a failed replica before
+# trying it again, and to keep a context's reads on the primary after it wrote, longer than replication lag.
+REPLICA_TIMEOUT = 2.0
+REPLICA_RETRY_SECONDS = 30.0
+REPLICA_STICKY_SECONDS = 5.0
+
+BULK_BATCH_SIZE = 1000
+COPY_BATCH_SIZE = 10000
+STREAM_BATCH_SIZE = 1000
+
+CACHE_MAX_ENTRIES = 1024
+CACHE_MAX_BYTES = 16 * 1024 * 1024
+VACATIONS_CACHE_TTL = 30.0
+COUNTRIES_CACHE_TTL = 300.0
+LIKES_CACHE_TTL = 300.0
+
+PASSWORD_HASH_ITERATIONS = 310000
+
+SLOW_QUERY_THRESHOLD_MS = 200.0
+QUERY_HISTOGRAM_BUCKETS_MS = (1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0)
+
+ENV_PREFIX = 'VACATIONS_'
+# Separates the connection details of a list in an environment variable; a comma may appear inside one,
+# e.g. the hosts of "host=a,b port=5432,5433".
+CONNECTION_LIST_SEPARATOR = ';'
+CONFIG_FILE_VARIABLE = 'VACATIONS_CONFIG_FILE'
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Every tuning knob of the application in one object, defaulting to the constants above.
+
+    The current settings are config.settings, which the DAOs, pools and caches read by attribute when they
+    need a value, so every facade and DAO shares them; the constants above are only the defaults.
+    """
+    db_config: str = DB_CONFIG
+    db_config_tests: str = DB_CONFIG_TESTS
+    db_replicas: Tuple[str, ...] = DB_REPLICAS
+    db_replicas_tests: Tuple[str, ...] = DB_REPLICAS_TESTS
+    pool_min_size: int = POOL_MIN_SIZE
+    pool_max_size: int = POOL_MAX_SIZE
+    pool_max_idle: float = POOL_MAX_IDLE
+    pool_timeout: float = POOL_TIMEOUT
+    prepare_threshold: int = PREPARE_THRESHOLD
+    connect_timeout: int = CONNECT_TIMEOUT
+    statement_timeout_ms: int = STATEMENT_TIMEOUT_MS
+    replica_timeout: float = REPLICA_TIMEOUT
+    replica_retry_seconds: float = REPLICA_RETRY_SECONDS
+    replica_sticky_seconds: float = REPLICA_STICKY_SECONDS
+    bulk_batch_size: int = BULK_BATCH_SIZE
+    copy_batch_size: int = COPY_BATCH_SIZE
+    stream_batch_size: int = STREAM_BATCH_SIZE
+    cache_max_entries: int = CACHE_MAX_ENTRIES
+    cache_max_bytes: int = CACHE_MAX_BYTES
+    vacations_cache_ttl: float = VACATIONS_CACHE_TTL
+    countries_cache_ttl: float = COUNTRIES_CACHE_TTL
+    likes_cache_ttl: float = LIKES_CACHE_TTL
+    password_hash_iterations: int = PASSWORD_HASH_ITERATIONS
+    slow_query_threshold_ms: float = SLOW_QUERY_THRESHOLD_MS
+    query_histogram_buckets_ms: Tuple[float, ...] = QUERY_HISTOGRAM_BUCKETS_MS
+
+
+def _convert(name: str, value: Any, default: Any) -> Any:
+    """
+    Converts a value read from the environment or a file to the type of the setting's default.
+
+    Raises:
+        ValueError: If the value cannot be converted.
+    """
+    try:
+        if isinstance(default, tuple):
+            # Lists of numbers have numeric defaults; an empty default is a list of connection details.
+            numbers = bool(default) and isinstance(default[0], float)
+            items = value
+            if isinstance(value, str):
+                if value.lstrip().startswith('['):
+                    items = json.loads(value)
+                else:
+                    items = value.split(',' if numbers else CONNECTION_LIST_SEPARATOR)
+            if numbers:
+                return tuple(float(item) for item in items)
+            return tuple(str(item).strip() for item in items if str(item).strip())
+        if isinstance(default, str):
+            return str(value)
+        if isinstance(value, float) and isinstance(default, int) and not value.is_integer():
+            raise ValueError(value)
+        return type(default)(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid value for setting {name}: {value!r}.') from None
+
+
+def load_settings(path: Optional[str] = None, environ: Optional[Mapping[str, str]] = None) -> Settings:
+    """
+    Loads the settings from their defaults, then a JSON file, then the environment, each overriding the last.
+
+    The file holds an object keyed by setting name, e.g. {"pool_max_size": 20}. Environment variables are
+    named after the settings with the VACATIONS_ prefix, e.g. VACATIONS_POOL_MAX_SIZE=20. Lists are written as
+    a JSON list, or separated by commas for numbers and by semicolons for connection details, which may
+    contain commas themselves.
+
+    Args:
+        path (Optional[str]): The JSON file to read, defaults to the VACATIONS_CONFIG_FILE variable, if set.
+        environ (Optional[Mapping[str, str]]): The environment to read, defaults to os.environ.
+
+    Returns:
+        Settings: The loaded settings.
+
+    Raises:
+        ValueError: If the file names an unknown setting or a value has the wrong type.
+    """
+    environ = os.environ if environ is None else environ
+    path = path or environ.get(CONFIG_FILE_VARIABLE)
+    defaults = Settings()
+    names = {field.name for field in fields(Settings)}
+    values: Dict[str, Any] = {}
+
+    if path:
+        with open(path, 'r', encoding='utf-8') as file:
+            for name, value in json.load(file).items():
+                if name not in names:
+                    raise ValueError(f'Unknown setting {name} in {path}.')
+                values[name] = _convert(name, value, getattr(defaults, name))
+    for name in names:
+        variable = ENV_PREFIX + name.upper()
+        if variable in environ:
+            values[name] = _convert(variable, environ[variable], getattr(defaults, name))
+    return replace(defaults, **values)
+
+
+def apply_settings(new_settings: Settings) -> None:
+    """
+    Makes the given settings the current ones, config.settings.
+
+    Values are read from config.settings when they are used, except the sizes and timeouts pools and caches
+    are created with; apply settings at startup, before any facade or DAO is created.
+
+    Args:
+        new_settings (Settings): The settings to apply.
+    """
+    global settings
+    settings = new_settings
+
+
+settings = load_settings()
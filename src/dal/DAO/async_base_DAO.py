@@ -0,0 +1,237 @@
+
+
+
+from typing import Union, Tuple, List, Optional, Any
+
+
+
+import psycopg as pg
+from psycopg.rows import AsyncRowFactory, args_row, tuple_row
+
+
+from src.dal.connection_pool import get_async_pool
+from src.dal import instrumentation
+from src.dal.DAO.base_DAO import (build_update_query, build_insert_query, build_select_all_query,
+                                  build_delete_query, build_select_by_id_query, build_exists_query,
+                                  build_projection_query, projection_type, returns_rows)
+
+
+class AsyncBaseDAO:
+    """
+    An asynchronous counterpart of BaseDAO, running the same statements on psycopg AsyncConnections
+    borrowed from the shared asynchronous pool of the connection details.
+
+    On Windows the event loop must be a SelectorEventLoop, as psycopg cannot use the default Proactor loop.
+
+    Attributes:
+        connection_details (str): Details for connecting to the database.
+    """
+
+    def __init__(self, connection_details: str):
+        """
+        Initialize the AsyncBaseDAO with the given connection details.
+
+        Args:
+            connection_details (str): The connection details for the database.
+        """
+        self.connection_details = connection_details
+
+    async def base_connect_and_change_table(self, query: str, params: Optional[Union[Tuple[Any, ...], str]] = None, prepare: Optional[bool] = None, row_factory: Optional[AsyncRowFactory] = None) -> Optional[List[Any]]:
+        """
+        Executes a given SQL query and optionally fetches results if it is a SELECT query.
+
+        Args:
+            query (str): The SQL query to execute.
+            params (Optional[Union[Tuple[Any, ...], str]]): The parameters for the query, if applicable.
+                Can be a tuple with variable types or a single string, or None if no parameters are needed.
+            prepare (Optional[bool]): True to prepare the query server-side on its first execution, False to never
+                prepare it, or None to prepare it once it ran config.settings.prepare_threshold times on the connection.
+            row_factory (Optional[AsyncRowFactory]): A psycopg row factory building each fetched row, e.g.
+                psycopg.rows.args_row(VacationDTO), or None for tuples.
+
+        Returns:
+            Optional[List[Any]]: The results of the query if it is a SELECT query or returns rows
+                through a RETURNING clause, otherwise None.
+        """
+        try:
+            with instrumentation.measure(query) as measurement:
+                pool = await get_async_pool(self.connection_details)
+                async with pool.connection() as connection:
+                    measurement.mark_acquired()
+                    async with connection.cursor(row_factory=row_factory or tuple_row) as cursor:
+                        if isinstance(params, str):
+                            params = (params,)
+                        await cursor.execute(query, params if params else (), prepare=prepare)
+                        measurement.mark_executed()
+
+                        rows = await cursor.fetchall() if returns_rows(query) else None
+                        measurement.mark_fetched(len(rows) if rows is not None else cursor.rowcount)
+                        return rows
+        except pg.DatabaseError as e:
+            print(f"DatabaseError: {e}")  # Log the error
+            raise  # Re-raise the exception for further handling
+        except Exception as e:
+            print(f"Unexpected error: {e}")  # Log the error
+            raise  # Re-raise the exception for further handling
+
+    async def base_update(self, table_name: str, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str], id_column_name: str, id_value: Any) -> int:
+        """
+        Updates a specific record in a table.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Union[Tuple[str, ...], str]): The columns to update, either as a tuple or a single string.
+            values (Union[Tuple[Any, ...], str]): The new values for the columns, either as a tuple or a single value.
+            id_column_name (str): The name of the identifier column.
+            id_value (Any): The identifier value of the record to update, can be of any type.
+
+        Returns:
+            int: The number of records updated, 0 if no record has the identifier.
+        """
+        try:
+            if isinstance(values, str):
+                values = (values,)
+            if isinstance(columns, str):
+                columns = (columns,)
+
+            query = build_update_query(table_name, columns, id_column_name)
+            return len(await self.base_connect_and_change_table(query, values + (id_value,)))
+        except Exception as e:
+            print(f"Unexpected error in base_update: {e}")
+            raise
+
+    async def base_add(self, table_name: str, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str], conflict_columns: Optional[Tuple[str, ...]] = None) -> Optional[bool]:
+        """
+        Inserts a new record into a table.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Union[Tuple[str, ...], str]): The columns to insert values into, as a tuple or single string.
+            values (Union[Tuple[Any, ...], str]): The values to be inserted, as a tuple or single value.
+            conflict_columns (Optional[Tuple[str, ...]]): The columns of a unique constraint; a record clashing
+                with a stored one on them is skipped instead of raising.
+
+        Returns:
+            Optional[bool]: With conflict columns, True if the record was inserted and False if it was skipped,
+                otherwise None.
+        """
+        try:
+            if isinstance(values, str):
+                values = (values,)
+            if isinstance(columns, str):
+                columns = (columns,)
+
+            query = build_insert_query(table_name, columns, conflict_columns)
+            rows = await self.base_connect_and_change_table(query, values)
+            return bool(rows) if conflict_columns else None
+        except pg.DatabaseError as e:
+            print(f"IntegrityError: {e}")
+            raise
+        except Exception as e:
+            print(f"Unexpected error in base_add: {e}")
+            raise
+
+    async def base_print_all(self, table_name: str, order: Optional[str] = None, columns: Optional[Tuple[str, ...]] = None, row_factory: Optional[AsyncRowFactory] = None) -> Optional[List[Any]]:
+        """
+        Retrieves all records from a table.
+
+        Args:
+            table_name (str): The name of the table.
+            order (Optional[str]): An optional ORDER BY clause.
+            columns (Optional[Tuple[str, ...]]): The columns to retrieve, in order, or None for all of them.
+            row_factory (Optional[AsyncRowFactory]): A psycopg row factory building each row, or None for tuples.
+
+        Returns:
+            Optional[List[Any]]: A list of the table rows, as tuples or as built by the row factory.
+        """
+        try:
+            query = build_select_all_query(table_name, order, columns)
+            return await self.base_connect_and_change_table(query, row_factory=row_factory)
+        except Exception as e:
+            print(f"Unexpected error in base_print_all: {e}")
+            raise
+
+    async def base_delete_by_id(self, table_name: str, id_column_name: Union[Tuple[str, ...], str], id_value: Union[Tuple[Any, ...], Any]) -> int:
+        """
+        Deletes a record from a table by ID.
+
+        Args:
+            table_name (str): The name of the table.
+            id_column_name (Union[Tuple[str, ...], str]): The identifier column(s), as a tuple or a single string.
+            id_value (Union[Tuple[Any, ...], Any]): The identifier value(s), as a tuple or a single value.
+
+        Returns:
+            int: The number of records deleted, 0 if no record has the identifier.
+        """
+        try:
+            if not isinstance(id_column_name, tuple):
+                id_value = (id_value,)
+            query = build_delete_query(table_name, id_column_name)
+            return len(await self.base_connect_and_change_table(query, id_value))
+        except Exception as e:
+            print(f"Unexpected error in base_delete_by_id: {e}")
+            raise
+
+    async def base_print_wanted_column_value_by_id(self, table_name: str, column_name: str, id_column_name: Union[Tuple[str, ...], str], id_value: Union[Tuple[Any, ...], Any]) -> Optional[List[Tuple[Any, ...]]]:
+        """
+        Retrieves specific column values from a record by ID.
+
+        Args:
+            table_name (str): The name of the table.
+            column_name (str): The column(s) to retrieve values from.
+            id_column_name (Union[Tuple[str, ...], str]): The identifier column(s), as a tuple or a single string.
+            id_value (Union[Tuple[Any, ...], Any]): The identifier value(s), as a tuple or a single value.
+
+        Returns:
+            Optional[List[Tuple[Any, ...]]]: A list of tuples representing the fetched column values.
+        """
+        try:
+            query = build_select_by_id_query(table_name, column_name, id_column_name)
+            return await self.base_connect_and_change_table(query, id_value)
+        except Exception as e:
+            print(f"Unexpected error in base_print_wanted_column_value_by_id: {e}")
+            raise
+
+    async def base_exists_by(self, table_name: str, column_names: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], Any]) -> bool:
+        """
+        Checks whether a record matching the given column values exists, without fetching any of its columns.
+
+        Args:
+            table_name (str): The name of the table.
+            column_names (Union[Tuple[str, ...], str]): The column(s) to match, as a tuple or a single string.
+            values (Union[Tuple[Any, ...], Any]): The value(s) to match, as a tuple or a single value.
+
+        Returns:
+            bool: True if at least one record matches, False otherwise.
+        """
+        try:
+            if isinstance(column_names, str):
+                column_names, values = (column_names,), (values,)
+            query = build_exists_query(table_name, column_names)
+            return (await self.base_connect_and_change_table(query, values, prepare=True))[0][0]
+        except Exception as e:
+            print(f"Unexpected error in base_exists_by: {e}")
+            raise
+
+    async def base_print_projection_by(self, table_name: str, columns: Tuple[str, ...], column_names: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], Any]) -> List[Tuple[Any, ...]]:
+        """
+        Retrieves only the given columns of the records matching the given column values.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Tuple[str, ...]): The columns to retrieve.
+            column_names (Union[Tuple[str, ...], str]): The column(s) to match, as a tuple or a single string.
+            values (Union[Tuple[Any, ...], Any]): The value(s) to match, as a tuple or a single value.
+
+        Returns:
+            List[Tuple[Any, ...]]: The matching records as named tuples whose fields are the retrieved columns.
+        """
+        try:
+            if isinstance(column_names, str):
+                column_names, values = (column_names,), (values,)
+            query = build_projection_query(table_name, columns, column_names)
+            row_type = projection_type(table_name, columns)
+            return [row_type._make(row) for row in await self.base_connect_and_change_table(query, values, prepare=True)]
+        except Exception as e:
+            print(f"Unexpected error in base_print_projection_by: {e}")
+            raise
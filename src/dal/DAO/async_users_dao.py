@@ -0,0 +1,210 @@
+
+
+
+from src.dal.DAO.async_base_DAO import AsyncBaseDAO, Union, Tuple, List, Any, Optional
+from src.dal.DAO.users_dao import LIKE_QUERY, UNLIKE_QUERY
+from src.dal.cache import QueryCache, shared_cache
+from src import config
+
+
+
+class AsyncUsersDAO(AsyncBaseDAO):
+    """
+    Asynchronous Data Access Object (DAO) class for the 'users' and 'likes' tables, mirroring UsersDAO.
+
+    Attributes:
+        connection_details (str): The connection details for the database.
+        table_name (str): The name of the 'users' table in the database.
+        user_id_column (str): The primary key column name for the users table.
+    """
+
+    def __init__(self, connection_details: str):
+        """
+        Initializes the AsyncUsersDAO with the given connection details.
+
+        Args:
+            connection_details (str): The connection details for the database.
+        """
+        self.connection_details = connection_details
+        self.table_name = 'users'
+        self.user_id_column = 'user_id'
+
+    async def update(self, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str], user_id: str) -> int:
+        """
+        Updates a specific user record in the database.
+
+        Args:
+            columns (Union[Tuple[str, ...], str]): The columns to update, either as a tuple or a single string.
+            values (Union[Tuple[Any, ...], str]): The new values for the columns, either as a tuple or a single value.
+            user_id (str): The unique identifier of the user record to update.
+
+        Returns:
+            int: The number of records updated, 0 if the user does not exist.
+        """
+        return await self.base_update(self.table_name, columns, values,
+                                      self.user_id_column, user_id)
+
+    async def add(self, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str]):
+        """
+        Inserts a new user record into the database, with restrictions for adding admin users.
+
+        Args:
+            columns (Union[Tuple[str, ...], str]): The columns for which values will be inserted.
+            values (Union[Tuple[Any, ...], str]): The values to insert into the specified columns.
+
+        Raises:
+            ValueError: If attempting to insert an admin user ('1') directly through this method.
+        """
+        try:
+            if isinstance(values, tuple):
+                if values[len(values) - 1] == '1':
+                    raise ValueError(
+                        'admins can only be added through the database itself')
+            if values == '1':
+                raise ValueError(
+                    'admins can only be added through the database itself')
+            await self.base_add(self.table_name, columns, values)
+        except Exception as e:
+            print(e)
+
+    async def add_unless_email_registered(self, columns: Tuple[str, ...], values: Tuple[Any, ...]) -> bool:
+        """
+        Inserts a new user record unless a user with the same email exists, in a single statement, so a
+        concurrent registration with the same email cannot slip in between a check and the insert.
+
+        Args:
+            columns (Tuple[str, ...]): The columns for which values will be inserted, including 'email'.
+            values (Tuple[Any, ...]): The values to insert into the specified columns.
+
+        Returns:
+            bool: True if the user was inserted, False if the email is already registered.
+
+        Raises:
+            ValueError: If attempting to insert an admin user ('1') directly through this method.
+        """
+        if values[columns.index('role_id')] in ('1', 1):
+            raise ValueError('admins can only be added through the database itself')
+        return await self.base_add(self.table_name, columns, values, conflict_columns=('email',))
+
+    async def print_wanted_column_value_by_id(self, column_name: str, user_id: str) -> Optional[List[Tuple[Any, ...]]]:
+        """
+        Retrieves specific column values for a user record by its unique identifier.
+
+        Args:
+            column_name (str): The name of the column(s) to retrieve.
+            user_id (str): The unique identifier of the user record.
+
+        Returns:
+            Optional[List[Tuple[Any, ...]]]: A list of tuples representing the fetched column values.
+        """
+        return await self.base_print_wanted_column_value_by_id(
+            self.table_name, column_name, self.user_id_column, user_id
+        )
+
+    async def exists_by_id(self, user_id: str) -> bool:
+        """
+        Checks whether a user record with the given unique identifier exists.
+
+        Args:
+            user_id (str): The unique identifier of the user record.
+
+        Returns:
+            bool: True if the user exists, False otherwise.
+        """
+        return await self.base_exists_by(self.table_name, self.user_id_column, user_id)
+
+    async def like_vacation(self, user_id: str, vacation_id: str) -> bool:
+        """
+        Adds a 'like' for a specific vacation by a user in a single statement.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+            vacation_id (str): The unique identifier of the vacation.
+
+        Returns:
+            bool: True if the like was added, False if the user already liked the vacation.
+        """
+        return bool(await self.base_connect_and_change_table(LIKE_QUERY, (user_id, vacation_id), prepare=True))
+
+    async def unlike_vacation(self, user_id: str, vacation_id: str):
+        """
+        Removes a 'like' for a specific vacation by a user in a single statement.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+            vacation_id (str): The unique identifier of the vacation.
+
+        Raises:
+            ValueError: If attempting to unlike a vacation that was not previously liked.
+        """
+        if not await self.base_connect_and_change_table(UNLIKE_QUERY, (user_id, vacation_id), prepare=True):
+            raise ValueError('Cannot unlike a vacation that was not liked.')
+
+    async def print_login_by_email(self, email: str) -> Optional[Tuple[Any, Any, str]]:
+        """
+        Retrieves only what a login needs for the user with the given email, in a single indexed lookup.
+
+        Args:
+            email (str): The email of the user.
+
+        Returns:
+            Optional[Tuple[Any, Any, str]]: A (user_id, role_id, password) named tuple, or None if the email is not registered.
+        """
+        results = await self.base_print_projection_by(self.table_name, ('user_id', 'role_id', 'password'), 'email', email)
+        return results[0] if results else None
+
+    async def check_if_email_exists(self, email: str) -> bool:
+        """
+        Checks if a given email exists in the users table.
+
+        Args:
+            email (str): The email to check.
+
+        Returns:
+            bool: True if the email exists, False otherwise.
+        """
+        return await self.base_exists_by(self.table_name, 'email', email)
+
+
+class AsyncCachedUsersDAO(AsyncUsersDAO):
+    """
+    An AsyncUsersDAO whose likes and unlikes drop the cached liked set of the user from the likes cache of the
+    CachedUsersDAOs with the same connection details, so UserFacade in the same process reloads it.
+
+    Attributes:
+        cache (QueryCache): The cache the likes invalidate.
+    """
+
+    def __init__(self, connection_details: str, cache: Optional[QueryCache] = None):
+        """
+        Initializes the AsyncCachedUsersDAO with the given connection details.
+
+        Args:
+            connection_details (str): The connection details for the database.
+            cache (Optional[QueryCache]): The cache to invalidate, or None for the likes cache shared by every
+                CachedUsersDAO with the same connection details.
+        """
+        super().__init__(connection_details)
+        self.cache = cache or shared_cache('likes', connection_details, config.settings.likes_cache_ttl)
+
+    async def like_vacation(self, user_id: str, vacation_id: str) -> bool:
+        """
+        Adds a like and drops the cached liked set of the user once it committed.
+        """
+        liked = await super().like_vacation(user_id, vacation_id)
+        self._invalidate_liked(user_id)
+        return liked
+
+    async def unlike_vacation(self, user_id: str, vacation_id: str):
+        """
+        Removes a like and drops the cached liked set of the user once it committed.
+        """
+        await super().unlike_vacation(user_id, vacation_id)
+        self._invalidate_liked(user_id)
+
+    def _invalidate_liked(self, user_id: str) -> None:
+        """
+        Drops the cached liked set of a user.
+        """
+        key = ('liked', str(user_id))
+        self.cache.invalidate(lambda cached_key: cached_key == key)
@@ -0,0 +1,166 @@
+
+
+from src.dal.DAO.async_base_DAO import AsyncBaseDAO, Union, Tuple, List, Any, Optional, args_row
+from src.dal.DAO.vacations_dao import invalidate_vacations, written_vacation_ids
+from src.models.vacations_dto import VacationDTO
+from src.dal.cache import QueryCache, shared_cache
+from src import config
+
+
+class AsyncVacationsDAO(AsyncBaseDAO):
+    """
+    Asynchronous Data Access Object (DAO) class for vacation-related database operations, mirroring VacationsDAO.
+
+    Attributes:
+        connection_details (str): The connection details for the database.
+        table_name (str): The name of the table in the database.
+        id_column (str): The primary key column name for the vacations table.
+        columns (Tuple[str, ...]): The columns of the vacations table, in VacationDTO field order.
+        row_factory (RowFactory): The psycopg row factory building a VacationDTO from each fetched row.
+    """
+
+    def __init__(self, connection_details: str):
+        """
+        Initializes the AsyncVacationsDAO with the given connection details.
+
+        Args:
+            connection_details (str): The connection details for the database.
+        """
+        self.connection_details = connection_details
+        self.table_name = 'vacations'
+        self.id_column = 'vacation_id'
+        self.columns = ('vacation_id', 'country_id', 'vacation_description',
+                        'beginning_date', 'end_date', 'price', 'picture_file_name')
+        self.row_factory = args_row(VacationDTO)
+
+    async def update(self, columns: Union[tuple, str], values: Union[tuple, str], vacation_id: str) -> int:
+        """
+        Updates a specific vacation record in the database.
+
+        Args:
+            columns (Union[tuple, str]): The columns to update.
+            values (Union[tuple, str]): The new values for the columns.
+            vacation_id (str): The unique identifier of the vacation record to update.
+
+        Returns:
+            int: The number of records updated, 0 if the vacation does not exist.
+        """
+        return await self.base_update(self.table_name, columns, values,
+                                      self.id_column, vacation_id)
+
+    async def add(self, columns: Union[tuple, str], values: Union[tuple, str]):
+        """
+        Inserts a new vacation record into the database.
+
+        Args:
+            columns (Union[tuple, str]): The columns for which values will be inserted.
+            values (Union[tuple, str]): The values to insert into the specified columns.
+        """
+        await self.base_add(self.table_name, columns, values)
+
+    async def print_all(self, order: str = None) -> Optional[List[VacationDTO]]:
+        """
+        Retrieves all vacation records from the database.
+
+        Returns:
+            Optional[List[VacationDTO]]: A list of DTOs representing the vacation records.
+        """
+        return await self.base_print_all(self.table_name, order, self.columns, self.row_factory)
+
+    async def delete_by_id(self, vacation_id: str) -> int:
+        """
+        Deletes a vacation record from the database by its unique identifier.
+
+        Args:
+            vacation_id (str): The unique identifier of the vacation record to delete.
+
+        Returns:
+            int: The number of records deleted, 0 if the vacation does not exist.
+        """
+        return await self.base_delete_by_id(self.table_name, self.id_column, vacation_id)
+
+    async def print_wanted_column_value_by_id(self, column_name: str, vacation_id: str) -> Optional[List[Tuple[Any, ...]]]:
+        """
+        Retrieves specific column values for a vacation record by its unique identifier.
+
+        Args:
+            column_name (str): The name of the column(s) to retrieve.
+            vacation_id (str): The unique identifier of the vacation record.
+
+        Returns:
+            Optional[List[Tuple]]: A list of tuples representing the fetched column values.
+        """
+        return await self.base_print_wanted_column_value_by_id(
+            self.table_name, column_name, self.id_column, vacation_id)
+
+    async def exists_by_id(self, vacation_id: str) -> bool:
+        """
+        Checks whether a vacation record with the given unique identifier exists.
+
+        Args:
+            vacation_id (str): The unique identifier of the vacation record.
+
+        Returns:
+            bool: True if the vacation exists, False otherwise.
+        """
+        return await self.base_exists_by(self.table_name, self.id_column, vacation_id)
+
+    async def print_projection_by_id(self, columns: Tuple[str, ...], vacation_id: str) -> Optional[Tuple[Any, ...]]:
+        """
+        Retrieves only the given columns of a vacation record by its unique identifier.
+
+        Args:
+            columns (Tuple[str, ...]): The columns to retrieve.
+            vacation_id (str): The unique identifier of the vacation record.
+
+        Returns:
+            Optional[Tuple[Any, ...]]: A named tuple whose fields are the retrieved columns, or None if the vacation does not exist.
+        """
+        rows = await self.base_print_projection_by(self.table_name, columns, self.id_column, vacation_id)
+        return rows[0] if rows else None
+
+
+class AsyncCachedVacationsDAO(AsyncVacationsDAO):
+    """
+    An AsyncVacationsDAO whose writes invalidate the vacations cache of the CachedVacationsDAOs with the same
+    connection details, so the cached reads of VacationFacade in the same process see them. Its own reads
+    are not cached.
+
+    Attributes:
+        cache (QueryCache): The cache the writes invalidate.
+    """
+
+    def __init__(self, connection_details: str, cache: Optional[QueryCache] = None):
+        """
+        Initializes the AsyncCachedVacationsDAO with the given connection details.
+
+        Args:
+            connection_details (str): The connection details for the database.
+            cache (Optional[QueryCache]): The cache to invalidate, or None for the vacations cache shared by
+                every CachedVacationsDAO with the same connection details.
+        """
+        super().__init__(connection_details)
+        self.cache = cache or shared_cache('vacations', connection_details, config.settings.vacations_cache_ttl)
+
+    async def update(self, columns: Union[tuple, str], values: Union[tuple, str], vacation_id: str) -> int:
+        """
+        Updates a vacation record and drops the cached results it affects once it committed.
+        """
+        updated = await super().update(columns, values, vacation_id)
+        invalidate_vacations(self.cache, (vacation_id, *written_vacation_ids(columns, values)))
+        return updated
+
+    async def add(self, columns: Union[tuple, str], values: Union[tuple, str]):
+        """
+        Inserts a vacation record and drops the cached results it affects once it committed.
+        """
+        await super().add(columns, values)
+        invalidate_vacations(self.cache, written_vacation_ids(columns, values))
+
+    async def delete_by_id(self, vacation_id: str) -> int:
+        """
+        Deletes a vacation record and drops the cached results it affects once it committed.
+        """
+        deleted = await super().delete_by_id(vacation_id)
+        invalidate_vacations(self.cache, (vacation_id,))
+        return deleted
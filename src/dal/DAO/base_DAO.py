@@ -1,16 +1,225 @@
 
 
 
-from typing import Union, Tuple, List, Optional, Any
+from typing import Union, Tuple, List, Dict, Set, Optional, Any, Callable, Hashable, Iterable, Iterator
+import collections
+import dataclasses
+import functools
+import itertools
+import re
 
 
 
 import psycopg as pg
+from psycopg.rows import RowFactory, args_row, tuple_row
+
+
+from src.dal.cache import QueryCache
+from src.dal.connection_pool import connection_for, get_pool_metrics, in_unit_of_work, read_connection_for, record_write, unit_of_work
+from src.dal import instrumentation
+from src.models.upsert_report_dto import UpsertReportDTO
+from src import config
+
+
+# The query builders below are cached, so the SQL text of each (table, columns, operation) shape is built
+# once per process. psycopg keys server-side prepared statements by that text on each pooled connection.
+
+
+_RETURNING_PATTERN = re.compile(r'\breturning\b', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=512)
+def returns_rows(query: str) -> bool:
+    """
+    Tells whether a statement produces rows: a SELECT, or a write with a RETURNING clause.
+
+    The answer comes from the query text, so it is worked out once per query rather than on every cursor.
+    """
+    return query.strip().lower().startswith('select') or _RETURNING_PATTERN.search(query) is not None
+
+
+@functools.lru_cache(maxsize=512)
+def is_read_only(query: str) -> bool:
+    """
+    Tells whether a statement is a plain SELECT, which leaves nothing a later read would need to see.
+    """
+    return query.strip().lower().startswith('select')
+
+
+@functools.lru_cache(maxsize=512)
+def _where_clause(id_column_name: Union[Tuple[str, ...], str]) -> str:
+    """
+    Builds the WHERE condition for one identifier column or a tuple of them.
+    """
+    if isinstance(id_column_name, tuple):
+        id_column_names = ""
+        for i in range(len(id_column_name)):
+            id_column_names += f'{id_column_name[i]} = %s '
+        return id_column_names
+    return f'{id_column_name} = %s'
+
+
+@functools.lru_cache(maxsize=512)
+def build_update_query(table_name: str, columns: Tuple[str, ...], id_column_name: str) -> str:
+    """
+    Builds the UPDATE statement used by base_update, returning a row per updated record.
+    """
+    columns_str = ', '.join([f'{columns[i]} = %s' for i in range(len(columns))])
+    return f'UPDATE {table_name} SET {columns_str} WHERE {id_column_name} = %s RETURNING 1;'
+
+
+@functools.lru_cache(maxsize=512)
+def build_insert_query(table_name: str, columns: Tuple[str, ...], conflict_columns: Optional[Tuple[str, ...]] = None) -> str:
+    """
+    Builds the INSERT statement used by base_add. With conflict columns, a record clashing with a stored
+    one on them is skipped, and a row is returned only if the record was inserted.
+    """
+    placeholders = ', '.join(['%s'] * len(columns))
+    query = f'INSERT INTO {table_name}({", ".join(columns)}) VALUES({placeholders})'
+    if conflict_columns:
+        query += f' ON CONFLICT ({", ".join(conflict_columns)}) DO NOTHING RETURNING 1'
+    return query + ';'
+
+
+@functools.lru_cache(maxsize=512)
+def build_select_all_query(table_name: str, order: Optional[str] = None, columns: Optional[Tuple[str, ...]] = None) -> str:
+    """
+    Builds the SELECT statement used by base_print_all, listing the columns when given so rows mapped to DTOs
+    do not depend on the column order of the table.
+    """
+    return f'SELECT {", ".join(columns) if columns else "*"} FROM {table_name} {order or ""};'
+
+
+@functools.lru_cache(maxsize=512)
+def build_delete_query(table_name: str, id_column_name: Union[Tuple[str, ...], str]) -> str:
+    """
+    Builds the DELETE statement used by base_delete_by_id, returning a row per deleted record.
+    """
+    return f'DELETE FROM {table_name} WHERE {_where_clause(id_column_name)} RETURNING 1;'
+
+
+@functools.lru_cache(maxsize=512)
+def build_select_by_id_query(table_name: str, column_name: str, id_column_name: Union[Tuple[str, ...], str]) -> str:
+    """
+    Builds the SELECT statement used by base_print_wanted_column_value_by_id.
+    """
+    return f'SELECT {column_name} FROM {table_name} WHERE {_where_clause(id_column_name)};'
+
+
+@functools.lru_cache(maxsize=512)
+def build_copy_query(table_name: str, columns: Tuple[str, ...]) -> str:
+    """
+    Builds the COPY statement used by base_copy_from.
+    """
+    return f'COPY {table_name} ({", ".join(columns)}) FROM STDIN'
+
+
+@functools.lru_cache(maxsize=512)
+def build_copy_to_query(table_name: str, columns: Tuple[str, ...], order: str, csv_header: bool = True) -> str:
+    """
+    Builds the COPY ... TO STDOUT statement used by base_copy_to, writing CSV rows in a stable order.
+    """
+    header = ', HEADER' if csv_header else ''
+    return f'COPY (SELECT {", ".join(columns)} FROM {table_name} ORDER BY {order}) TO STDOUT WITH (FORMAT csv{header})'
+
+
+@functools.lru_cache(maxsize=512)
+def build_upsert_query(table_name: str, columns: Tuple[str, ...], conflict_columns: Tuple[str, ...], source: Optional[str] = None) -> str:
+    """
+    Builds the INSERT ... ON CONFLICT DO UPDATE statement used by base_upsert and base_upsert_many.
+
+    New rows are inserted, stored rows are rewritten only when a value differs, and identical rows are left
+    untouched. Each written row returns whether it was inserted: a row version created by an update carries
+    the updating transaction in xmax, a freshly inserted one carries 0.
+
+    Rows come from the VALUES parameters, or from the source table in conflict column order, so concurrent
+    upserts lock rows in the same order. Rows of the source table identical to the stored ones are dropped
+    before the insert, as ON CONFLICT DO UPDATE locks, and so writes WAL for, every conflicting row even
+    when its WHERE condition skips the update. A record repeated in the source table is written once, with
+    its last copied values, as one statement cannot update a row twice; the source table must be filled by
+    a single COPY since it was last truncated, so its physical order is the copy order.
+    """
+    updated = tuple(column for column in columns if column not in conflict_columns)
+    assignments = ', '.join(f'{column} = EXCLUDED.{column}' for column in updated)
+    stored = ', '.join(f'{table_name}.{column}' for column in updated)
+    excluded = ', '.join(f'EXCLUDED.{column}' for column in updated)
+    if source:
+        matches = ' AND '.join(f'stored.{column} = staged.{column}' for column in conflict_columns)
+        stored_values = ', '.join(f'stored.{column}' for column in updated)
+        staged_values = ', '.join(f'staged.{column}' for column in updated)
+        keys = ", ".join(conflict_columns)
+        latest = f'(SELECT DISTINCT ON ({keys}) * FROM {source} ORDER BY {keys}, ctid DESC)'
+        rows = (f'SELECT {", ".join(f"staged.{column}" for column in columns)} FROM {latest} AS staged '
+                f'LEFT JOIN {table_name} AS stored ON {matches} '
+                f'WHERE stored.{conflict_columns[0]} IS NULL OR ({stored_values}) IS DISTINCT FROM ({staged_values}) '
+                f'ORDER BY {", ".join(f"staged.{column}" for column in conflict_columns)}')
+    else:
+        rows = f'VALUES({", ".join(["%s"] * len(columns))})'
+    return (f'INSERT INTO {table_name}({", ".join(columns)}) {rows} '
+            f'ON CONFLICT ({", ".join(conflict_columns)}) DO UPDATE SET {assignments} '
+            f'WHERE ({stored}) IS DISTINCT FROM ({excluded}) RETURNING (xmax = 0) AS inserted')
+
+
+@functools.lru_cache(maxsize=512)
+def _conditions(column_names: Tuple[str, ...]) -> str:
+    """
+    Builds a WHERE condition comparing every given column to a parameter.
+    """
+    return ' AND '.join(f'{column_name} = %s' for column_name in column_names)
+
+
+@functools.lru_cache(maxsize=512)
+def build_exists_query(table_name: str, column_names: Tuple[str, ...]) -> str:
+    """
+    Builds the SELECT EXISTS statement used by base_exists_by.
+    """
+    return f'SELECT EXISTS(SELECT 1 FROM {table_name} WHERE {_conditions(column_names)});'
+
+
+@functools.lru_cache(maxsize=512)
+def build_projection_query(table_name: str, columns: Tuple[str, ...], column_names: Tuple[str, ...]) -> str:
+    """
+    Builds the SELECT statement used by base_print_projection_by.
+    """
+    return f'SELECT {", ".join(columns)} FROM {table_name} WHERE {_conditions(column_names)};'
+
+
+@functools.lru_cache(maxsize=512)
+def projection_type(table_name: str, columns: Tuple[str, ...]) -> type:
+    """
+    Returns the named tuple type of the rows of a projection, e.g. VacationsRow(country_id, price).
+    """
+    type_name = ''.join(part.title() for part in table_name.split('_')) + 'Row'
+    return collections.namedtuple(type_name, columns)
+
+
+def row_values(row: Any) -> Tuple[Any, ...]:
+    """
+    Returns the values of a row given either as a tuple or as a DTO dataclass, in field order.
+    """
+    if dataclasses.is_dataclass(row):
+        return tuple(getattr(row, field.name) for field in dataclasses.fields(row))
+    return tuple(row)
+
+
+def batched(rows: Iterable[Any], batch_size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    """
+    Lazily splits rows into lists of at most batch_size row values, so only one batch is held in memory.
+    """
+    iterator = iter(rows)
+    while True:
+        batch = [row_values(row) for row in itertools.islice(iterator, batch_size)]
+        if not batch:
+            return
+        yield batch
 
 
 class BaseDAO:
     """
     A base Data Access Object (DAO) class providing common database operations.
+
+    Connections are borrowed from the shared pool of the connection details, so every DAO
+    built with the same connection details reuses the same open connections.
     
     Attributes:
         connection_details (str): Details for connecting to the database.
@@ -25,29 +234,43 @@ class BaseDAO:
         """
         self.connection_details = connection_details
 
-    def base_connect_and_change_table(self, query: str, params: Optional[Union[Tuple[Any, ...], str]] = None) -> Optional[List[Tuple[Any, ...]]]:
+    def base_connect_and_change_table(self, query: str, params: Optional[Union[Tuple[Any, ...], str]] = None, prepare: Optional[bool] = None, row_factory: Optional[RowFactory] = None, replica: bool = False) -> Optional[List[Any]]:
         """
         Executes a given SQL query and optionally fetches results if it is a SELECT query.
+
+        The query runs in the open unit of work of this DAO's connection details if there is one, otherwise
+        on a pooled connection in its own transaction. Reads that may lag behind the primary can be sent to
+        one of its read replicas instead, see connection_pool.read_connection_for.
         
         Args:
             query (str): The SQL query to execute.
             params (Optional[Union[Tuple[Any, ...], str]]): The parameters for the query, if applicable.
                 Can be a tuple with variable types or a single string, or None if no parameters are needed.
+            prepare (Optional[bool]): True to prepare the query server-side on its first execution, False to never
+                prepare it, or None to prepare it once it ran config.settings.prepare_threshold times on the connection.
+            row_factory (Optional[RowFactory]): A psycopg row factory building each fetched row, e.g.
+                psycopg.rows.args_row(VacationDTO), or None for tuples.
+            replica (bool): True to run a SELECT on a read replica of this DAO's database, if it has any.
 
         Returns:
-            Optional[List[Tuple[Any, ...]]]: The results of the query if it is a SELECT query, otherwise None.
+            Optional[List[Any]]: The results of the query if it is a SELECT query or returns rows
+                through a RETURNING clause, otherwise None.
         """
         try:
-            with pg.connect(self.connection_details) as connection:
-                with connection.cursor() as cursor:
-                    if isinstance(params, str):
-                        params = (params,)
-                    cursor.execute(query, params if params else ())
+            if not is_read_only(query):
+                record_write(self.connection_details)
+            with instrumentation.measure(query) as measurement:
+                with (read_connection_for if replica else connection_for)(self.connection_details) as connection:
+                    measurement.mark_acquired()
+                    with connection.cursor(row_factory=row_factory or tuple_row) as cursor:
+                        if isinstance(params, str):
+                            params = (params,)
+                        cursor.execute(query, params if params else (), prepare=prepare)
+                        measurement.mark_executed()
 
-                    if query.strip().lower().startswith('select'):
-                        return cursor.fetchall()
-                    connection.commit()
-                    return None
+                        rows = cursor.fetchall() if returns_rows(query) else None
+                        measurement.mark_fetched(len(rows) if rows is not None else cursor.rowcount)
+                        return rows
         except pg.DatabaseError as e:
             print(f"DatabaseError: {e}")  # Log the error
             raise  # Re-raise the exception for further handling
@@ -55,7 +278,120 @@ class BaseDAO:
             print(f"Unexpected error: {e}")  # Log the error
             raise  # Re-raise the exception for further handling
 
-    def base_update(self, table_name: str, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str], id_column_name: str, id_value: Any):
+    def unit_of_work(self):
+        """
+        Opens a unit of work, so every statement of DAOs with the same connection details inside the block
+        shares one pooled connection and one transaction.
+
+        Returns:
+            A context manager yielding the shared connection; it commits when the block ends and rolls back if it raises.
+        """
+        return unit_of_work(self.connection_details)
+
+    def base_pool_metrics(self) -> dict:
+        """
+        Retrieves wait time and saturation metrics of the pool this DAO borrows connections from.
+
+        Returns:
+            dict: The pool statistics, including 'requests_wait_ms_avg' and 'saturation'.
+        """
+        return get_pool_metrics(self.connection_details)
+
+    def base_cached(self, cache: QueryCache, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Serves a read from a cache shared with other requests, or straight from the database inside an open
+        unit of work: such reads may see uncommitted writes, which must not reach the cache in case the unit
+        of work rolls back.
+
+        Args:
+            cache (QueryCache): The cache holding the query results.
+            key (Hashable): The key of the query result.
+            loader (Callable[[], Any]): Runs the query.
+
+        Returns:
+            Any: The query result.
+        """
+        if in_unit_of_work(self.connection_details):
+            return loader()
+        return cache.get_or_load(key, loader)
+
+    def base_stream(self, query: str, params: Optional[Tuple[Any, ...]] = None, batch_size: Optional[int] = None, row_factory: Optional[RowFactory] = None) -> Iterator[Any]:
+        """
+        Yields the rows of a SELECT query through a server-side named cursor, fetching batch_size rows per round trip.
+
+        Only one batch is held in memory at a time. The pooled connection stays borrowed until the generator
+        is exhausted or closed.
+
+        Args:
+            query (str): The SELECT query to run.
+            params (Optional[Tuple[Any, ...]]): The parameters for the query, if applicable.
+            batch_size (Optional[int]): The number of rows fetched per round trip, defaults to config.settings.stream_batch_size.
+            row_factory (Optional[RowFactory]): A psycopg row factory building each row, or None for tuples.
+
+        Yields:
+            Any: The rows of the query, one at a time.
+        """
+        try:
+            with connection_for(self.connection_details) as connection:
+                with connection.cursor(name='base_stream', row_factory=row_factory or tuple_row) as cursor:
+                    cursor.itersize = batch_size or config.settings.stream_batch_size
+                    cursor.execute(query, params if params else ())
+                    yield from cursor
+        except pg.DatabaseError as e:
+            print(f"DatabaseError in base_stream: {e}")
+            raise
+        except Exception as e:
+            print(f"Unexpected error in base_stream: {e}")
+            raise
+
+    def base_copy_to(self, table_name: str, columns: Tuple[str, ...], order: str, csv_header: bool = True) -> Iterator[bytes]:
+        """
+        Yields a table as CSV with COPY ... TO STDOUT, in the blocks the server sends.
+
+        Only one block is held in memory at a time. The pooled connection stays borrowed until the generator
+        is exhausted or closed.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Tuple[str, ...]): The columns to write, in order.
+            order (str): The ORDER BY expression of the rows, e.g. the primary key column.
+            csv_header (bool): True to start with a header line naming the columns.
+
+        Yields:
+            bytes: Consecutive blocks of the CSV text, encoded in the client encoding.
+        """
+        try:
+            query = build_copy_to_query(table_name, columns, order, csv_header)
+            with connection_for(self.connection_details) as connection:
+                with connection.cursor() as cursor:
+                    with cursor.copy(query) as copy:
+                        for block in copy:
+                            yield bytes(block)
+        except pg.DatabaseError as e:
+            print(f"DatabaseError in base_copy_to: {e}")
+            raise
+        except Exception as e:
+            print(f"Unexpected error in base_copy_to: {e}")
+            raise
+
+    def base_stream_json_lines(self, table_name: str, columns: Tuple[str, ...], order: str, batch_size: Optional[int] = None) -> Iterator[str]:
+        """
+        Yields every row of a table as one JSON object, keyed by column name, through base_stream.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Tuple[str, ...]): The columns to include, in order.
+            order (str): The ORDER BY expression of the rows, e.g. the primary key column.
+            batch_size (Optional[int]): The number of rows fetched per round trip, defaults to config.settings.stream_batch_size.
+
+        Yields:
+            str: The JSON text of each row, without a trailing newline.
+        """
+        query = f'SELECT row_to_json(t)::text FROM (SELECT {", ".join(columns)} FROM {table_name} ORDER BY {order}) AS t;'
+        for row in self.base_stream(query, batch_size=batch_size):
+            yield row[0]
+
+    def base_update(self, table_name: str, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str], id_column_name: str, id_value: Any) -> int:
         """
         Updates a specific record in a table.
         
@@ -65,22 +401,24 @@ class BaseDAO:
             values (Union[Tuple[Any, ...], str]): The new values for the columns, either as a tuple or a single value.
             id_column_name (str): The name of the identifier column.
             id_value (Any): The identifier value of the record to update, can be of any type.
+
+        Returns:
+            int: The number of records updated, 0 if no record has the identifier.
         """
         try:
             if isinstance(values, str):
-                values = tuple(values)
+                values = (values,)
             if isinstance(columns, str):
                 columns = (columns,)
 
-            columns_str = ', '.join([f'{columns[i]} = %s' for i in range(len(columns))])
-            query = f'UPDATE {table_name} SET {columns_str} WHERE {id_column_name} = %s;'
+            query = build_update_query(table_name, columns, id_column_name)
             params = values + (id_value,)
-            self.base_connect_and_change_table(query, params)
+            return len(self.base_connect_and_change_table(query, params))
         except Exception as e:
             print(f"Unexpected error in base_update: {e}")
             raise
 
-    def base_add(self, table_name: str, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str]):
+    def base_add(self, table_name: str, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str], conflict_columns: Optional[Tuple[str, ...]] = None) -> Optional[bool]:
         """
         Inserts a new record into a table.
         
@@ -88,6 +426,12 @@ class BaseDAO:
             table_name (str): The name of the table.
             columns (Union[Tuple[str, ...], str]): The columns to insert values into, as a tuple or single string.
             values (Union[Tuple[Any, ...], str]): The values to be inserted, as a tuple or single value.
+            conflict_columns (Optional[Tuple[str, ...]]): The columns of a unique constraint; a record clashing
+                with a stored one on them is skipped instead of raising.
+
+        Returns:
+            Optional[bool]: With conflict columns, True if the record was inserted and False if it was skipped,
+                otherwise None.
         """
         try:
             if isinstance(values, str):
@@ -95,9 +439,9 @@ class BaseDAO:
             if isinstance(columns, str):
                 columns = (columns,)
 
-            placeholders = ', '.join(['%s'] * len(values))
-            query = f'INSERT INTO {table_name}({", ".join(columns)}) VALUES({placeholders});'
-            self.base_connect_and_change_table(query, values)
+            query = build_insert_query(table_name, columns, conflict_columns)
+            rows = self.base_connect_and_change_table(query, values)
+            return bool(rows) if conflict_columns else None
         except pg.DatabaseError as e:
             print(f"IntegrityError: {e}")
             raise
@@ -105,25 +449,27 @@ class BaseDAO:
             print(f"Unexpected error in base_add: {e}")
             raise
 
-    def base_print_all(self, table_name: str, order: Optional[str] = None) -> Optional[List[Tuple[Any, ...]]]:
+    def base_print_all(self, table_name: str, order: Optional[str] = None, columns: Optional[Tuple[str, ...]] = None, row_factory: Optional[RowFactory] = None) -> Optional[List[Any]]:
         """
-        Retrieves all records from a table.
+        Retrieves all records from a table, from a read replica if the database has any.
         
         Args:
             table_name (str): The name of the table.
             order (Optional[str]): An optional ORDER BY clause.
+            columns (Optional[Tuple[str, ...]]): The columns to retrieve, in order, or None for all of them.
+            row_factory (Optional[RowFactory]): A psycopg row factory building each row, or None for tuples.
 
         Returns:
-            Optional[List[Tuple[Any, ...]]]: A list of tuples representing the table rows.
+            Optional[List[Any]]: A list of the table rows, as tuples or as built by the row factory.
         """
         try:
-            query = f'SELECT * FROM {table_name} {order or ""};'
-            return self.base_connect_and_change_table(query)
+            query = build_select_all_query(table_name, order, columns)
+            return self.base_connect_and_change_table(query, row_factory=row_factory, replica=True)
         except Exception as e:
             print(f"Unexpected error in base_print_all: {e}")
             raise
 
-    def base_delete_by_id(self, table_name: str, id_column_name: Union[Tuple[str, ...], str], id_value: Union[Tuple[Any, ...], Any]):
+    def base_delete_by_id(self, table_name: str, id_column_name: Union[Tuple[str, ...], str], id_value: Union[Tuple[Any, ...], Any]) -> int:
         """
         Deletes a record from a table by ID.
         
@@ -131,24 +477,22 @@ class BaseDAO:
             table_name (str): The name of the table.
             id_column_name (Union[Tuple[str, ...], str]): The identifier column(s), as a tuple or a single string.
             id_value (Union[Tuple[Any, ...], Any]): The identifier value(s), as a tuple or a single value.
+
+        Returns:
+            int: The number of records deleted, 0 if no record has the identifier.
         """
         try:
-            if isinstance(id_column_name, tuple):
-                id_column_names = ""
-                for i in range(len(id_column_name)):
-                    id_column_names += f'{id_column_name[i]} = %s ' 
-                query = f'DELETE FROM {table_name} WHERE {id_column_names};'
-            else:
+            if not isinstance(id_column_name, tuple):
                 id_value = (id_value,)
-                query = f'DELETE FROM {table_name} WHERE {id_column_name} = %s;'
-            self.base_connect_and_change_table(query, id_value)
+            query = build_delete_query(table_name, id_column_name)
+            return len(self.base_connect_and_change_table(query, id_value))
         except Exception as e:
             print(f"Unexpected error in base_delete_by_id: {e}")
             raise
 
     def base_print_wanted_column_value_by_id(self, table_name: str, column_name: str, id_column_name: Union[Tuple[str, ...], str], id_value: Union[Tuple[Any, ...], Any]) -> Optional[List[Tuple[Any, ...]]]:
         """
-        Retrieves specific column values from a record by ID.
+        Retrieves specific column values from a record by ID, from a read replica if the database has any.
         
         Args:
             table_name (str): The name of the table.
@@ -160,14 +504,204 @@ class BaseDAO:
             Optional[List[Tuple[Any, ...]]]: A list of tuples representing the fetched column values.
         """
         try:
-            if isinstance(id_column_name, tuple):
-                id_column_names = ""
-                for i in range(len(id_column_name)):
-                    id_column_names += f'{id_column_name[i]} = %s ' 
-                query = f'SELECT {column_name} FROM {table_name} WHERE {id_column_names};'
-            else:
-                query = f'SELECT {column_name} FROM {table_name} WHERE {id_column_name} = %s;'
-            return self.base_connect_and_change_table(query, id_value)
+            query = build_select_by_id_query(table_name, column_name, id_column_name)
+            return self.base_connect_and_change_table(query, id_value, replica=True)
         except Exception as e:
             print(f"Unexpected error in base_print_wanted_column_value_by_id: {e}")
             raise
+
+    def base_exists_by(self, table_name: str, column_names: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], Any]) -> bool:
+        """
+        Checks whether a record matching the given column values exists, without fetching any of its columns.
+
+        Args:
+            table_name (str): The name of the table.
+            column_names (Union[Tuple[str, ...], str]): The column(s) to match, as a tuple or a single string.
+            values (Union[Tuple[Any, ...], Any]): The value(s) to match, as a tuple or a single value.
+
+        Returns:
+            bool: True if at least one record matches, False otherwise.
+        """
+        try:
+            if isinstance(column_names, str):
+                column_names, values = (column_names,), (values,)
+            query = build_exists_query(table_name, column_names)
+            return self.base_connect_and_change_table(query, values, prepare=True)[0][0]
+        except Exception as e:
+            print(f"Unexpected error in base_exists_by: {e}")
+            raise
+
+    def base_print_projection_by(self, table_name: str, columns: Tuple[str, ...], column_names: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], Any], replica: bool = False) -> List[Tuple[Any, ...]]:
+        """
+        Retrieves only the given columns of the records matching the given column values.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Tuple[str, ...]): The columns to retrieve.
+            column_names (Union[Tuple[str, ...], str]): The column(s) to match, as a tuple or a single string.
+            values (Union[Tuple[Any, ...], Any]): The value(s) to match, as a tuple or a single value.
+            replica (bool): True to read from a read replica of this DAO's database, if it has any.
+
+        Returns:
+            List[Tuple[Any, ...]]: The matching records as named tuples whose fields are the retrieved columns.
+        """
+        try:
+            if isinstance(column_names, str):
+                column_names, values = (column_names,), (values,)
+            query = build_projection_query(table_name, columns, column_names)
+            row_type = projection_type(table_name, columns)
+            return [row_type._make(row) for row in self.base_connect_and_change_table(query, values, prepare=True, replica=replica)]
+        except Exception as e:
+            print(f"Unexpected error in base_print_projection_by: {e}")
+            raise
+
+    def base_add_many(self, table_name: str, columns: Tuple[str, ...], rows: Iterable[Any], batch_size: Optional[int] = None) -> int:
+        """
+        Inserts many records into a table on one pooled connection, committing once per batch.
+        Inside a unit of work each batch is a savepoint of its transaction instead.
+
+        Rows are consumed lazily, so a generator of any length can be loaded without building one huge list.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Tuple[str, ...]): The columns to insert values into.
+            rows (Iterable[Any]): The rows to insert, as tuples in column order or as DTOs whose fields follow the columns.
+            batch_size (Optional[int]): The number of rows per executemany call and commit, defaults to config.settings.bulk_batch_size.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        try:
+            query = build_insert_query(table_name, columns)
+            inserted = 0
+            record_write(self.connection_details)
+            with connection_for(self.connection_details) as connection:
+                with connection.cursor() as cursor:
+                    for batch in batched(rows, batch_size or config.settings.bulk_batch_size):
+                        with instrumentation.measure(query) as measurement, connection.transaction():
+                            measurement.mark_acquired()
+                            cursor.executemany(query, batch)
+                            measurement.mark_executed()
+                            measurement.mark_fetched(len(batch))
+                        inserted += len(batch)
+            return inserted
+        except pg.DatabaseError as e:
+            print(f"DatabaseError in base_add_many: {e}")
+            raise
+        except Exception as e:
+            print(f"Unexpected error in base_add_many: {e}")
+            raise
+
+    def base_copy_from(self, table_name: str, columns: Tuple[str, ...], rows: Iterable[Any], batch_size: Optional[int] = None) -> int:
+        """
+        Loads many records into a table with COPY ... FROM STDIN, committing once per batch.
+        Inside a unit of work each batch is a savepoint of its transaction instead.
+
+        Rows are consumed lazily, so a generator of any length can be loaded without building one huge list.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Tuple[str, ...]): The columns to load values into.
+            rows (Iterable[Any]): The rows to load, as tuples in column order or as DTOs whose fields follow the columns.
+            batch_size (Optional[int]): The number of rows per COPY and commit, defaults to config.settings.copy_batch_size.
+
+        Returns:
+            int: The number of rows loaded.
+        """
+        try:
+            query = build_copy_query(table_name, columns)
+            loaded = 0
+            record_write(self.connection_details)
+            with connection_for(self.connection_details) as connection:
+                with connection.cursor() as cursor:
+                    for batch in batched(rows, batch_size or config.settings.copy_batch_size):
+                        with instrumentation.measure(query) as measurement, connection.transaction():
+                            measurement.mark_acquired()
+                            with cursor.copy(query) as copy:
+                                for row in batch:
+                                    copy.write_row(row)
+                            measurement.mark_executed()
+                            measurement.mark_fetched(len(batch))
+                        loaded += len(batch)
+            return loaded
+        except pg.DatabaseError as e:
+            print(f"DatabaseError in base_copy_from: {e}")
+            raise
+        except Exception as e:
+            print(f"Unexpected error in base_copy_from: {e}")
+            raise
+
+    def base_upsert(self, table_name: str, columns: Tuple[str, ...], conflict_columns: Tuple[str, ...], values: Tuple[Any, ...]) -> Optional[bool]:
+        """
+        Inserts a record, or rewrites the stored record with the same conflict columns if any value differs.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Tuple[str, ...]): The columns to write values into.
+            conflict_columns (Tuple[str, ...]): The columns of the unique constraint identifying the record.
+            values (Tuple[Any, ...]): The values, in column order.
+
+        Returns:
+            Optional[bool]: True if the record was inserted, False if it was updated, None if it was unchanged.
+        """
+        try:
+            query = build_upsert_query(table_name, columns, conflict_columns) + ';'
+            rows = self.base_connect_and_change_table(query, values, prepare=True)
+            return rows[0][0] if rows else None
+        except Exception as e:
+            print(f"Unexpected error in base_upsert: {e}")
+            raise
+
+    def base_upsert_many(self, table_name: str, columns: Tuple[str, ...], conflict_columns: Tuple[str, ...], rows: Iterable[Any], batch_size: Optional[int] = None) -> UpsertReportDTO:
+        """
+        Upserts many records, committing once per batch; inside a unit of work each batch is a savepoint.
+
+        Each batch is loaded with COPY into a temporary staging table and merged with one
+        INSERT ... SELECT ... ON CONFLICT DO UPDATE statement that only rewrites changed records, so
+        re-sending unchanged records costs a COPY and a join per record but neither rewrites nor locks them.
+        A batch naming the same record twice writes its last values; the earlier copies count as unchanged.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Tuple[str, ...]): The columns to write values into.
+            conflict_columns (Tuple[str, ...]): The columns of the unique constraint identifying each record.
+            rows (Iterable[Any]): The rows to upsert, as tuples in column order or as DTOs whose fields follow
+                the columns, consumed lazily.
+            batch_size (Optional[int]): The number of rows per staging COPY and commit, defaults to config.settings.copy_batch_size.
+
+        Returns:
+            UpsertReportDTO: The numbers of records inserted, updated and left unchanged.
+        """
+        try:
+            staging = f'{table_name}_staging'
+            create_query = (f'CREATE TEMPORARY TABLE IF NOT EXISTS {staging} '
+                            f'(LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS;')
+            copy_query = build_copy_query(staging, columns)
+            query = (f'WITH written AS ({build_upsert_query(table_name, columns, conflict_columns, staging)}) '
+                     'SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM written;')
+            report = UpsertReportDTO()
+            record_write(self.connection_details)
+            with connection_for(self.connection_details) as connection:
+                with connection.cursor() as cursor:
+                    for batch in batched(rows, batch_size or config.settings.copy_batch_size):
+                        with instrumentation.measure(query) as measurement, connection.transaction():
+                            measurement.mark_acquired()
+                            cursor.execute(create_query)
+                            with cursor.copy(copy_query) as copy:
+                                for row in batch:
+                                    copy.write_row(row)
+                            cursor.execute(query)
+                            inserted, updated = cursor.fetchone()
+                            cursor.execute(f'TRUNCATE {staging};')
+                            measurement.mark_executed()
+                            measurement.mark_fetched(len(batch))
+                        report.inserted += inserted
+                        report.updated += updated
+                        report.unchanged += len(batch) - inserted - updated
+            return report
+        except pg.DatabaseError as e:
+            print(f"DatabaseError in base_upsert_many: {e}")
+            raise
+        except Exception as e:
+            print(f"Unexpected error in base_upsert_many: {e}")
+            raise
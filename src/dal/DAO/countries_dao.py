@@ -1,7 +1,12 @@
 
 
 
-from src.dal.DAO.base_DAO import BaseDAO, Union, Tuple, List, Any, Optional
+from src.dal.DAO.base_DAO import BaseDAO, Union, Tuple, List, Any, Optional, Iterable, args_row, row_values
+from src.models.upsert_report_dto import UpsertReportDTO
+from src.models.countries_dto import CountryDTO
+from src.dal.cache import QueryCache, shared_cache
+from src.dal.connection_pool import after_commit
+from src import config
 
 
 
@@ -14,6 +19,8 @@ class CountriesDAO(BaseDAO):
         connection_details (str): The connection details for the database.
         table_name (str): The name of the table in the database.
         id_column (str): The primary key column name for the countries table.
+        columns (Tuple[str, ...]): The columns of the countries table, in CountryDTO field order.
+        row_factory (RowFactory): The psycopg row factory building a CountryDTO from each fetched row.
     """
 
     def __init__(self, connection_details: str):
@@ -26,6 +33,8 @@ class CountriesDAO(BaseDAO):
         self.connection_details = connection_details
         self.table_name = 'countries'
         self.id_column = 'country_id'
+        self.columns = ('country_id', 'country_name')
+        self.row_factory = args_row(CountryDTO)
 
     def update(self, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str], country_id: str):
         """
@@ -49,14 +58,14 @@ class CountriesDAO(BaseDAO):
         """
         self.base_add(self.table_name, columns, values)
 
-    def print_all(self):
+    def print_all(self) -> Optional[List[CountryDTO]]:
         """
         Retrieves all country records from the database.
 
         Returns:
-            Optional[List[Tuple[Any, ...]]]: A list of tuples representing the country records.
+            Optional[List[CountryDTO]]: A list of DTOs representing the country records.
         """
-        self.base_print_all(self.table_name)
+        return self.base_print_all(self.table_name, columns=self.columns, row_factory=self.row_factory)
 
     def delete_by_id(self, country_id: str):
         """
@@ -79,3 +88,192 @@ class CountriesDAO(BaseDAO):
             Optional[List[Tuple[Any, ...]]]: A list of tuples representing the fetched column values.
         """
         return self.base_print_wanted_column_value_by_id(self.table_name, column_name, self.id_column, country_id)
+
+    def exists_by_id(self, country_id: str) -> bool:
+        """
+        Checks whether a country record with the given unique identifier exists.
+
+        Args:
+            country_id (str): The unique identifier of the country record.
+
+        Returns:
+            bool: True if the country exists, False otherwise.
+        """
+        return self.base_exists_by(self.table_name, self.id_column, country_id)
+
+    def add_many(self, countries: Iterable[CountryDTO], batch_size: Optional[int] = None) -> int:
+        """
+        Inserts many country records with batched executemany calls.
+
+        Args:
+            countries (Iterable[CountryDTO]): The country DTOs to insert, consumed lazily.
+            batch_size (Optional[int]): The number of rows per batch and commit.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        return self.base_add_many(self.table_name, self.columns, countries, batch_size)
+
+    def copy_from(self, countries: Iterable[CountryDTO], batch_size: Optional[int] = None) -> int:
+        """
+        Loads many country records with COPY ... FROM STDIN.
+
+        Args:
+            countries (Iterable[CountryDTO]): The country DTOs to load, consumed lazily.
+            batch_size (Optional[int]): The number of rows per COPY and commit.
+
+        Returns:
+            int: The number of rows loaded.
+        """
+        return self.base_copy_from(self.table_name, self.columns, countries, batch_size)
+
+    def upsert(self, country: CountryDTO) -> Optional[bool]:
+        """
+        Inserts a country record, or rewrites the stored one with the same ID if any of its values differs.
+
+        Args:
+            country (CountryDTO): The country DTO to write.
+
+        Returns:
+            Optional[bool]: True if the record was inserted, False if it was updated, None if it was unchanged.
+        """
+        return self.base_upsert(self.table_name, self.columns, (self.id_column,), row_values(country))
+
+    def upsert_many(self, countries: Iterable[CountryDTO], batch_size: Optional[int] = None) -> UpsertReportDTO:
+        """
+        Upserts many country records, rewriting only the stored ones whose values differ.
+
+        Args:
+            countries (Iterable[CountryDTO]): The country DTOs to write, consumed lazily.
+            batch_size (Optional[int]): The number of rows per batch and commit.
+
+        Returns:
+            UpsertReportDTO: The numbers of records inserted, updated and left unchanged.
+        """
+        return self.base_upsert_many(self.table_name, self.columns, (self.id_column,), countries, batch_size)
+
+
+class CachedCountriesDAO(CountriesDAO):
+    """
+    A CountriesDAO that serves print_all and print_wanted_column_value_by_id from an in-process QueryCache.
+
+    Writes made through any cached DAO of the process with the same connection details invalidate the
+    affected cached results, as they share one cache. Writes made elsewhere become visible once the cached
+    results expire.
+    Reads inside a unit of work bypass the cache, as they may see its uncommitted writes.
+
+    Attributes:
+        cache (QueryCache): The cache holding the query results.
+    """
+
+    def __init__(self, connection_details: str, cache: Optional[QueryCache] = None):
+        """
+        Initializes the CachedCountriesDAO with the given connection details.
+
+        Args:
+            connection_details (str): The connection details for the database.
+            cache (Optional[QueryCache]): The cache to use, or None for the countries cache shared by every
+                CachedCountriesDAO with the same connection details.
+        """
+        super().__init__(connection_details)
+        self.cache = cache or shared_cache('countries', connection_details, config.settings.countries_cache_ttl)
+
+    def update(self, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str], country_id: str):
+        """
+        Updates a country record and drops the cached results it affects.
+        """
+        super().update(columns, values, country_id)
+        self._invalidate(country_id, *self._new_ids(columns, values))
+
+    def add(self, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str]):
+        """
+        Inserts a country record and drops the cached results it affects.
+        """
+        super().add(columns, values)
+        self._invalidate(*self._new_ids(columns, values))
+
+    def delete_by_id(self, country_id: str):
+        """
+        Deletes a country record and drops the cached results it affects.
+        """
+        super().delete_by_id(country_id)
+        self._invalidate(country_id)
+
+    def add_many(self, countries: Iterable[CountryDTO], batch_size: Optional[int] = None) -> int:
+        """
+        Inserts many country records and clears the cache.
+        """
+        try:
+            return super().add_many(countries, batch_size)
+        finally:
+            self.cache.clear()
+            after_commit(self.connection_details, self.cache.clear)
+
+    def copy_from(self, countries: Iterable[CountryDTO], batch_size: Optional[int] = None) -> int:
+        """
+        Loads many country records with COPY and clears the cache.
+        """
+        try:
+            return super().copy_from(countries, batch_size)
+        finally:
+            self.cache.clear()
+            after_commit(self.connection_details, self.cache.clear)
+
+    def upsert(self, country: CountryDTO) -> Optional[bool]:
+        """
+        Upserts a country record and drops the cached results it affects, if it was written.
+        """
+        written = super().upsert(country)
+        if written is not None:
+            self._invalidate(country.country_id)
+        return written
+
+    def upsert_many(self, countries: Iterable[CountryDTO], batch_size: Optional[int] = None) -> UpsertReportDTO:
+        """
+        Upserts many country records and clears the cache.
+        """
+        try:
+            return super().upsert_many(countries, batch_size)
+        finally:
+            self.cache.clear()
+            after_commit(self.connection_details, self.cache.clear)
+
+    def print_all(self) -> Optional[List[CountryDTO]]:
+        load = super().print_all
+        return self.base_cached(self.cache, ('print_all',), load)
+
+    def print_wanted_column_value_by_id(self, column_name: str, country_id: str) -> Optional[List[Tuple[Any, ...]]]:
+        load = super().print_wanted_column_value_by_id
+        return self.base_cached(self.cache, ('by_id', str(country_id), column_name), lambda: load(column_name, country_id))
+
+    def cache_stats(self) -> dict:
+        """
+        Returns the hit, miss and eviction counters of the cache.
+
+        Returns:
+            dict: The counters and current usage of the cache.
+        """
+        return self.cache.stats()
+
+    def _new_ids(self, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str]) -> Tuple[str, ...]:
+        """
+        Returns the country ID written by an add or update, if the id column is among the columns.
+        """
+        if isinstance(columns, str):
+            columns, values = (columns,), (values,)
+        if self.id_column in columns:
+            return (str(values[columns.index(self.id_column)]),)
+        return ()
+
+    def _invalidate(self, *country_ids: Any) -> None:
+        """
+        Drops the cached listings and the cached lookups of the given country IDs, and again once the open
+        unit of work commits, so reads made before the commit cannot leave stale results behind.
+        """
+        ids = {str(country_id) for country_id in country_ids}
+
+        def invalidate():
+            self.cache.invalidate(lambda key: key[0] == 'print_all' or key[1] in ids)
+
+        invalidate()
+        after_commit(self.connection_details, invalidate)
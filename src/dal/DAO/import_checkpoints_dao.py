@@ -0,0 +1,72 @@
+
+
+
+from src.dal.DAO.base_DAO import BaseDAO, Optional, args_row
+from src.models.import_checkpoints_dto import ImportCheckpointDTO
+
+
+
+
+class ImportCheckpointsDAO(BaseDAO):
+    """
+    Data Access Object (DAO) class for the 'import_checkpoints' table, which remembers how far the import of
+    each file got so an interrupted import can resume.
+
+    Attributes:
+        connection_details (str): The connection details for the database.
+        table_name (str): The name of the table in the database.
+        id_column (str): The primary key column name, the absolute path of the imported file.
+        columns (Tuple[str, ...]): The columns of the table, in ImportCheckpointDTO field order.
+        row_factory (RowFactory): The psycopg row factory building an ImportCheckpointDTO from each fetched row.
+    """
+
+    def __init__(self, connection_details: str):
+        """
+        Initializes the ImportCheckpointsDAO with the given connection details.
+
+        Args:
+            connection_details (str): The connection details for the database.
+        """
+        self.connection_details = connection_details
+        self.table_name = 'import_checkpoints'
+        self.id_column = 'source'
+        self.columns = ('source', 'entity', 'file_size', 'rows_done', 'imported', 'rejected', 'completed')
+        self.row_factory = args_row(ImportCheckpointDTO)
+
+    def print_by_source(self, source: str) -> Optional[ImportCheckpointDTO]:
+        """
+        Retrieves the checkpoint of one imported file.
+
+        Args:
+            source (str): The absolute path of the file.
+
+        Returns:
+            Optional[ImportCheckpointDTO]: The checkpoint, or None if the file was never imported.
+        """
+        query = f'SELECT {", ".join(self.columns)} FROM {self.table_name} WHERE {self.id_column} = %s;'
+        rows = self.base_connect_and_change_table(query, (source,), prepare=True, row_factory=self.row_factory)
+        return rows[0] if rows else None
+
+    def save(self, checkpoint: ImportCheckpointDTO) -> None:
+        """
+        Inserts or replaces the checkpoint of a file. Called in the unit of work that loads a batch, so the
+        checkpoint only moves forward when the batch is committed.
+
+        Args:
+            checkpoint (ImportCheckpointDTO): The checkpoint to store.
+        """
+        updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in self.columns[1:])
+        query = (f'INSERT INTO {self.table_name}({", ".join(self.columns)}) VALUES({", ".join(["%s"] * len(self.columns))}) '
+                 f'ON CONFLICT ({self.id_column}) DO UPDATE SET {updates}, updated_at = now();')
+        self.base_connect_and_change_table(query, (
+            checkpoint.source, checkpoint.entity, checkpoint.file_size, checkpoint.rows_done,
+            checkpoint.imported, checkpoint.rejected, checkpoint.completed), prepare=True)
+
+    def delete_by_source(self, source: str) -> None:
+        """
+        Forgets the checkpoint of a file, so its next import starts from the first row.
+
+        Args:
+            source (str): The absolute path of the file.
+        """
+        self.base_delete_by_id(self.table_name, self.id_column, source)
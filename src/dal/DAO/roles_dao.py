@@ -78,3 +78,14 @@ class RolesDAO(BaseDAO):
         """
         return self.base_print_wanted_column_value_by_id(self.table_name, column_name, self.id_column, role_id)
 
+    def exists_by_id(self, role_id: str) -> bool:
+        """
+        Checks whether a role record with the given unique identifier exists.
+
+        Args:
+            role_id (str): The unique identifier of the role record.
+
+        Returns:
+            bool: True if the role exists, False otherwise.
+        """
+        return self.base_exists_by(self.table_name, self.id_column, role_id)
@@ -1,8 +1,21 @@
 
 
 
-from src.dal.DAO.base_DAO import BaseDAO, Union, Tuple, List, Any, Optional
+from typing import Callable, FrozenSet
 
+from src.dal.DAO.base_DAO import BaseDAO, Union, Tuple, List, Set, Any, Optional, Iterable, Iterator, args_row
+from src.models.users_dto import UserDTO
+from src.dal.cache import QueryCache, shared_cache
+from src.dal.connection_pool import after_commit, in_unit_of_work
+from src import config
+
+
+# The statements on the likes of a user, shared with AsyncUsersDAO and the index check of src.dal.migrate.
+LIKE_QUERY = 'INSERT INTO likes(user_id, vacation_id) VALUES(%s, %s) ON CONFLICT DO NOTHING RETURNING vacation_id;'
+UNLIKE_QUERY = 'DELETE FROM likes WHERE user_id = %s AND vacation_id = %s RETURNING vacation_id;'
+UNLIKE_ALL_QUERY = 'DELETE FROM likes WHERE user_id = %s RETURNING vacation_id;'
+LIKED_VACATIONS_QUERY = 'SELECT vacation_id FROM likes WHERE user_id = %s;'
+LIKED_AMONG_QUERY = 'SELECT vacation_id FROM likes WHERE user_id = %s AND vacation_id = ANY(%s);'
 
 
 class UsersDAO(BaseDAO):
@@ -13,6 +26,8 @@ class UsersDAO(BaseDAO):
         connection_details (str): The connection details for the database.
         table_name (str): The name of the 'users' table in the database.
         user_id_column (str): The primary key column name for the users table.
+        columns (Tuple[str, ...]): The columns of the users table, in UserDTO field order.
+        row_factory (RowFactory): The psycopg row factory building a UserDTO from each fetched row.
     """
 
     def __init__(self, connection_details: str):
@@ -25,8 +40,10 @@ class UsersDAO(BaseDAO):
         self.connection_details = connection_details
         self.table_name = 'users'
         self.user_id_column = 'user_id'
+        self.columns = ('user_id', 'first_name', 'last_name', 'email', 'password', 'role_id')
+        self.row_factory = args_row(UserDTO)
 
-    def update(self, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str], user_id: str):
+    def update(self, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str], user_id: str) -> int:
         """
         Updates a specific user record in the database.
 
@@ -34,9 +51,12 @@ class UsersDAO(BaseDAO):
             columns (Union[Tuple[str, ...], str]): The columns to update, either as a tuple or a single string.
             values (Union[Tuple[Any, ...], str]): The new values for the columns, either as a tuple or a single value.
             user_id (str): The unique identifier of the user record to update.
+
+        Returns:
+            int: The number of records updated, 0 if the user does not exist.
         """
-        self.base_update(self.table_name, columns, values,
-                         self.user_id_column, user_id)
+        return self.base_update(self.table_name, columns, values,
+                                self.user_id_column, user_id)
 
     def add(self, columns: Union[Tuple[str, ...], str], values: Union[Tuple[Any, ...], str]):
         """
@@ -61,23 +81,45 @@ class UsersDAO(BaseDAO):
         except Exception as e:
             print(e)
 
-    def print_all(self) -> Optional[List[Tuple[Any, ...]]]:
+    def add_unless_email_registered(self, columns: Tuple[str, ...], values: Tuple[Any, ...]) -> bool:
+        """
+        Inserts a new user record unless a user with the same email exists, in a single statement, so a
+        concurrent registration with the same email cannot slip in between a check and the insert.
+
+        Args:
+            columns (Tuple[str, ...]): The columns for which values will be inserted, including 'email'.
+            values (Tuple[Any, ...]): The values to insert into the specified columns.
+
+        Returns:
+            bool: True if the user was inserted, False if the email is already registered.
+
+        Raises:
+            ValueError: If attempting to insert an admin user ('1') directly through this method.
+        """
+        if values[columns.index('role_id')] in ('1', 1):
+            raise ValueError('admins can only be added through the database itself')
+        return self.base_add(self.table_name, columns, values, conflict_columns=('email',))
+
+    def print_all(self) -> Optional[List[UserDTO]]:
         """
         Retrieves all user records from the database.
 
         Returns:
-            Optional[List[Tuple[Any, ...]]]: A list of tuples representing the user records.
+            Optional[List[UserDTO]]: A list of DTOs representing the user records.
         """
-        return self.base_print_all(self.table_name)
+        return self.base_print_all(self.table_name, columns=self.columns, row_factory=self.row_factory)
 
-    def delete_by_id(self, user_id: str):
+    def delete_by_id(self, user_id: str) -> int:
         """
         Deletes a user record from the database by its unique identifier.
 
         Args:
             user_id (str): The unique identifier of the user record to delete.
+
+        Returns:
+            int: The number of records deleted, 0 if the user does not exist.
         """
-        self.base_delete_by_id(self.table_name, self.user_id_column, user_id)
+        return self.base_delete_by_id(self.table_name, self.user_id_column, user_id)
 
     def print_wanted_column_value_by_id(self, column_name: str, user_id: str) -> Optional[List[Tuple[Any, ...]]]:
         """
@@ -94,20 +136,34 @@ class UsersDAO(BaseDAO):
             self.table_name, column_name, self.user_id_column, user_id
         )
 
-    def like_vacation(self, user_id: str, vacation_id: str):
+    def exists_by_id(self, user_id: str) -> bool:
+        """
+        Checks whether a user record with the given unique identifier exists.
+
+        Args:
+            user_id (str): The unique identifier of the user record.
+
+        Returns:
+            bool: True if the user exists, False otherwise.
+        """
+        return self.base_exists_by(self.table_name, self.user_id_column, user_id)
+
+    def like_vacation(self, user_id: str, vacation_id: str) -> bool:
         """
-        Adds a 'like' for a specific vacation by a user.
+        Adds a 'like' for a specific vacation by a user in a single statement.
 
         Args:
             user_id (str): The unique identifier of the user.
             vacation_id (str): The unique identifier of the vacation.
+
+        Returns:
+            bool: True if the like was added, False if the user already liked the vacation.
         """
-        self.base_add('likes', (self.user_id_column,
-                      'vacation_id'), (user_id, vacation_id))
+        return bool(self.base_connect_and_change_table(LIKE_QUERY, (user_id, vacation_id), prepare=True))
 
     def unlike_vacation(self, user_id: str, vacation_id: Optional[str]):
         """
-        Removes a 'like' for a specific vacation by a user.
+        Removes a 'like' for a specific vacation by a user in a single statement.
 
         Args:
             user_id (str): The unique identifier of the user.
@@ -117,36 +173,25 @@ class UsersDAO(BaseDAO):
             ValueError: If attempting to unlike a vacation that was not previously liked.
         """
         if vacation_id is None:
-            results = self.base_connect_and_change_table(
-                "SELECT * FROM likes WHERE user_id = %s AND vacation_id = %s", (
-                    user_id, vacation_id)
-            )
-            if not results:
-                raise ValueError(
-                    'Cannot unlike a vacation that was not liked.')
-            return self.base_delete_by_id('likes', self.user_id_column, user_id)
-
-        results = self.base_connect_and_change_table(
-            "SELECT * FROM likes WHERE user_id = %s AND vacation_id = %s", (
-                user_id, vacation_id)
-        )
+            results = self.base_connect_and_change_table(UNLIKE_ALL_QUERY, (user_id,))
+        else:
+            results = self.base_connect_and_change_table(UNLIKE_QUERY, (user_id, vacation_id), prepare=True)
         if not results:
             raise ValueError('Cannot unlike a vacation that was not liked.')
-        return self.base_delete_by_id('likes', ('vacation_id', ' AND ' + self.user_id_column), (vacation_id, user_id))
 
-    def print_user_by_email_and_password(self, email: str, password: str) -> Optional[List[Tuple[Any, ...]]]:
+    def print_login_by_email(self, email: str) -> Optional[Tuple[Any, Any, str]]:
         """
-        Retrieves a user record by email and password.
+        Retrieves only what a login needs for the user with the given email, in a single indexed lookup
+        served by a read replica if the database has any.
 
         Args:
             email (str): The email of the user.
-            password (str): The password of the user.
 
         Returns:
-            Optional[List[Tuple[Any, ...]]]: A list of tuples representing the user record.
+            Optional[Tuple[Any, Any, str]]: A (user_id, role_id, password) named tuple, or None if the email is not registered.
         """
-        query = f'SELECT * FROM {self.table_name} WHERE email = %s AND password = %s'
-        return self.base_connect_and_change_table(query, (email, password))
+        results = self.base_print_projection_by(self.table_name, ('user_id', 'role_id', 'password'), 'email', email, replica=True)
+        return results[0] if results else None
 
     def check_if_email_exists(self, email: str) -> bool:
         """
@@ -158,9 +203,7 @@ class UsersDAO(BaseDAO):
         Returns:
             bool: True if the email exists, False otherwise.
         """
-        query = f'SELECT * FROM {self.table_name} WHERE email = %s'
-        results = self.base_connect_and_change_table(query, email)
-        return bool(results)
+        return self.base_exists_by(self.table_name, 'email', email)
 
     def likes_print_wanted_column_value_by_id(self, user_id: str, vacation_id: str) -> Optional[List[Tuple[Any, ...]]]:
         """
@@ -177,3 +220,152 @@ class UsersDAO(BaseDAO):
             'likes', 'user_id, vacation_id', (self.user_id_column,
                                               ' AND vacation_id'), (user_id, vacation_id)
         )
+
+    def print_liked_vacation_ids(self, user_id: str, vacation_ids: Optional[List[int]] = None) -> Set[int]:
+        """
+        Retrieves which vacations a user liked, in a single query however many vacations are checked.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+            vacation_ids (Optional[List[int]]): The vacations to check, or None for every vacation the user liked.
+
+        Returns:
+            Set[int]: The IDs of the liked vacations.
+        """
+        if vacation_ids is None:
+            rows = self.base_connect_and_change_table(LIKED_VACATIONS_QUERY, (user_id,), prepare=True)
+        else:
+            rows = self.base_connect_and_change_table(LIKED_AMONG_QUERY, (user_id, list(vacation_ids)), prepare=True)
+        return {row[0] for row in rows}
+
+    def _reject_admins(self, users: Iterable[UserDTO]) -> Iterator[UserDTO]:
+        """
+        Passes users through lazily, refusing admins just like add does.
+
+        Raises:
+            ValueError: If one of the users is an admin.
+        """
+        for user in users:
+            if str(user.role_id) == '1':
+                raise ValueError('admins can only be added through the database itself')
+            yield user
+
+    def add_many(self, users: Iterable[UserDTO], batch_size: Optional[int] = None) -> int:
+        """
+        Inserts many user records with batched executemany calls.
+
+        Args:
+            users (Iterable[UserDTO]): The user DTOs to insert, consumed lazily.
+            batch_size (Optional[int]): The number of rows per batch and commit.
+
+        Returns:
+            int: The number of rows inserted.
+
+        Raises:
+            ValueError: If one of the users is an admin.
+        """
+        return self.base_add_many(self.table_name, self.columns, self._reject_admins(users), batch_size)
+
+    def copy_from(self, users: Iterable[UserDTO], batch_size: Optional[int] = None) -> int:
+        """
+        Loads many user records with COPY ... FROM STDIN.
+
+        Args:
+            users (Iterable[UserDTO]): The user DTOs to load, consumed lazily.
+            batch_size (Optional[int]): The number of rows per COPY and commit.
+
+        Returns:
+            int: The number of rows loaded.
+
+        Raises:
+            ValueError: If one of the users is an admin.
+        """
+        return self.base_copy_from(self.table_name, self.columns, self._reject_admins(users), batch_size)
+
+
+class CachedUsersDAO(UsersDAO):
+    """
+    A UsersDAO that keeps the set of vacations each user liked in an in-process QueryCache, so "is liked"
+    checks for a whole listing are answered from memory.
+
+    Likes and unlikes made through any CachedUsersDAO of the process with the same connection details update
+    the cached set once they commit, as they share one cache. Likes removed elsewhere,
+    for example when a vacation is deleted, become visible once the cached set expires.
+    Reads inside a unit of work bypass the cache, as they may see its uncommitted writes.
+
+    Attributes:
+        cache (QueryCache): The cache holding the liked sets.
+    """
+
+    def __init__(self, connection_details: str, cache: Optional[QueryCache] = None):
+        """
+        Initializes the CachedUsersDAO with the given connection details.
+
+        Args:
+            connection_details (str): The connection details for the database.
+            cache (Optional[QueryCache]): The cache to use, or None for the likes cache shared by every
+                CachedUsersDAO with the same connection details.
+        """
+        super().__init__(connection_details)
+        self.cache = cache or shared_cache('likes', connection_details, config.settings.likes_cache_ttl)
+
+    def print_liked_vacation_ids(self, user_id: str, vacation_ids: Optional[List[int]] = None) -> Set[int]:
+        """
+        Retrieves which vacations a user liked, from the cached liked set when possible.
+        """
+        load = super().print_liked_vacation_ids
+        liked = self.base_cached(self.cache, ('liked', str(user_id)), lambda: frozenset(load(user_id)))
+        if vacation_ids is None:
+            return set(liked)
+        return set(liked.intersection(vacation_ids))
+
+    def like_vacation(self, user_id: str, vacation_id: str) -> bool:
+        """
+        Likes a vacation and adds it to the cached liked set of the user.
+        """
+        added = super().like_vacation(user_id, vacation_id)
+        if added:
+            self._change_liked(user_id, lambda liked: liked | {int(vacation_id)})
+        return added
+
+    def unlike_vacation(self, user_id: str, vacation_id: Optional[str]):
+        """
+        Removes a like, or all likes of the user, and updates the cached liked set of the user.
+        """
+        super().unlike_vacation(user_id, vacation_id)
+        if vacation_id is None:
+            self._change_liked(user_id, lambda liked: frozenset())
+        else:
+            self._change_liked(user_id, lambda liked: liked - {int(vacation_id)})
+
+    def delete_by_id(self, user_id: str) -> int:
+        """
+        Deletes a user record and drops the cached liked set of the user.
+        """
+        deleted = super().delete_by_id(user_id)
+        self._change_liked(user_id, lambda liked: frozenset())
+        return deleted
+
+    def cache_stats(self) -> dict:
+        """
+        Returns the hit, miss and eviction counters of the cache.
+
+        Returns:
+            dict: The counters and current usage of the cache.
+        """
+        return self.cache.stats()
+
+    def _change_liked(self, user_id: str, change: Callable[[FrozenSet[int]], FrozenSet[int]]) -> None:
+        """
+        Applies a change to the cached liked set of a user. Inside a unit of work the set is dropped right away,
+        so reads in the transaction see its own writes, and the change becomes a reload after the commit.
+        """
+        key = ('liked', str(user_id))
+        if in_unit_of_work(self.connection_details):
+            def invalidate():
+                self.cache.invalidate(lambda cached_key: cached_key == key)
+
+            invalidate()
+            after_commit(self.connection_details, invalidate)
+        else:
+            self.cache.update(key, change)
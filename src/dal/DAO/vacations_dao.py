@@ -1,6 +1,81 @@
 
 
-from src.dal.DAO.base_DAO import BaseDAO, Union, Tuple, List, Any, Optional
+from src.dal.DAO.base_DAO import BaseDAO, Union, Tuple, List, Dict, Any, Optional, Iterable, Iterator, args_row, row_values
+from src.models.country_summary_dto import CountrySummaryDTO
+from src.models.upsert_report_dto import UpsertReportDTO
+from src.models.vacations_dto import VacationDTO
+from src.dal.cache import QueryCache, shared_cache
+from src.dal.connection_pool import after_commit
+from src import config
+
+import datetime
+import functools
+
+
+# Must match the expression of the GIN index on vacations in the migrations, or the index is not used.
+DESCRIPTION_TSVECTOR = "to_tsvector('english', COALESCE(vacation_description, ''))"
+
+# The condition of every search filter, in the order they are combined.
+SEARCH_CONDITIONS = {
+    'after': '(beginning_date, vacation_id) > (%s, %s)',
+    'date_from': 'end_date >= %s',
+    'date_to': 'beginning_date <= %s',
+    'min_price': 'price >= %s',
+    'max_price': 'price <= %s',
+    'country_id': 'country_id = %s',
+    'text': f"{DESCRIPTION_TSVECTOR} @@ websearch_to_tsquery('english', %s)",
+    'starts_after': 'beginning_date > %s',
+    'active_on': 'beginning_date <= %s AND end_date >= %s',
+}
+LIKE_COUNTS_QUERY = 'SELECT vacation_id, like_count FROM vacation_like_counts WHERE vacation_id = ANY(%s);'
+UPCOMING_PER_COUNTRY_QUERY = (
+    'SELECT co.country_id, co.country_name, SUM(s.vacation_count)::INT, MIN(s.min_price), MIN(s.beginning_date) '
+    'FROM vacation_day_summaries s JOIN countries co USING (country_id) '
+    'WHERE s.beginning_date >= %s AND s.vacation_count > 0 '
+    'GROUP BY co.country_id, co.country_name ORDER BY co.country_name;')
+
+
+@functools.lru_cache(maxsize=512)
+def build_search_query(columns: Tuple[str, ...], filters: Tuple[str, ...] = ()) -> str:
+    """
+    Builds the SELECT statement of one page of vacations ordered by beginning date, used by print_page and
+    search. It takes the parameters of the given filters, in SEARCH_CONDITIONS order, then the page size.
+    """
+    conditions = [condition for name, condition in SEARCH_CONDITIONS.items() if name in filters]
+    where = f'WHERE {" AND ".join(conditions)} ' if conditions else ''
+    return f'SELECT {", ".join(columns)} FROM vacations {where}ORDER BY beginning_date, vacation_id LIMIT %s;'
+
+
+@functools.lru_cache(maxsize=512)
+def build_most_liked_query(columns: Tuple[str, ...]) -> str:
+    """
+    Builds the SELECT statement used by print_most_liked, reading the like counters instead of the likes.
+    """
+    return (f'SELECT {", ".join(f"v.{column}" for column in columns)}, c.like_count FROM vacation_like_counts c '
+            'JOIN vacations v USING (vacation_id) WHERE c.like_count > 0 '
+            'ORDER BY c.like_count DESC, c.vacation_id LIMIT %s;')
+
+
+def invalidate_vacations(cache: QueryCache, vacation_ids: Iterable[Any]) -> int:
+    """
+    Drops the cached listings and the cached lookups of the given vacation IDs from a vacations cache.
+
+    Returns:
+        int: The number of results dropped.
+    """
+    ids = {str(vacation_id) for vacation_id in vacation_ids}
+    return cache.invalidate(lambda key: key[0] == 'print_all' or key[1] in ids)
+
+
+def written_vacation_ids(columns: Union[tuple, str], values: Union[tuple, str]) -> Tuple[str, ...]:
+    """
+    Returns the vacation ID written by an add or update, if vacation_id is among the columns.
+    """
+    if isinstance(columns, str):
+        columns, values = (columns,), (values,)
+    if 'vacation_id' in columns:
+        return (str(values[columns.index('vacation_id')]),)
+    return ()
 
 
 class VacationsDAO(BaseDAO):
@@ -11,6 +86,8 @@ class VacationsDAO(BaseDAO):
         connection_details (str): The connection details for the database.
         table_name (str): The name of the table in the database.
         id_column (str): The primary key column name for the vacations table.
+        columns (Tuple[str, ...]): The columns of the vacations table, in VacationDTO field order.
+        row_factory (RowFactory): The psycopg row factory building a VacationDTO from each fetched row.
     """
     
     def __init__(self, connection_details: str):
@@ -23,8 +100,11 @@ class VacationsDAO(BaseDAO):
         self.connection_details = connection_details
         self.table_name = 'vacations'
         self.id_column = 'vacation_id'
+        self.columns = ('vacation_id', 'country_id', 'vacation_description',
+                        'beginning_date', 'end_date', 'price', 'picture_file_name')
+        self.row_factory = args_row(VacationDTO)
 
-    def update(self, columns: Union[tuple, str], values: Union[tuple, str], vacation_id: str):
+    def update(self, columns: Union[tuple, str], values: Union[tuple, str], vacation_id: str) -> int:
         """
         Updates a specific vacation record in the database.
         
@@ -32,9 +112,12 @@ class VacationsDAO(BaseDAO):
             columns (Union[tuple, str]): The columns to update.
             values (Union[tuple, str]): The new values for the columns.
             vacation_id (str): The unique identifier of the vacation record to update.
+
+        Returns:
+            int: The number of records updated, 0 if the vacation does not exist.
         """
-        self.base_update(self.table_name, columns, values,
-                         self.id_column, vacation_id)
+        return self.base_update(self.table_name, columns, values,
+                                self.id_column, vacation_id)
 
     def add(self, columns: Union[tuple, str], values: Union[tuple, str]):
         """
@@ -46,23 +129,26 @@ class VacationsDAO(BaseDAO):
         """
         self.base_add(self.table_name, columns, values)
 
-    def print_all(self, order:str = None):
+    def print_all(self, order:str = None) -> Optional[List[VacationDTO]]:
         """
         Retrieves all vacation records from the database.
         
         Returns:
-            Optional[List[Tuple]]: A list of tuples representing the vacation records.
+            Optional[List[VacationDTO]]: A list of DTOs representing the vacation records.
         """
-        return self.base_print_all(self.table_name, order)
+        return self.base_print_all(self.table_name, order, self.columns, self.row_factory)
 
-    def delete_by_id(self, vacation_id: str):
+    def delete_by_id(self, vacation_id: str) -> int:
         """
         Deletes a vacation record from the database by its unique identifier.
         
         Args:
             vacation_id (str): The unique identifier of the vacation record to delete.
+
+        Returns:
+            int: The number of records deleted, 0 if the vacation does not exist.
         """
-        self.base_delete_by_id(self.table_name, self.id_column, vacation_id)
+        return self.base_delete_by_id(self.table_name, self.id_column, vacation_id)
 
     def print_wanted_column_value_by_id(self, column_name: str, vacation_id: str):
         """
@@ -77,3 +163,359 @@ class VacationsDAO(BaseDAO):
         """
         return self.base_print_wanted_column_value_by_id(
             self.table_name, column_name, self.id_column, vacation_id)
+
+    def exists_by_id(self, vacation_id: str) -> bool:
+        """
+        Checks whether a vacation record with the given unique identifier exists.
+
+        Args:
+            vacation_id (str): The unique identifier of the vacation record.
+
+        Returns:
+            bool: True if the vacation exists, False otherwise.
+        """
+        return self.base_exists_by(self.table_name, self.id_column, vacation_id)
+
+    def print_projection_by_id(self, columns: Tuple[str, ...], vacation_id: str) -> Optional[Tuple[Any, ...]]:
+        """
+        Retrieves only the given columns of a vacation record by its unique identifier.
+
+        Args:
+            columns (Tuple[str, ...]): The columns to retrieve.
+            vacation_id (str): The unique identifier of the vacation record.
+
+        Returns:
+            Optional[Tuple[Any, ...]]: A named tuple whose fields are the retrieved columns, or None if the vacation does not exist.
+        """
+        rows = self.base_print_projection_by(self.table_name, columns, self.id_column, vacation_id)
+        return rows[0] if rows else None
+
+    def add_many(self, vacations: Iterable[VacationDTO], batch_size: Optional[int] = None) -> int:
+        """
+        Inserts many vacation records with batched executemany calls.
+
+        Args:
+            vacations (Iterable[VacationDTO]): The vacation DTOs to insert, consumed lazily.
+            batch_size (Optional[int]): The number of rows per batch and commit.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        return self.base_add_many(self.table_name, self.columns, vacations, batch_size)
+
+    def copy_from(self, vacations: Iterable[VacationDTO], batch_size: Optional[int] = None) -> int:
+        """
+        Loads many vacation records with COPY ... FROM STDIN.
+
+        Args:
+            vacations (Iterable[VacationDTO]): The vacation DTOs to load, consumed lazily.
+            batch_size (Optional[int]): The number of rows per COPY and commit.
+
+        Returns:
+            int: The number of rows loaded.
+        """
+        return self.base_copy_from(self.table_name, self.columns, vacations, batch_size)
+
+    def upsert(self, vacation: VacationDTO) -> Optional[bool]:
+        """
+        Inserts a vacation record, or rewrites the stored one with the same ID if any of its values differs.
+
+        Args:
+            vacation (VacationDTO): The vacation DTO to write.
+
+        Returns:
+            Optional[bool]: True if the record was inserted, False if it was updated, None if it was unchanged.
+        """
+        return self.base_upsert(self.table_name, self.columns, (self.id_column,), row_values(vacation))
+
+    def upsert_many(self, vacations: Iterable[VacationDTO], batch_size: Optional[int] = None) -> UpsertReportDTO:
+        """
+        Upserts many vacation records, rewriting only the stored ones whose values differ.
+
+        Args:
+            vacations (Iterable[VacationDTO]): The vacation DTOs to write, consumed lazily.
+            batch_size (Optional[int]): The number of rows per batch and commit.
+
+        Returns:
+            UpsertReportDTO: The numbers of records inserted, updated and left unchanged.
+        """
+        return self.base_upsert_many(self.table_name, self.columns, (self.id_column,), vacations, batch_size)
+
+    def print_page(self, page_size: int, after: Optional[Tuple[Any, Any]] = None) -> Optional[List[VacationDTO]]:
+        """
+        Retrieves one page of vacation records ordered by beginning date, using keyset pagination.
+
+        Args:
+            page_size (int): The maximum number of records to retrieve.
+            after (Optional[Tuple[Any, Any]]): The (beginning_date, vacation_id) of the last record of the previous
+                page, or None for the first page.
+
+        Returns:
+            Optional[List[VacationDTO]]: A list of DTOs representing the vacation records.
+        """
+        if after is None:
+            return self.base_connect_and_change_table(build_search_query(self.columns), (page_size,), row_factory=self.row_factory)
+        query = build_search_query(self.columns, ('after',))
+        return self.base_connect_and_change_table(query, (after[0], after[1], page_size), row_factory=self.row_factory)
+
+    def stream_all(self, batch_size: Optional[int] = None) -> Iterator[VacationDTO]:
+        """
+        Yields every vacation record ordered by beginning date through a server-side cursor.
+
+        Args:
+            batch_size (Optional[int]): The number of records fetched per round trip.
+
+        Yields:
+            VacationDTO: The vacation records, one at a time.
+        """
+        query = f'SELECT {", ".join(self.columns)} FROM {self.table_name} ORDER BY beginning_date, {self.id_column};'
+        return self.base_stream(query, batch_size=batch_size, row_factory=self.row_factory)
+
+    def search(self, page_size: int, after: Optional[Tuple[Any, Any]] = None, date_from: Optional[datetime.date] = None,
+               date_to: Optional[datetime.date] = None, min_price: Optional[int] = None, max_price: Optional[int] = None,
+               country_id: Optional[int] = None, text: Optional[str] = None, starts_after: Optional[datetime.date] = None,
+               active_on: Optional[datetime.date] = None) -> List[VacationDTO]:
+        """
+        Retrieves one page of the vacations matching every given filter, ordered by beginning date, using keyset
+        pagination. Filters left as None are not applied.
+
+        Every filter maps to an index: the dates to the beginning and end date indexes, the price to the price
+        index, the country to the country index and the text to the GIN index on the description's tsvector.
+
+        Args:
+            page_size (int): The maximum number of records to retrieve.
+            after (Optional[Tuple[Any, Any]]): The (beginning_date, vacation_id) of the last record of the previous
+                page, or None for the first page.
+            date_from (Optional[datetime.date]): Only vacations ending on or after this date.
+            date_to (Optional[datetime.date]): Only vacations beginning on or before this date.
+            min_price (Optional[int]): Only vacations costing at least this price.
+            max_price (Optional[int]): Only vacations costing at most this price.
+            country_id (Optional[int]): Only vacations in this country.
+            text (Optional[str]): Words that the description must contain, in web search syntax.
+            starts_after (Optional[datetime.date]): Only vacations beginning after this date.
+            active_on (Optional[datetime.date]): Only vacations taking place on this date.
+
+        Returns:
+            List[VacationDTO]: The matching vacation records.
+        """
+        values = {'after': after, 'date_from': date_from, 'date_to': date_to, 'min_price': min_price, 'max_price': max_price,
+                  'country_id': country_id, 'text': text, 'starts_after': starts_after,
+                  'active_on': (active_on, active_on) if active_on else None}
+        filters = tuple(name for name in SEARCH_CONDITIONS if values[name] is not None)
+        params: List[Any] = []
+        for name in filters:
+            params.extend(values[name] if isinstance(values[name], tuple) else (values[name],))
+        query = build_search_query(self.columns, filters)
+        return self.base_connect_and_change_table(query, tuple(params) + (page_size,), row_factory=self.row_factory)
+
+    def print_most_liked(self, limit: int) -> List[Tuple[VacationDTO, int]]:
+        """
+        Retrieves the most liked vacations from the maintained like counters, without aggregating the likes table.
+
+        Args:
+            limit (int): The maximum number of vacations to retrieve.
+
+        Returns:
+            List[Tuple[VacationDTO, int]]: (vacation, like count) pairs, most liked first.
+        """
+        rows = self.base_connect_and_change_table(build_most_liked_query(self.columns), (limit,), prepare=True)
+        return [(VacationDTO(*row[:-1]), row[-1]) for row in rows]
+
+    def print_like_counts(self, vacation_ids: List[int]) -> Dict[int, int]:
+        """
+        Retrieves the like counts of many vacations in one query.
+
+        Args:
+            vacation_ids (List[int]): The unique identifiers of the vacations.
+
+        Returns:
+            Dict[int, int]: The like count of every given vacation, 0 for vacations without likes.
+        """
+        counts = dict.fromkeys(vacation_ids, 0)
+        counts.update(self.base_connect_and_change_table(LIKE_COUNTS_QUERY, (list(vacation_ids),), prepare=True))
+        return counts
+
+    def print_likes_per_country(self) -> List[Tuple[Any, ...]]:
+        """
+        Sums the like counters of the vacations of every country.
+
+        Returns:
+            List[Tuple[Any, ...]]: (country_id, country_name, likes) rows, most liked countries first.
+        """
+        query = (f'SELECT co.country_id, co.country_name, COALESCE(SUM(c.like_count), 0) AS likes '
+                 f'FROM countries co LEFT JOIN {self.table_name} v ON v.country_id = co.country_id '
+                 f'LEFT JOIN vacation_like_counts c ON c.{self.id_column} = v.{self.id_column} '
+                 f'GROUP BY co.country_id, co.country_name ORDER BY likes DESC, co.country_id;')
+        return self.base_connect_and_change_table(query)
+
+    def print_upcoming_per_country(self, date_from: datetime.date) -> List[CountrySummaryDTO]:
+        """
+        Summarizes the vacations beginning on or after a date per country, from the per-day summaries the
+        vacations triggers maintain, so the vacations table is not aggregated. Served by a read replica if
+        the database has any.
+
+        Args:
+            date_from (datetime.date): The first beginning date counted, usually today.
+
+        Returns:
+            List[CountrySummaryDTO]: One summary per country with such vacations, ordered by country name.
+        """
+        return self.base_connect_and_change_table(UPCOMING_PER_COUNTRY_QUERY, (date_from,), prepare=True,
+                                                  row_factory=args_row(CountrySummaryDTO), replica=True)
+
+    def refresh_day_summaries(self) -> int:
+        """
+        Rebuilds the per-day summaries from the vacations, repairing any drift and removing the days left
+        without vacations.
+
+        Like REFRESH MATERIALIZED VIEW CONCURRENTLY, the refresh merges the recomputed summaries into the
+        stored ones in one transaction instead of replacing the table: readers keep reading the previous
+        summaries until it commits, while vacation writes wait for it. Only the summaries that differ are
+        rewritten.
+
+        Returns:
+            int: The number of summaries rewritten or removed.
+        """
+        with self.unit_of_work():
+            self.base_connect_and_change_table('LOCK TABLE vacation_day_summaries IN EXCLUSIVE MODE;')
+            written = self.base_connect_and_change_table(
+                'WITH written AS (INSERT INTO vacation_day_summaries AS stored (country_id, beginning_date, vacation_count, min_price) '
+                f'SELECT country_id, beginning_date, COUNT(*), MIN(price) FROM {self.table_name} '
+                'WHERE country_id IS NOT NULL AND beginning_date IS NOT NULL GROUP BY country_id, beginning_date '
+                'ON CONFLICT (country_id, beginning_date) DO UPDATE SET vacation_count = EXCLUDED.vacation_count, min_price = EXCLUDED.min_price '
+                'WHERE (stored.vacation_count, stored.min_price) IS DISTINCT FROM (EXCLUDED.vacation_count, EXCLUDED.min_price) '
+                'RETURNING 1) SELECT COUNT(*) FROM written;')[0][0]
+            removed = self.base_connect_and_change_table(
+                'WITH removed AS (DELETE FROM vacation_day_summaries s WHERE NOT EXISTS '
+                f'(SELECT 1 FROM {self.table_name} v WHERE v.country_id = s.country_id AND v.beginning_date = s.beginning_date) '
+                'RETURNING 1) SELECT COUNT(*) FROM removed;')[0][0]
+        return written + removed
+
+
+class CachedVacationsDAO(VacationsDAO):
+    """
+    A VacationsDAO that serves its reads from an in-process QueryCache.
+
+    Writes made through any cached DAO of the process with the same connection details invalidate the
+    affected cached results, as they share one cache. Writes made elsewhere become visible once the cached
+    results expire. Existence checks are not cached, since writes rely on them.
+    Reads inside a unit of work bypass the cache, as they may see its uncommitted writes.
+
+    Attributes:
+        cache (QueryCache): The cache holding the query results.
+    """
+
+    def __init__(self, connection_details: str, cache: Optional[QueryCache] = None):
+        """
+        Initializes the CachedVacationsDAO with the given connection details.
+
+        Args:
+            connection_details (str): The connection details for the database.
+            cache (Optional[QueryCache]): The cache to use, or None for the vacations cache shared by every
+                CachedVacationsDAO with the same connection details.
+        """
+        super().__init__(connection_details)
+        self.cache = cache or shared_cache('vacations', connection_details, config.settings.vacations_cache_ttl)
+
+    def update(self, columns: Union[tuple, str], values: Union[tuple, str], vacation_id: str) -> int:
+        """
+        Updates a vacation record and drops the cached results it affects.
+        """
+        updated = super().update(columns, values, vacation_id)
+        self._invalidate(vacation_id, *written_vacation_ids(columns, values))
+        return updated
+
+    def add(self, columns: Union[tuple, str], values: Union[tuple, str]):
+        """
+        Inserts a vacation record and drops the cached results it affects.
+        """
+        super().add(columns, values)
+        self._invalidate(*written_vacation_ids(columns, values))
+
+    def delete_by_id(self, vacation_id: str) -> int:
+        """
+        Deletes a vacation record and drops the cached results it affects.
+        """
+        deleted = super().delete_by_id(vacation_id)
+        self._invalidate(vacation_id)
+        return deleted
+
+    def add_many(self, vacations: Iterable[VacationDTO], batch_size: Optional[int] = None) -> int:
+        """
+        Inserts many vacation records and clears the cache.
+        """
+        try:
+            return super().add_many(vacations, batch_size)
+        finally:
+            self.cache.clear()
+            after_commit(self.connection_details, self.cache.clear)
+
+    def copy_from(self, vacations: Iterable[VacationDTO], batch_size: Optional[int] = None) -> int:
+        """
+        Loads many vacation records with COPY and clears the cache.
+        """
+        try:
+            return super().copy_from(vacations, batch_size)
+        finally:
+            self.cache.clear()
+            after_commit(self.connection_details, self.cache.clear)
+
+    def upsert(self, vacation: VacationDTO) -> Optional[bool]:
+        """
+        Upserts a vacation record and drops the cached results it affects, if it was written.
+        """
+        written = super().upsert(vacation)
+        if written is not None:
+            self._invalidate(vacation.vacation_id)
+        return written
+
+    def upsert_many(self, vacations: Iterable[VacationDTO], batch_size: Optional[int] = None) -> UpsertReportDTO:
+        """
+        Upserts many vacation records and clears the cache.
+        """
+        try:
+            return super().upsert_many(vacations, batch_size)
+        finally:
+            self.cache.clear()
+            after_commit(self.connection_details, self.cache.clear)
+
+    def print_all(self, order: str = None) -> Optional[List[VacationDTO]]:
+        """
+        Retrieves all vacation records, from the cache when possible.
+        """
+        load = super().print_all
+        return self.base_cached(self.cache, ('print_all', order), lambda: load(order))
+
+    def print_wanted_column_value_by_id(self, column_name: str, vacation_id: str):
+        """
+        Retrieves specific column values for a vacation record, from the cache when possible.
+        """
+        load = super().print_wanted_column_value_by_id
+        return self.base_cached(self.cache, ('by_id', str(vacation_id), column_name), lambda: load(column_name, vacation_id))
+
+    def print_projection_by_id(self, columns: Tuple[str, ...], vacation_id: str) -> Optional[Tuple[Any, ...]]:
+        """
+        Retrieves only the given columns of a vacation record, from the cache when possible.
+        """
+        load = super().print_projection_by_id
+        return self.base_cached(self.cache, ('projection', str(vacation_id), columns), lambda: load(columns, vacation_id))
+
+    def cache_stats(self) -> dict:
+        """
+        Returns the hit, miss and eviction counters of the cache.
+
+        Returns:
+            dict: The counters and current usage of the cache.
+        """
+        return self.cache.stats()
+
+    def _invalidate(self, *vacation_ids: Any) -> None:
+        """
+        Drops the cached listings and the cached lookups of the given vacation IDs, and again once the open
+        unit of work commits, so reads made before the commit cannot leave stale results behind.
+        """
+        def invalidate():
+            invalidate_vacations(self.cache, vacation_ids)
+
+        invalidate()
+        after_commit(self.connection_details, invalidate)
@@ -0,0 +1,252 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import sys
+import threading
+import time
+
+
+from src import config
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Roughly estimates the memory used by a query result: the list, its rows and their values.
+
+    Args:
+        value (Any): The cached value, usually a list of row tuples or slotted DTOs, or a set of IDs.
+
+    Returns:
+        int: The estimated size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += sys.getsizeof(item)
+            if isinstance(item, tuple):
+                size += sum(sys.getsizeof(element) for element in item)
+            elif hasattr(item, '__slots__'):
+                size += sum(sys.getsizeof(getattr(item, slot)) for slot in item.__slots__)
+    return size
+
+
+class QueryCache:
+    """
+    An in-process, thread-safe cache for query results with a time-to-live, least-recently-used
+    eviction and a bounded memory budget.
+
+    Attributes:
+        max_entries (int): The maximum number of cached results.
+        ttl (float): Seconds a cached result stays valid.
+        max_bytes (int): The approximate memory budget for all cached results, in bytes.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that had to be loaded.
+        evictions (int): The number of results evicted to respect max_entries or max_bytes.
+        expirations (int): The number of results dropped because their time-to-live passed.
+        invalidations (int): The number of results dropped by invalidate or clear.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, max_bytes: int):
+        """
+        Initializes an empty QueryCache.
+
+        Args:
+            max_entries (int): The maximum number of cached results.
+            ttl (float): Seconds a cached result stays valid.
+            max_bytes (int): The approximate memory budget for all cached results, in bytes.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Hashable, tuple[float, int, Any]]" = OrderedDict()
+        self._size = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached result for a key, loading and caching it on a miss or after it expired.
+
+        Args:
+            key (Hashable): The key of the query result.
+            loader (Callable[[], Any]): Runs the query when the result is not cached.
+
+        Returns:
+            Any: The query result. Lists are returned as shallow copies so callers cannot alter the cache.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._copy(entry[2])
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+        self._store(key, value, generation)
+        return self._copy(value)
+
+    def update(self, key: Hashable, change: Callable[[Any], Any]) -> bool:
+        """
+        Replaces a cached result with a changed copy, so a write can keep it current instead of dropping it.
+
+        Loads running at the same time are not cached, as they may have read the database before the write.
+        A result that grew is subject to the same limits as a loaded one: it is dropped if it no longer fits
+        the memory budget, and other results are evicted if the budget is exceeded.
+
+        Args:
+            key (Hashable): The key of the query result.
+            change (Callable[[Any], Any]): Returns the new result from the cached one.
+
+        Returns:
+            bool: True if the result was cached and changed, False if there was nothing to change.
+        """
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return False
+            value = change(entry[2])
+            size = estimate_size(value)
+            self._remove(key)
+            if size > self.max_bytes:
+                self.evictions += 1
+                return True
+            self._entries[key] = (entry[0], size, value)
+            self._size += size
+            self._evict()
+            return True
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Drops every cached result whose key matches the predicate.
+
+        Args:
+            predicate (Callable[[Hashable], bool]): Returns True for the keys to drop.
+
+        Returns:
+            int: The number of results dropped.
+        """
+        with self._lock:
+            self._generation += 1
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """
+        Drops every cached result.
+        """
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters and current usage.
+
+        Returns:
+            Dict[str, int]: The hits, misses, evictions, expirations and invalidations counters,
+                plus the current number of entries and estimated bytes.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._size,
+            }
+
+    def _store(self, key: Hashable, value: Any, generation: int) -> None:
+        """
+        Caches a loaded result, evicting the least recently used results until the limits are respected.
+
+        The result is not cached if an invalidation happened while it was loading, since it may be stale.
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._size += size
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Evicts the least recently used results until the entry and memory limits are respected. The lock must be held.
+        """
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        """
+        Removes a cached result and releases its share of the memory budget. The lock must be held.
+        """
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    @staticmethod
+    def _copy(value: Optional[Any]) -> Optional[Any]:
+        """
+        Returns a shallow copy of list results, and any other value unchanged.
+        """
+        return list(value) if isinstance(value, list) else value
+
+
+_shared_caches: Dict[Tuple[str, str], "QueryCache"] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def shared_cache(name: str, connection_details: str, ttl: float) -> QueryCache:
+    """
+    Returns the cache of the given name for a database, shared by every cached DAO of the process with the
+    same connection details, so a write made through one of them invalidates what the others read.
+
+    The cache is created on first use, with the entry and memory limits of config.settings.
+
+    Args:
+        name (str): What the cache holds, e.g. 'vacations'.
+        connection_details (str): The connection details for the database.
+        ttl (float): Seconds a cached result stays valid, used when the cache is created.
+
+    Returns:
+        QueryCache: The shared cache.
+    """
+    with _shared_caches_lock:
+        cache = _shared_caches.get((name, connection_details))
+        if cache is None:
+            cache = QueryCache(config.settings.cache_max_entries, ttl, config.settings.cache_max_bytes)
+            _shared_caches[(name, connection_details)] = cache
+        return cache
+
+
+def reset_shared_caches() -> None:
+    """
+    Empties and forgets every shared cache, e.g. once the database they cache was reset. Cached DAOs created
+    afterwards get new caches, with counters from zero and the limits of the current settings.
+    """
+    with _shared_caches_lock:
+        caches = list(_shared_caches.values())
+        _shared_caches.clear()
+    for cache in caches:
+        cache.clear()
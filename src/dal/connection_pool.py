@@ -0,0 +1,492 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Any, Sequence, Tuple
+import asyncio
+import itertools
+import threading
+import time
+
+import psycopg as pg
+from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
+
+from src import config
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_async_pools: Dict[Tuple[str, asyncio.AbstractEventLoop], Tuple["asyncio.Future[AsyncConnectionPool]", asyncio.Task]] = {}
+
+
+class _UnitOfWork:
+    """
+    The connection shared by the statements of one unit of work, and the callbacks to run once it commits.
+
+    A bound unit stands for a connection handed over with bind_connection, whose transaction belongs to the
+    caller; depth counts the units of work currently open on it.
+    """
+
+    def __init__(self, connection: pg.Connection, bound: bool = False):
+        self.connection = connection
+        self.after_commit: List[Callable[[], None]] = []
+        self.bound = bound
+        self.depth = 0
+
+
+_units_of_work: ContextVar[Optional[Dict[str, _UnitOfWork]]] = ContextVar('units_of_work', default=None)
+
+
+class _ReplicaSet:
+    """
+    The read replicas of one primary, handed out round robin, and until when each replica that failed is
+    skipped.
+    """
+
+    def __init__(self, replicas: Sequence[str]):
+        self.replicas = tuple(replicas)
+        self.down_until: Dict[str, float] = {}
+        self._turns = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List[str]:
+        """
+        Returns the replicas not marked down, starting with the one whose turn it is.
+        """
+        with self._lock:
+            start = next(self._turns)
+        now = time.monotonic()
+        ordered = self.replicas[start % len(self.replicas):] + self.replicas[:start % len(self.replicas)]
+        return [replica for replica in ordered if self.down_until.get(replica, 0.0) <= now]
+
+    def mark_down(self, replica: str) -> None:
+        self.down_until[replica] = time.monotonic() + config.settings.replica_retry_seconds
+
+    def mark_up(self, replica: str) -> None:
+        self.down_until.pop(replica, None)
+
+
+_replica_sets: Dict[str, _ReplicaSet] = {}
+# When the current context last wrote through each primary, so its reads can see their own writes.
+_last_writes: ContextVar[Optional[Dict[str, float]]] = ContextVar('last_writes', default=None)
+
+
+def _connection_kwargs() -> Dict[str, Any]:
+    """
+    Returns the connection settings from src.config shared by the pooled connections of both kinds of pools.
+    """
+    kwargs: Dict[str, Any] = {'prepare_threshold': config.settings.prepare_threshold}
+    if config.settings.connect_timeout:
+        kwargs['connect_timeout'] = config.settings.connect_timeout
+    if config.settings.statement_timeout_ms:
+        kwargs['options'] = f'-c statement_timeout={config.settings.statement_timeout_ms}'
+    return kwargs
+
+
+def _create_pool(connection_details: str, min_size: Optional[int] = None, max_size: Optional[int] = None,
+                 max_idle: Optional[float] = None, timeout: Optional[float] = None) -> ConnectionPool:
+    """
+    Opens a new connection pool, falling back to the values in src.config for any setting not provided.
+
+    Pooled connections outlive single statements, so queries executed config.settings.prepare_threshold times on a
+    connection are prepared server-side and later executions skip parsing and planning. Statements running
+    longer than config.settings.statement_timeout_ms are cancelled by the server.
+    """
+    return ConnectionPool(
+        connection_details,
+        min_size=min_size if min_size is not None else config.settings.pool_min_size,
+        max_size=max_size if max_size is not None else config.settings.pool_max_size,
+        max_idle=max_idle if max_idle is not None else config.settings.pool_max_idle,
+        timeout=timeout if timeout is not None else config.settings.pool_timeout,
+        kwargs=_connection_kwargs(),
+        check=ConnectionPool.check_connection,
+        open=True,
+    )
+
+
+def get_pool(connection_details: str) -> ConnectionPool:
+    """
+    Returns the shared connection pool for the given connection details, creating it on first use.
+
+    Every DAO built with the same connection details borrows connections from the same pool.
+
+    Args:
+        connection_details (str): The connection details for the database.
+
+    Returns:
+        ConnectionPool: The open connection pool for the database.
+    """
+    pool = _pools.get(connection_details)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(connection_details)
+        if pool is None:
+            pool = _create_pool(connection_details)
+            _pools[connection_details] = pool
+        return pool
+
+
+def configure_pool(connection_details: str, min_size: Optional[int] = None, max_size: Optional[int] = None,
+                   max_idle: Optional[float] = None, timeout: Optional[float] = None) -> ConnectionPool:
+    """
+    Replaces the shared pool for the given connection details with one using the given settings.
+
+    Settings that are not provided fall back to the values in src.config.
+
+    Args:
+        connection_details (str): The connection details for the database.
+        min_size (Optional[int]): The number of connections the pool keeps open at all times.
+        max_size (Optional[int]): The maximum number of connections the pool may open.
+        max_idle (Optional[float]): Seconds an idle connection above min_size is kept before being closed.
+        timeout (Optional[float]): Seconds a caller waits for a connection before failing.
+
+    Returns:
+        ConnectionPool: The newly opened connection pool.
+    """
+    pool = _create_pool(connection_details, min_size, max_size, max_idle, timeout)
+    with _pools_lock:
+        old_pool = _pools.get(connection_details)
+        _pools[connection_details] = pool
+    if old_pool is not None:
+        old_pool.close()
+    return pool
+
+
+def get_pool_metrics(connection_details: str) -> Dict[str, Any]:
+    """
+    Returns wait time and saturation metrics for the shared pool of the given connection details.
+
+    Args:
+        connection_details (str): The connection details for the database.
+
+    Returns:
+        Dict[str, Any]: The raw pool statistics, plus 'requests_wait_ms_avg' (average time a caller waited
+            for a connection) and 'saturation' (fraction of max_size currently lent out).
+    """
+    pool = get_pool(connection_details)
+    stats: Dict[str, Any] = dict(pool.get_stats())
+    requests_num = stats.get('requests_num', 0)
+    in_use = stats.get('pool_size', 0) - stats.get('pool_available', 0)
+    stats['requests_wait_ms_avg'] = stats.get('requests_wait_ms', 0) / requests_num if requests_num else 0.0
+    stats['saturation'] = in_use / pool.max_size if pool.max_size else 0.0
+    return stats
+
+
+def close_pools() -> None:
+    """
+    Closes every shared pool and forgets them, so the next get_pool call opens a new one.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def configure_replicas(connection_details: str, replicas: Sequence[str]) -> None:
+    """
+    Sets the read replicas of a primary database. Reads that may tolerate replication lag, see
+    read_connection_for, are then spread over them; an empty sequence sends every read to the primary again.
+
+    The routing is shared by the whole process, so call this once at application startup, not per facade
+    or request. The replicas of config.settings.db_config default to config.settings.db_replicas.
+
+    Args:
+        connection_details (str): The connection details of the primary, as the DAOs are built with.
+        replicas (Sequence[str]): The connection details of each replica.
+    """
+    with _pools_lock:
+        _replica_sets[connection_details] = _ReplicaSet(replicas)
+
+
+def _replica_set(connection_details: str) -> Optional[_ReplicaSet]:
+    """
+    Returns the replicas of a primary, or None if it has none.
+    """
+    replica_set = _replica_sets.get(connection_details)
+    if replica_set is None and connection_details == config.settings.db_config and config.settings.db_replicas:
+        configure_replicas(connection_details, config.settings.db_replicas)
+        replica_set = _replica_sets[connection_details]
+    return replica_set if replica_set is not None and replica_set.replicas else None
+
+
+def check_replicas(connection_details: str) -> Dict[str, bool]:
+    """
+    Checks that every replica of a primary accepts connections and is in recovery, i.e. still replicating,
+    marking the ones that fail down for config.settings.replica_retry_seconds and the others up again.
+
+    Args:
+        connection_details (str): The connection details of the primary.
+
+    Returns:
+        Dict[str, bool]: Whether each replica is healthy, by its connection details.
+    """
+    replica_set = _replica_set(connection_details)
+    health: Dict[str, bool] = {}
+    for replica in replica_set.replicas if replica_set else ():
+        try:
+            with get_pool(replica).connection(timeout=config.settings.replica_timeout) as connection:
+                health[replica] = connection.execute('SELECT pg_is_in_recovery();').fetchone()[0]
+        except (PoolTimeout, pg.OperationalError):
+            health[replica] = False
+        if health[replica]:
+            replica_set.mark_up(replica)
+        else:
+            replica_set.mark_down(replica)
+    return health
+
+
+def record_write(connection_details: str) -> None:
+    """
+    Notes that the current context wrote through the given primary, so read_connection_for keeps its
+    reads on the primary for the next config.settings.replica_sticky_seconds.
+
+    Args:
+        connection_details (str): The connection details of the primary.
+    """
+    _last_writes.set({**(_last_writes.get() or {}), connection_details: time.monotonic()})
+
+
+def _reads_see_recent_write(connection_details: str) -> bool:
+    """
+    Tells whether the current context wrote through the given primary within config.settings.replica_sticky_seconds.
+    """
+    written_at = (_last_writes.get() or {}).get(connection_details)
+    return written_at is not None and time.monotonic() - written_at < config.settings.replica_sticky_seconds
+
+
+def _active_unit_of_work(connection_details: str) -> Optional[_UnitOfWork]:
+    """
+    Returns the unit of work open for the given connection details in the current context, if any.
+    """
+    units = _units_of_work.get()
+    return units.get(connection_details) if units else None
+
+
+def in_unit_of_work(connection_details: str) -> bool:
+    """
+    Tells whether a unit of work is open for the given connection details in the current context.
+
+    Args:
+        connection_details (str): The connection details for the database.
+
+    Returns:
+        bool: True if statements for these connection details currently join an open transaction.
+    """
+    unit = _active_unit_of_work(connection_details)
+    return unit is not None and (not unit.bound or unit.depth > 0)
+
+
+@contextmanager
+def unit_of_work(connection_details: str) -> Iterator[pg.Connection]:
+    """
+    Runs every DAO statement for the given connection details inside the block on one pooled connection
+    and in one transaction, which commits when the block ends and rolls back if it raises.
+
+    Nested units of work join the outer one through a savepoint.
+
+    Args:
+        connection_details (str): The connection details for the database.
+
+    Yields:
+        pg.Connection: The connection shared by the unit of work.
+    """
+    unit = _active_unit_of_work(connection_details)
+    if unit is not None:
+        unit.depth += 1
+        try:
+            with unit.connection.transaction():
+                yield unit.connection
+        except BaseException:
+            if unit.bound and unit.depth == 1:
+                unit.after_commit.clear()
+            raise
+        finally:
+            unit.depth -= 1
+        if unit.bound and unit.depth == 0:
+            callbacks, unit.after_commit = unit.after_commit, []
+            for callback in callbacks:
+                callback()
+        return
+
+    with get_pool(connection_details).connection() as connection:
+        unit = _UnitOfWork(connection)
+        token = _units_of_work.set({**(_units_of_work.get() or {}), connection_details: unit})
+        try:
+            with connection.transaction():
+                yield connection
+        finally:
+            _units_of_work.reset(token)
+    record_write(connection_details)
+    for callback in unit.after_commit:
+        callback()
+
+
+@contextmanager
+def connection_for(connection_details: str) -> Iterator[pg.Connection]:
+    """
+    Yields the connection of the open unit of work for the given connection details, or borrows a pooled
+    connection whose transaction commits when the block ends.
+
+    On a connection handed over with bind_connection, a block outside any unit of work runs in a savepoint
+    instead, so it succeeds or fails on its own as it would on a pooled connection.
+
+    Args:
+        connection_details (str): The connection details for the database.
+
+    Yields:
+        pg.Connection: The connection to run statements on.
+    """
+    unit = _active_unit_of_work(connection_details)
+    if unit is not None and unit.bound and unit.depth == 0:
+        with unit.connection.transaction():
+            yield unit.connection
+        return
+    if unit is not None:
+        yield unit.connection
+        return
+    with get_pool(connection_details).connection() as connection:
+        yield connection
+
+
+@contextmanager
+def read_connection_for(connection_details: str) -> Iterator[pg.Connection]:
+    """
+    Yields a connection for a read that may tolerate replication lag: a pooled connection to the next
+    healthy replica of the given primary, round robin.
+
+    Reads stay on the primary when it has no replicas, inside a unit of work, and for
+    config.settings.replica_sticky_seconds after the current context wrote, so callers read their own writes. A
+    replica that cannot hand out a connection within config.settings.replica_timeout, or fails while in use, is
+    skipped for config.settings.replica_retry_seconds; when every replica is down, reads go to the primary.
+
+    Args:
+        connection_details (str): The connection details of the primary.
+
+    Yields:
+        pg.Connection: The connection to run the read on.
+    """
+    replica_set = _replica_set(connection_details)
+    if replica_set is not None and not in_unit_of_work(connection_details) and not _reads_see_recent_write(connection_details):
+        for replica in replica_set.candidates():
+            pool = get_pool(replica)
+            try:
+                connection = pool.getconn(timeout=config.settings.replica_timeout)
+            except PoolTimeout:
+                replica_set.mark_down(replica)
+                continue
+            try:
+                with connection:
+                    yield connection
+            except pg.OperationalError:
+                replica_set.mark_down(replica)
+                raise
+            finally:
+                pool.putconn(connection)
+            return
+    with connection_for(connection_details) as connection:
+        yield connection
+
+
+def after_commit(connection_details: str, callback: Callable[[], None]) -> None:
+    """
+    Runs a callback once the open unit of work for the given connection details commits, or right away
+    if there is none.
+
+    Args:
+        connection_details (str): The connection details for the database.
+        callback (Callable[[], None]): The function to run.
+    """
+    unit = _active_unit_of_work(connection_details)
+    if unit is None or (unit.bound and unit.depth == 0):
+        callback()
+    else:
+        unit.after_commit.append(callback)
+
+
+@contextmanager
+def bind_connection(connection_details: str, connection: pg.Connection) -> Iterator[pg.Connection]:
+    """
+    Runs every DAO statement for the given connection details inside the block on the given connection
+    instead of a pooled one, leaving its transaction to the caller.
+
+    Statements outside a unit of work each run in a savepoint, and units of work run as savepoints whose
+    after-commit callbacks run when they end, so DAOs behave as they do on pooled connections. Tests use it
+    to run every statement of a test in one transaction that is rolled back afterwards.
+
+    Args:
+        connection_details (str): The connection details the DAOs are built with.
+        connection (pg.Connection): The connection to run their statements on, inside an open transaction.
+
+    Yields:
+        pg.Connection: The given connection.
+    """
+    token = _units_of_work.set({**(_units_of_work.get() or {}), connection_details: _UnitOfWork(connection, bound=True)})
+    try:
+        yield connection
+    finally:
+        _units_of_work.reset(token)
+
+
+async def get_async_pool(connection_details: str) -> AsyncConnectionPool:
+    """
+    Returns the shared asynchronous connection pool for the given connection details on the running event loop.
+
+    Async pools are bound to the event loop that opened them, so each loop gets its own pool. A pool is opened
+    once, when it is created, and closed by close_async_pools or, failing that, when its loop shuts down and
+    cancels its remaining tasks.
+
+    Args:
+        connection_details (str): The connection details for the database.
+
+    Returns:
+        AsyncConnectionPool: The open asynchronous connection pool for the database.
+    """
+    loop = asyncio.get_running_loop()
+    for stale_key in [key for key in _async_pools if key[1].is_closed()]:
+        del _async_pools[stale_key]
+    key = (connection_details, loop)
+    if key not in _async_pools:
+        opened = loop.create_future()
+        _async_pools[key] = (opened, loop.create_task(_own_async_pool(key, opened)))
+    return await asyncio.shield(_async_pools[key][0])
+
+
+async def _own_async_pool(key: Tuple[str, asyncio.AbstractEventLoop], opened: "asyncio.Future[AsyncConnectionPool]") -> None:
+    """
+    Opens an asynchronous pool and keeps it open until this task is cancelled, then closes it.
+
+    A pool that cannot be opened is forgotten, so the next get_async_pool call retries.
+    """
+    pool = AsyncConnectionPool(
+        key[0],
+        min_size=config.settings.pool_min_size,
+        max_size=config.settings.pool_max_size,
+        max_idle=config.settings.pool_max_idle,
+        timeout=config.settings.pool_timeout,
+        kwargs=_connection_kwargs(),
+        check=AsyncConnectionPool.check_connection,
+        open=False,
+    )
+    try:
+        await pool.open()
+        opened.set_result(pool)
+        await asyncio.get_running_loop().create_future()
+    except Exception as e:
+        opened.set_exception(e)
+    finally:
+        if not opened.done():
+            opened.cancel()
+        if _async_pools.get(key, (None,))[0] is opened:
+            del _async_pools[key]
+        await pool.close()
+
+
+async def close_async_pools() -> None:
+    """
+    Closes the shared asynchronous pools opened on the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _async_pools if key[1] is loop]:
+        _, owner = _async_pools.pop(key)
+        owner.cancel()
+        await asyncio.gather(owner, return_exceptions=True)
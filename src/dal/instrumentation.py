@@ -0,0 +1,320 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import FrameType
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import functools
+import logging
+import re
+import sys
+import threading
+import time
+
+from src import config
+
+
+_STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_PATTERN = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_PATTERN = re.compile(r'%s|%\(\w+\)s')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+PHASES = ('acquire', 'execute', 'fetch', 'total')
+
+
+@dataclass
+class QueryEvent:
+    """
+    The measurements of one executed statement.
+
+    Attributes:
+        query_shape (str): The statement with its parameters and literals replaced by '?'.
+        caller (str): The DAO method that ran the statement, as 'ClassName.method'.
+        acquire_ms (float): Time spent getting a connection from the pool or the unit of work.
+        execute_ms (float): Time spent sending the statement and waiting for the server.
+        fetch_ms (float): Time spent fetching the result rows.
+        row_count (int): The number of rows fetched or affected, -1 if unknown.
+        error (Optional[str]): The name of the exception raised by the statement, if any.
+        query (str): The statement as it was sent, with its placeholders.
+    """
+    query_shape: str
+    caller: str
+    acquire_ms: float
+    execute_ms: float
+    fetch_ms: float
+    row_count: int
+    error: Optional[str] = None
+    query: str = ''
+
+    @property
+    def total_ms(self) -> float:
+        return self.acquire_ms + self.execute_ms + self.fetch_ms
+
+
+QueryListener = Callable[[QueryEvent], None]
+
+_listeners: List[QueryListener] = []
+_listeners_lock = threading.Lock()
+_logger = logging.getLogger(__name__)
+
+
+def add_listener(listener: QueryListener) -> QueryListener:
+    """
+    Registers a function called with a QueryEvent after every statement run through the DAOs.
+
+    Statements are only measured in detail while at least one listener is registered.
+
+    Args:
+        listener (QueryListener): The function to call.
+
+    Returns:
+        QueryListener: The listener, so it can later be passed to remove_listener.
+    """
+    global _listeners
+    with _listeners_lock:
+        _listeners = _listeners + [listener]
+    return listener
+
+
+def remove_listener(listener: QueryListener) -> None:
+    """
+    Unregisters a listener added with add_listener.
+
+    Args:
+        listener (QueryListener): The listener to remove.
+    """
+    global _listeners
+    with _listeners_lock:
+        _listeners = [registered for registered in _listeners if registered is not listener]
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_query(query: str) -> str:
+    """
+    Returns the shape of a statement: whitespace collapsed and parameters and literals replaced by '?',
+    so executions differing only in their values are grouped together.
+    """
+    shape = _STRING_LITERAL_PATTERN.sub('?', query)
+    shape = _PLACEHOLDER_PATTERN.sub('?', shape)
+    shape = _NUMBER_LITERAL_PATTERN.sub('?', shape)
+    return _WHITESPACE_PATTERN.sub(' ', shape).strip()
+
+
+def calling_dao_method(frame: Optional[FrameType]) -> str:
+    """
+    Walks up the stack from a frame to the DAO method that ran the statement, skipping the shared base_ methods.
+
+    Returns:
+        str: 'ClassName.method', the innermost base_ method if no other DAO method is found, or 'unknown'.
+    """
+    fallback = 'unknown'
+    while frame is not None:
+        instance = frame.f_locals.get('self')
+        if instance is not None and type(instance).__module__.startswith('src.dal.DAO'):
+            name = f'{type(instance).__name__}.{frame.f_code.co_name}'
+            if not frame.f_code.co_name.startswith('base_'):
+                return name
+            if fallback == 'unknown':
+                fallback = name
+        frame = frame.f_back
+    return fallback
+
+
+class Measurement:
+    """
+    Collects the phase timestamps of one statement while it runs.
+    """
+    __slots__ = ('started', 'acquired', 'executed', 'fetched', 'row_count')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.acquired: Optional[float] = None
+        self.executed: Optional[float] = None
+        self.fetched: Optional[float] = None
+        self.row_count = -1
+
+    def mark_acquired(self) -> None:
+        self.acquired = time.perf_counter()
+
+    def mark_executed(self) -> None:
+        self.executed = time.perf_counter()
+
+    def mark_fetched(self, row_count: int) -> None:
+        self.fetched = time.perf_counter()
+        self.row_count = row_count
+
+
+@contextmanager
+def measure(query: str) -> Iterator[Measurement]:
+    """
+    Measures the statement run inside the block and reports it to every registered listener.
+
+    The caller marks the end of each phase on the yielded Measurement. Phases that were not reached,
+    because the statement failed, are reported as taking no time.
+
+    Args:
+        query (str): The statement being run.
+
+    Yields:
+        Measurement: The object collecting the phase timestamps.
+    """
+    measurement = Measurement()
+    error = None
+    try:
+        yield measurement
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        listeners = _listeners
+        if listeners:
+            ended = time.perf_counter()
+            acquired = measurement.acquired or ended
+            executed = measurement.executed or (ended if measurement.acquired else acquired)
+            fetched = measurement.fetched or (ended if measurement.executed else executed)
+            event = QueryEvent(
+                query_shape=normalize_query(query),
+                caller=calling_dao_method(sys._getframe(1)),
+                acquire_ms=(acquired - measurement.started) * 1000,
+                execute_ms=(executed - acquired) * 1000,
+                fetch_ms=(fetched - executed) * 1000,
+                row_count=measurement.row_count,
+                error=error,
+                query=query,
+            )
+            for listener in listeners:
+                try:
+                    listener(event)
+                except Exception:
+                    _logger.exception("Query listener %r failed", listener)
+
+
+class SlowQueryLog:
+    """
+    A listener logging a warning for every statement slower than a threshold.
+
+    Attributes:
+        threshold_ms (float): The total duration above which a statement is logged, in milliseconds.
+        logger (logging.Logger): The logger the warnings are written to.
+    """
+
+    def __init__(self, threshold_ms: Optional[float] = None, logger: Optional[logging.Logger] = None):
+        """
+        Initializes the SlowQueryLog.
+
+        Args:
+            threshold_ms (Optional[float]): The threshold in milliseconds, defaults to config.settings.slow_query_threshold_ms.
+            logger (Optional[logging.Logger]): The logger to write to, defaults to the 'src.dal.slow_queries' logger.
+        """
+        self.threshold_ms = threshold_ms if threshold_ms is not None else config.settings.slow_query_threshold_ms
+        self.logger = logger or logging.getLogger('src.dal.slow_queries')
+
+    def __call__(self, event: QueryEvent) -> None:
+        if event.total_ms < self.threshold_ms:
+            return
+        self.logger.warning(
+            "Slow query %.1fms in %s (acquire %.1fms, execute %.1fms, fetch %.1fms, %d rows%s): %s",
+            event.total_ms, event.caller, event.acquire_ms, event.execute_ms, event.fetch_ms, event.row_count,
+            f", {event.error}" if event.error else "", event.query_shape,
+        )
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class QueryHistograms:
+    """
+    A listener aggregating statement durations per calling DAO method and phase into histograms,
+    exportable in the Prometheus text exposition format.
+
+    Attributes:
+        buckets_ms (Tuple[float, ...]): The upper bounds of the histogram buckets, in milliseconds.
+    """
+
+    def __init__(self, buckets_ms: Optional[Sequence[float]] = None):
+        """
+        Initializes empty histograms.
+
+        Args:
+            buckets_ms (Optional[Sequence[float]]): The bucket upper bounds in milliseconds,
+                defaults to config.settings.query_histogram_buckets_ms.
+        """
+        self.buckets_ms: Tuple[float, ...] = tuple(sorted(buckets_ms or config.settings.query_histogram_buckets_ms))
+        self._durations: Dict[Tuple[str, str], List[float]] = {}
+        self._rows: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: QueryEvent) -> None:
+        durations = zip(PHASES, (event.acquire_ms, event.execute_ms, event.fetch_ms, event.total_ms))
+        with self._lock:
+            for phase, duration_ms in durations:
+                # Per bucket counts, then the sum and the count of the observations.
+                histogram = self._durations.get((event.caller, phase))
+                if histogram is None:
+                    histogram = self._durations[(event.caller, phase)] = [0.0] * (len(self.buckets_ms) + 3)
+                histogram[bisect_left(self.buckets_ms, duration_ms)] += 1
+                histogram[-2] += duration_ms
+                histogram[-1] += 1
+            if event.row_count > 0:
+                self._rows[event.caller] = self._rows.get(event.caller, 0) + event.row_count
+            if event.error:
+                self._errors[event.caller] = self._errors.get(event.caller, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Returns the count, sum and average of the durations per calling DAO method and phase.
+
+        Returns:
+            Dict[str, Dict[str, Dict[str, float]]]: The 'count', 'sum_ms' and 'avg_ms' of every phase, by caller.
+        """
+        with self._lock:
+            result: Dict[str, Dict[str, Dict[str, float]]] = {}
+            for (caller, phase), histogram in self._durations.items():
+                count, total = histogram[-1], histogram[-2]
+                result.setdefault(caller, {})[phase] = {'count': count, 'sum_ms': total, 'avg_ms': total / count}
+            return result
+
+    def to_prometheus(self, prefix: str = 'dao_query') -> str:
+        """
+        Renders the histograms and counters in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): The prefix of the metric names.
+
+        Returns:
+            str: The metrics text, ending with a newline.
+        """
+        with self._lock:
+            durations = {key: list(histogram) for key, histogram in sorted(self._durations.items())}
+            rows = dict(sorted(self._rows.items()))
+            errors = dict(sorted(self._errors.items()))
+
+        lines = [f'# HELP {prefix}_duration_seconds Time spent in each phase of the statements run by DAO methods.',
+                 f'# TYPE {prefix}_duration_seconds histogram']
+        for (caller, phase), histogram in durations.items():
+            labels = f'method="{_escape_label(caller)}",phase="{phase}"'
+            cumulative = 0.0
+            for bound, count in zip(self.buckets_ms, histogram):
+                cumulative += count
+                lines.append(f'{prefix}_duration_seconds_bucket{{{labels},le="{bound / 1000:g}"}} {cumulative:g}')
+            lines.append(f'{prefix}_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]:g}')
+            lines.append(f'{prefix}_duration_seconds_sum{{{labels}}} {histogram[-2] / 1000:g}')
+            lines.append(f'{prefix}_duration_seconds_count{{{labels}}} {histogram[-1]:g}')
+
+        lines += [f'# HELP {prefix}_rows_total Rows fetched or affected by the statements of DAO methods.',
+                  f'# TYPE {prefix}_rows_total counter']
+        lines += [f'{prefix}_rows_total{{method="{_escape_label(caller)}"}} {count}' for caller, count in rows.items()]
+        lines += [f'# HELP {prefix}_errors_total Statements of DAO methods that raised.',
+                  f'# TYPE {prefix}_errors_total counter']
+        lines += [f'{prefix}_errors_total{{method="{_escape_label(caller)}"}} {count}' for caller, count in errors.items()]
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        """
+        Drops every recorded observation.
+        """
+        with self._lock:
+            self._durations.clear()
+            self._rows.clear()
+            self._errors.clear()
@@ -0,0 +1,274 @@
+"""
+Creates and upgrades the database schema with the versioned SQL files in src/dal/migrations, and checks
+that the statements run by the DAOs are served by indexes.
+
+Usage:
+    python -m src.dal.migrate migrate --dsn "<connection details>" [--target 3]
+    python -m src.dal.migrate check --dsn "<connection details>"
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import argparse
+import os
+import re
+
+
+import psycopg as pg
+
+
+from src import config
+from src.dal.DAO import users_dao, vacations_dao
+from src.dal.DAO.base_DAO import (build_delete_query, build_exists_query, build_projection_query, build_select_by_id_query,
+                                  build_update_query)
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d{4})_(\w+)\.sql$')
+# Serializes concurrent runners, e.g. several application instances starting at once.
+MIGRATION_LOCK_ID = 7271001
+
+# Statements run by the database itself rather than by the DAOs, when a user or a vacation is deleted.
+CASCADE_QUERIES = (
+    'DELETE FROM likes WHERE user_id = %s;',
+    'DELETE FROM likes WHERE vacation_id = %s;',
+    'DELETE FROM vacation_like_counts WHERE vacation_id = %s;',
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    One versioned schema change.
+
+    Attributes:
+        version (int): The number the file name starts with; migrations are applied in this order.
+        name (str): The rest of the file name, describing the change.
+        path (str): The path of the SQL file.
+    """
+    version: int
+    name: str
+    path: str
+
+    def read(self) -> str:
+        with open(self.path, 'r', encoding='utf-8') as file:
+            return file.read()
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """
+    Lists the migration files of a directory, named NNNN_description.sql, ordered by version.
+
+    Args:
+        directory (str): The directory holding the migration files.
+
+    Returns:
+        List[Migration]: The migrations, lowest version first.
+
+    Raises:
+        ValueError: If two files share a version.
+    """
+    migrations: Dict[int, Migration] = {}
+    for file_name in os.listdir(directory):
+        match = MIGRATION_FILE_PATTERN.match(file_name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f'Migration version {version} is used by more than one file.')
+        migrations[version] = Migration(version, match.group(2), os.path.join(directory, file_name))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def applied_versions(connection: pg.Connection) -> List[int]:
+    """
+    Returns the versions already applied to the database the connection points to.
+    """
+    connection.execute('CREATE TABLE IF NOT EXISTS schema_migrations(version INT PRIMARY KEY, name TEXT NOT NULL, '
+                       'applied_at TIMESTAMPTZ NOT NULL DEFAULT now());')
+    return [row[0] for row in connection.execute('SELECT version FROM schema_migrations ORDER BY version;')]
+
+
+def migrate(connection_details: str, target: Optional[int] = None, directory: str = MIGRATIONS_DIR) -> List[int]:
+    """
+    Applies every migration not applied yet, up to the target version, each in its own transaction.
+
+    Every migration is written to be idempotent, so a database created from the initialization SQL files
+    before the migrations existed is adopted by running them all once. Concurrent runners wait on an
+    advisory lock, and a migration applied by another runner meanwhile is skipped.
+
+    Args:
+        connection_details (str): The connection details for the database.
+        target (Optional[int]): The last version to apply, or None for all of them.
+        directory (str): The directory holding the migration files.
+
+    Returns:
+        List[int]: The versions applied by this call, empty if the schema was already up to date.
+    """
+    applied: List[int] = []
+    try:
+        with pg.connect(connection_details, autocommit=True) as connection:
+            for migration in load_migrations(directory):
+                if target is not None and migration.version > target:
+                    break
+                with connection.transaction():
+                    connection.execute('SELECT pg_advisory_xact_lock(%s);', (MIGRATION_LOCK_ID,))
+                    if migration.version in applied_versions(connection):
+                        continue
+                    connection.execute(migration.read())
+                    connection.execute('INSERT INTO schema_migrations(version, name) VALUES(%s, %s);',
+                                       (migration.version, migration.name))
+                applied.append(migration.version)
+                print(f"Applied migration {migration.version:04d}_{migration.name}")
+    except pg.DatabaseError as e:
+        print(f"DatabaseError: {e}")
+        raise
+    return applied
+
+
+def query_shapes() -> List[str]:
+    """
+    Builds the statements the DAOs run for their hot lookups, keyset reads and single-record writes, plus the
+    ones cascading deletes run, with the query builders the DAOs use, so they can be explained without
+    running them.
+
+    Returns:
+        List[str]: The statements, with their placeholders.
+    """
+    users_columns = ('user_id', 'role_id', 'password')
+    vacation_columns = ('vacation_id', 'country_id', 'vacation_description', 'beginning_date', 'end_date', 'price', 'picture_file_name')
+    shapes = [
+        build_projection_query('users', users_columns, ('email',)),
+        build_exists_query('users', ('email',)),
+        build_exists_query('users', ('user_id',)),
+        build_select_by_id_query('likes', 'user_id, vacation_id', ('user_id', ' AND vacation_id')),
+        users_dao.LIKED_VACATIONS_QUERY,
+        users_dao.LIKED_AMONG_QUERY,
+        users_dao.LIKE_QUERY,
+        users_dao.UNLIKE_QUERY,
+        users_dao.UNLIKE_ALL_QUERY,
+        build_update_query('users', ('first_name',), 'user_id'),
+        build_delete_query('users', 'user_id'),
+        build_exists_query('vacations', ('vacation_id',)),
+        build_projection_query('vacations', ('price',), ('vacation_id',)),
+        vacations_dao.build_search_query(vacation_columns),
+    ]
+    shapes.extend(vacations_dao.build_search_query(vacation_columns, (name,)) for name in vacations_dao.SEARCH_CONDITIONS)
+    shapes.extend((
+        vacations_dao.build_most_liked_query(vacation_columns),
+        vacations_dao.LIKE_COUNTS_QUERY,
+        vacations_dao.UPCOMING_PER_COUNTRY_QUERY,
+        build_update_query('vacations', ('price',), 'vacation_id'),
+        build_delete_query('vacations', 'vacation_id'),
+        build_exists_query('countries', ('country_id',)),
+        build_exists_query('roles', ('role_id',)),
+    ))
+    shapes.extend(CASCADE_QUERIES)
+    return shapes
+
+
+def _numbered_placeholders(query: str) -> str:
+    """
+    Replaces the %s placeholders of a statement by $1, $2, ... so EXPLAIN can plan it without values.
+    """
+    numbers = iter(range(1, query.count('%s') + 1))
+    return re.sub(r'%s', lambda _: f'${next(numbers)}', query)
+
+
+def full_scans(plan: Dict[str, Any], leading_columns: Dict[str, str], under_limit: bool = False) -> List[str]:
+    """
+    Walks a plan in EXPLAIN's JSON format and describes every node reading a whole table or index: a
+    sequential scan, an index scan filtering every entry instead of looking them up, or an index lookup
+    on a column that is not the first of the index.
+
+    An index scan without a lookup is accepted below a Limit, where it returns the rows already ordered
+    and stops as soon as the page is full.
+
+    Args:
+        plan (Dict[str, Any]): A plan node and its children.
+        leading_columns (Dict[str, str]): The first column of every index, by index name.
+        under_limit (bool): True if the node feeds a Limit node.
+
+    Returns:
+        List[str]: One description per full scan, e.g. 'Seq Scan on likes'.
+    """
+    scans = []
+    node_type = plan['Node Type']
+    index_name = plan.get('Index Name')
+    # Expression indexes, such as the description's tsvector, have no leading column to look for.
+    leading_column = leading_columns.get(index_name)
+    if node_type == 'Seq Scan':
+        scans.append(f"Seq Scan on {plan['Relation Name']}")
+    elif index_name and 'Index Cond' not in plan:
+        if 'Filter' in plan and not under_limit:
+            scans.append(f"{node_type} filtering every entry of {index_name}")
+    elif leading_column and not re.search(rf'\b{leading_column}\b', plan['Index Cond']):
+        scans.append(f"{node_type} on {index_name} without its first column {leading_column}")
+    for child in plan.get('Plans', ()):
+        scans.extend(full_scans(child, leading_columns, node_type == 'Limit'))
+    return scans
+
+
+def find_sequential_scans(connection_details: str, queries: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """
+    Explains the generic plan of every statement and reports the ones reading a whole table.
+
+    Sequential scans are disabled while planning, so the tiny tables of a development database do not
+    hide a missing index: a table is only read whole when no index can serve the statement, either
+    sequentially or by filtering every entry of an unrelated index.
+
+    Args:
+        connection_details (str): The connection details for the database.
+        queries (Optional[List[str]]): The statements to check, defaults to query_shapes.
+
+    Returns:
+        Dict[str, List[str]]: The full scans in the plan of every flagged statement.
+    """
+    if queries is None:
+        queries = query_shapes()
+    findings: Dict[str, List[str]] = {}
+    try:
+        with pg.connect(connection_details) as connection:
+            connection.execute('SET enable_seqscan = off;')
+            leading_columns = dict(connection.execute(
+                'SELECT c.relname, a.attname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                'JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0] '
+                "WHERE c.relnamespace = 'public'::regnamespace;").fetchall())
+            for query in queries:
+                explain = f'EXPLAIN (GENERIC_PLAN, FORMAT JSON) {_numbered_placeholders(query)}'
+                scans = full_scans(connection.execute(explain).fetchone()[0][0]['Plan'], leading_columns)
+                if scans:
+                    findings[query] = scans
+    except pg.DatabaseError as e:
+        print(f"DatabaseError: {e}")
+        raise
+    return findings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the migrate or check command.
+
+    Returns:
+        int: The process exit code, 1 if the check found full scans.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=('migrate', 'check'))
+    parser.add_argument('--dsn', default=config.settings.db_config, help='connection details of the database')
+    parser.add_argument('--target', type=int, help='last migration version to apply')
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        applied = migrate(args.dsn, args.target)
+        print(f"Applied {len(applied)} migration(s)" if applied else "The schema is up to date")
+        return 0
+
+    findings = find_sequential_scans(args.dsn)
+    for query, scans in findings.items():
+        print(f"FULL SCAN {'; '.join(scans)}: {query}")
+    if not findings:
+        print("Every checked statement is served by an index")
+    return 1 if findings else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
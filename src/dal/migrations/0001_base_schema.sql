@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS roles(role_id SERIAL PRIMARY KEY, role_name VARCHAR(6) UNIQUE);
+CREATE TABLE IF NOT EXISTS users(user_id INT PRIMARY KEY, first_name VARCHAR(20), last_name VARCHAR(20), email VARCHAR(50) UNIQUE NOT NULL, password VARCHAR(255) NOT NULL, role_id INT REFERENCES roles(role_id));
+CREATE TABLE IF NOT EXISTS countries(country_id INT UNIQUE PRIMARY KEY, country_name VARCHAR(50) UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS vacations(vacation_id INT UNIQUE PRIMARY KEY, country_id INT REFERENCES countries(country_id), vacation_description TEXT, beginning_date DATE, end_date DATE, price INT, picture_file_name TEXT);
+CREATE TABLE IF NOT EXISTS likes(user_id INT REFERENCES users(user_id) ON DELETE CASCADE, vacation_id INT REFERENCES vacations(vacation_id) ON DELETE CASCADE);
+INSERT INTO roles(role_id, role_name) VALUES(1, 'admin'), (2, 'user') ON CONFLICT DO NOTHING;
+SELECT setval(pg_get_serial_sequence('roles', 'role_id'), (SELECT MAX(role_id) FROM roles));
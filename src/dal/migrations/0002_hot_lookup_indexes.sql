@@ -0,0 +1,17 @@
+-- Password hashes do not fit the original VARCHAR(20).
+ALTER TABLE users ALTER COLUMN password TYPE VARCHAR(255);
+-- Login and registration look users up by email.
+CREATE UNIQUE INDEX IF NOT EXISTS users_email_key ON users(email);
+-- Likes are looked up by (user_id, vacation_id); the primary key also makes liking twice a no-op.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conrelid = 'likes'::regclass AND contype = 'p') THEN
+        DELETE FROM likes WHERE user_id IS NULL OR vacation_id IS NULL;
+        DELETE FROM likes a USING likes b WHERE a.ctid < b.ctid AND a.user_id = b.user_id AND a.vacation_id = b.vacation_id;
+        ALTER TABLE likes ADD PRIMARY KEY (user_id, vacation_id);
+    END IF;
+END $$;
+-- Deleting a vacation cascades to its likes, and like counters are grouped by vacation.
+CREATE INDEX IF NOT EXISTS likes_vacation_id_idx ON likes(vacation_id);
+-- Listings are ordered and paged by (beginning_date, vacation_id).
+CREATE INDEX IF NOT EXISTS vacations_beginning_date_vacation_id_idx ON vacations(beginning_date, vacation_id);
@@ -0,0 +1,23 @@
+CREATE TABLE IF NOT EXISTS vacation_like_counts(vacation_id INT PRIMARY KEY REFERENCES vacations(vacation_id) ON DELETE CASCADE, like_count INT NOT NULL DEFAULT 0 CHECK (like_count >= 0));
+CREATE INDEX IF NOT EXISTS vacation_like_counts_like_count_vacation_id_idx ON vacation_like_counts(like_count DESC, vacation_id);
+CREATE OR REPLACE FUNCTION count_added_likes() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO vacation_like_counts(vacation_id, like_count)
+    SELECT vacation_id, COUNT(*) FROM added_likes GROUP BY vacation_id ORDER BY vacation_id
+    ON CONFLICT (vacation_id) DO UPDATE SET like_count = vacation_like_counts.like_count + EXCLUDED.like_count;
+    RETURN NULL;
+END $$;
+CREATE OR REPLACE FUNCTION count_removed_likes() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE vacation_like_counts SET like_count = vacation_like_counts.like_count - removed.likes
+    FROM (SELECT vacation_id, COUNT(*) AS likes FROM removed_likes GROUP BY vacation_id) AS removed
+    WHERE vacation_like_counts.vacation_id = removed.vacation_id;
+    RETURN NULL;
+END $$;
+CREATE OR REPLACE TRIGGER likes_count_added AFTER INSERT ON likes REFERENCING NEW TABLE AS added_likes FOR EACH STATEMENT EXECUTE FUNCTION count_added_likes();
+CREATE OR REPLACE TRIGGER likes_count_removed AFTER DELETE ON likes REFERENCING OLD TABLE AS removed_likes FOR EACH STATEMENT EXECUTE FUNCTION count_removed_likes();
+-- Backfill the counters from the likes already stored, blocking new likes until the counters are in place.
+LOCK TABLE likes IN SHARE MODE;
+INSERT INTO vacation_like_counts(vacation_id, like_count)
+SELECT vacation_id, COUNT(*) FROM likes GROUP BY vacation_id
+ON CONFLICT (vacation_id) DO UPDATE SET like_count = EXCLUDED.like_count;
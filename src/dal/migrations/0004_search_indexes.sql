@@ -0,0 +1,4 @@
+CREATE INDEX IF NOT EXISTS vacations_end_date_idx ON vacations(end_date);
+CREATE INDEX IF NOT EXISTS vacations_price_idx ON vacations(price);
+CREATE INDEX IF NOT EXISTS vacations_country_id_beginning_date_idx ON vacations(country_id, beginning_date, vacation_id);
+CREATE INDEX IF NOT EXISTS vacations_description_tsv_idx ON vacations USING GIN (to_tsvector('english', COALESCE(vacation_description, '')));
@@ -0,0 +1 @@
+CREATE TABLE IF NOT EXISTS import_checkpoints(source TEXT PRIMARY KEY, entity VARCHAR(20) NOT NULL, file_size BIGINT NOT NULL, rows_done BIGINT NOT NULL DEFAULT 0, imported BIGINT NOT NULL DEFAULT 0, rejected BIGINT NOT NULL DEFAULT 0, completed BOOLEAN NOT NULL DEFAULT FALSE, updated_at TIMESTAMPTZ NOT NULL DEFAULT now());
@@ -0,0 +1,45 @@
+CREATE TABLE IF NOT EXISTS vacation_day_summaries(country_id INT NOT NULL REFERENCES countries(country_id) ON DELETE CASCADE, beginning_date DATE NOT NULL, vacation_count INT NOT NULL DEFAULT 0 CHECK (vacation_count >= 0), min_price INT, PRIMARY KEY (country_id, beginning_date));
+CREATE INDEX IF NOT EXISTS vacation_day_summaries_beginning_date_idx ON vacation_day_summaries(beginning_date);
+-- Recounts the given (country, beginning date) days from the vacations. The summary rows of the days are locked
+-- first, so concurrent writers of one day take turns and each recounts after the previous one committed.
+-- Days left without vacations keep a zero row, which the full refresh removes.
+CREATE OR REPLACE FUNCTION summarize_vacation_days(country_ids INT[], beginning_dates DATE[]) RETURNS void LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO vacation_day_summaries(country_id, beginning_date)
+    SELECT DISTINCT day.country_id, day.beginning_date FROM unnest(country_ids, beginning_dates) AS day(country_id, beginning_date)
+    WHERE day.country_id IS NOT NULL AND day.beginning_date IS NOT NULL ORDER BY 1, 2
+    ON CONFLICT (country_id, beginning_date) DO NOTHING;
+    PERFORM 1 FROM vacation_day_summaries AS summary JOIN unnest(country_ids, beginning_dates) AS day(country_id, beginning_date)
+    USING (country_id, beginning_date) ORDER BY summary.country_id, summary.beginning_date FOR UPDATE OF summary;
+    UPDATE vacation_day_summaries AS summary SET vacation_count = counted.vacation_count, min_price = counted.min_price
+    FROM (SELECT day.country_id, day.beginning_date, COUNT(vacations.vacation_id) AS vacation_count, MIN(vacations.price) AS min_price
+          FROM (SELECT DISTINCT * FROM unnest(country_ids, beginning_dates) AS day(country_id, beginning_date)) AS day
+          LEFT JOIN vacations ON vacations.country_id = day.country_id AND vacations.beginning_date = day.beginning_date
+          GROUP BY day.country_id, day.beginning_date) AS counted
+    WHERE summary.country_id = counted.country_id AND summary.beginning_date = counted.beginning_date;
+END $$;
+-- The triggers aggregate both arrays in one pass over the same rows, so their elements pair up by position.
+CREATE OR REPLACE FUNCTION summarize_added_vacations() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM summarize_vacation_days(array_agg(country_id), array_agg(beginning_date)) FROM added_vacations;
+    RETURN NULL;
+END $$;
+CREATE OR REPLACE FUNCTION summarize_removed_vacations() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM summarize_vacation_days(array_agg(country_id), array_agg(beginning_date)) FROM removed_vacations;
+    RETURN NULL;
+END $$;
+CREATE OR REPLACE FUNCTION summarize_changed_vacations() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM summarize_vacation_days(array_agg(country_id), array_agg(beginning_date))
+    FROM (SELECT country_id, beginning_date FROM added_vacations UNION ALL SELECT country_id, beginning_date FROM removed_vacations) AS days;
+    RETURN NULL;
+END $$;
+CREATE OR REPLACE TRIGGER vacations_summarize_added AFTER INSERT ON vacations REFERENCING NEW TABLE AS added_vacations FOR EACH STATEMENT EXECUTE FUNCTION summarize_added_vacations();
+CREATE OR REPLACE TRIGGER vacations_summarize_removed AFTER DELETE ON vacations REFERENCING OLD TABLE AS removed_vacations FOR EACH STATEMENT EXECUTE FUNCTION summarize_removed_vacations();
+CREATE OR REPLACE TRIGGER vacations_summarize_changed AFTER UPDATE ON vacations REFERENCING NEW TABLE AS added_vacations OLD TABLE AS removed_vacations FOR EACH STATEMENT EXECUTE FUNCTION summarize_changed_vacations();
+-- Backfill the summaries from the vacations already stored, blocking vacation writes until the triggers are in place.
+LOCK TABLE vacations IN SHARE MODE;
+INSERT INTO vacation_day_summaries(country_id, beginning_date, vacation_count, min_price)
+SELECT country_id, beginning_date, COUNT(*), MIN(price) FROM vacations WHERE country_id IS NOT NULL AND beginning_date IS NOT NULL GROUP BY country_id, beginning_date
+ON CONFLICT (country_id, beginning_date) DO UPDATE SET vacation_count = EXCLUDED.vacation_count, min_price = EXCLUDED.min_price;
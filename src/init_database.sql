@@ -1,15 +1,7 @@
-﻿
-DROP SCHEMA public CASCADE;
-CREATE SCHEMA public;
-CREATE TABLE roles(role_id SERIAL PRIMARY KEY, role_name VARCHAR(6) UNIQUE);
-CREATE TABLE users(user_id INT PRIMARY KEY, first_name VARCHAR(20), last_name VARCHAR(20), email VARCHAR(50) UNIQUE NOT NULL, password VARCHAR(20) NOT NULL, role_id INT REFERENCES roles(role_id));
-CREATE TABLE countries(country_id INT UNIQUE PRIMARY KEY, country_name VARCHAR(50) UNIQUE NOT NULL);
-CREATE TABLE vacations(vacation_id INT UNIQUE PRIMARY KEY, country_id INT REFERENCES countries(country_id), vacation_description TEXT, beginning_date DATE, end_date DATE, price INT, picture_file_name TEXT);
-CREATE TABLE likes(user_id INT REFERENCES users(user_id) ON DELETE CASCADE, vacation_id INT REFERENCES vacations(vacation_id) ON DELETE CASCADE);
-INSERT INTO roles(role_name) VALUES('admin');
-INSERT INTO roles(role_name) VALUES('user');
-INSERT INTO users(user_id, first_name, last_name, email, password, role_id) VALUES(1, 'Asaf', 'Lotz', 'asaflotz@gmail.com',4567889,1);
-INSERT INTO users(user_id, first_name, last_name, email, password, role_id) VALUES(2, 'Moti', 'Luhim', 'Motiluhim@gmail.com', 23456789, 2);
+﻿-- Sample data for a new database. Create the schema first with "python -m src.dal.migrate migrate",
+-- which also adds the roles, then load this file.
+INSERT INTO users(user_id, first_name, last_name, email, password, role_id) VALUES(1, 'Asaf', 'Lotz', 'asaflotz@gmail.com', 'pbkdf2_sha256$310000$u4YiKHsc/0XEkbOCQVGZ7A==$3oU4qfQ8Yidxs7qg0PIMRo4k/ZbccrAztHoFmMgyEoI=', 1);
+INSERT INTO users(user_id, first_name, last_name, email, password, role_id) VALUES(2, 'Moti', 'Luhim', 'Motiluhim@gmail.com', 'pbkdf2_sha256$310000$pMmKqgd2vEqXFt6HM1qU5A==$QYhzsueV8qANbNFib9Hhkz8P9pILmfBjO0inSUO0Bto=', 2);
 INSERT INTO countries(country_id, country_name) VALUES(1, 'Israel');
 INSERT INTO countries(country_id, country_name) VALUES(2, 'Mexico');
 INSERT INTO countries(country_id, country_name) VALUES(3, 'USA');
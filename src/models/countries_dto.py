@@ -4,7 +4,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CountryDTO:
     country_id: str
     country_name : str
\ No newline at end of file
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+from typing import Optional
+import datetime
+
+
+@dataclass(slots=True, frozen=True)
+class CountrySummaryDTO:
+    country_id: int
+    country_name: str
+    vacation_count: int
+    min_price: Optional[int]
+    first_beginning_date: datetime.date
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True, frozen=True)
+class ImportCheckpointDTO:
+    source: str
+    entity: str
+    file_size: int
+    rows_done: int = 0
+    imported: int = 0
+    rejected: int = 0
+    completed: bool = False
@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from src.models.validation_report_dto import RowErrorDTO
+
+
+@dataclass(slots=True)
+class UpsertReportDTO:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: List[RowErrorDTO] = field(default_factory=list)
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 import datetime
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class VacationDTO:
     vacation_id: str
     country_id: str
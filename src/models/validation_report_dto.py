@@ -0,0 +1,18 @@
+from dataclasses import dataclass, field
+from typing import Any, List
+
+
+@dataclass(slots=True, frozen=True)
+class RowErrorDTO:
+    index: int
+    message: str
+
+
+@dataclass(slots=True)
+class ValidationReportDTO:
+    valid: List[Any] = field(default_factory=list)
+    errors: List[RowErrorDTO] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
@@ -0,0 +1,174 @@
+from src.bll.async_user_facade import AsyncUserFacade
+from src.bll.async_vacation_facade import AsyncVacationFacade
+from src.bll.user_facade import UserFacade, UserValidation
+from src.bll.vacation_facade import VacationFacade, VacationValidation
+from src.dal.DAO.users_dao import UsersDAO
+from src.dal.DAO.vacations_dao import VacationsDAO
+from src.dal import connection_pool
+from src.dal.connection_pool import close_async_pools, get_async_pool
+from tests.database import DB_CONFIG_TESTS, execute_sql_file
+
+
+import asyncio
+import inspect
+import sys
+import unittest
+
+
+if sys.platform == 'win32':
+    # psycopg's async connections cannot run on the default Proactor event loop.
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+
+class AsyncFacadeTests(unittest.IsolatedAsyncioTestCase):
+    """
+    Test suite for the AsyncUserFacade and AsyncVacationFacade classes.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Resets the database before the first test; the asynchronous DAOs commit on pooled connections,
+        so every test resets it again when it ends.
+        """
+        execute_sql_file()
+
+    async def asyncSetUp(self) -> None:
+        """
+        Initializes the asynchronous facades and the synchronous DAOs used for checks.
+        """
+        self.user_facade = AsyncUserFacade(DB_CONFIG_TESTS)
+        self.vacation_facade = AsyncVacationFacade(DB_CONFIG_TESTS)
+        self.user_dao = UsersDAO(DB_CONFIG_TESTS)
+        self.vacations_dao = VacationsDAO(DB_CONFIG_TESTS)
+
+    async def asyncTearDown(self) -> None:
+        """
+        Closes the asynchronous pools of this event loop and resets the database.
+        """
+        await close_async_pools()
+        execute_sql_file()
+
+    async def test_log_in_wrong_password(self) -> None:
+        """
+        Tests login with a wrong password, expecting a ValueError.
+        """
+        with self.assertRaises(ValueError) as context:
+            await self.user_facade.log_in('asaflotz@gmail.com', '45678229')
+        self.assertEqual("Wrong email or password.", str(context.exception))
+
+    async def test_concurrent_likes_and_unlikes(self) -> None:
+        """
+        Tests that concurrent likes followed by concurrent unlikes leave no likes behind.
+        """
+        await asyncio.gather(*(self.user_facade.like_vacation(2, vacation_id) for vacation_id in range(1, 13)))
+        self.assertEqual([(2, 5)], self.user_dao.likes_print_wanted_column_value_by_id(2, 5))
+
+        await asyncio.gather(*(self.user_facade.unlike_vacation(2, vacation_id) for vacation_id in range(1, 13)))
+        self.assertFalse(self.user_dao.likes_print_wanted_column_value_by_id(2, 5))
+
+    async def test_update_vacation_id_doesnt_exist(self) -> None:
+        """
+        Tests updating a vacation with a non-existent ID, expecting a ValueError.
+        """
+        with self.assertRaises(ValueError) as context:
+            await self.vacation_facade.update_vacation('100', '6', 'Vacation in Sydney', '2025-11-20', '2025-11-29', 3800)
+        self.assertEqual("Vacation with ID 100 does not exist.", str(context.exception))
+
+    async def test_print_all_vacations_by_date(self) -> None:
+        """
+        Tests that the asynchronous listing matches the synchronous one.
+        """
+        results = await self.vacation_facade.print_all_vacation_ordered_by_beginning_date()
+        self.assertEqual(self.vacations_dao.print_all('ORDER BY beginning_date'), results)
+
+    async def test_delete_vacation(self) -> None:
+        """
+        Tests deleting a vacation, then deleting it again, expecting a ValueError the second time.
+        """
+        await self.vacation_facade.delete_vacation('12')
+        self.assertFalse(self.vacations_dao.exists_by_id('12'))
+        with self.assertRaises(ValueError) as context:
+            await self.vacation_facade.delete_vacation('12')
+        self.assertEqual("Vacation with ID 12 does not exist.", str(context.exception))
+
+    async def test_single_value_update_matches_sync(self) -> None:
+        """
+        Tests that a single column given as strings is written the same way by the asynchronous and the
+        synchronous DAO, as one value rather than its characters.
+        """
+        await self.vacation_facade.vacation_dao.update('vacation_description', 'Beach week', '6')
+        self.vacations_dao.update('vacation_description', 'Beach week', '7')
+        self.assertEqual([('Beach week',)], self.vacations_dao.print_wanted_column_value_by_id('vacation_description', '6'))
+        self.assertEqual([('Beach week',)], self.vacations_dao.print_wanted_column_value_by_id('vacation_description', '7'))
+
+    async def test_async_writes_invalidate_sync_caches(self) -> None:
+        """
+        Tests that vacation updates and likes made through the asynchronous facades are seen by the cached
+        reads of the synchronous facades in the same process.
+        """
+        vacation_facade = VacationFacade(DB_CONFIG_TESTS)
+        self.assertEqual([(3800,)], vacation_facade.vacation_dao.print_wanted_column_value_by_id('price', '6'))
+        await self.vacation_facade.update_vacation('6', '6', 'Vacation in Sydney', '2025-11-20', '2025-11-29', 4100)
+        self.assertEqual([(4100,)], vacation_facade.vacation_dao.print_wanted_column_value_by_id('price', '6'))
+
+        user_facade = UserFacade(DB_CONFIG_TESTS, cache_likes=True)
+        self.assertEqual(set(), user_facade.print_liked_vacations(2, [5]))
+        await self.user_facade.like_vacation(2, 5)
+        self.assertEqual({5}, user_facade.print_liked_vacations(2, [5]))
+
+    async def test_concurrent_registrations_with_same_email(self) -> None:
+        """
+        Tests that of concurrent registrations with the same email exactly one succeeds.
+        """
+        results = await asyncio.gather(
+            *(self.user_facade.register_user(str(user_id), 'Jane', 'Smith', 'jane@example.com', 'password', '2')
+              for user_id in range(3, 8)),
+            return_exceptions=True)
+        self.assertEqual(1, results.count(None))
+        self.assertEqual({"Cannot register with an email that is already registered."},
+                         {str(result) for result in results if result is not None})
+
+    async def test_only_async_methods_are_public(self) -> None:
+        """
+        Tests that every public method of the asynchronous facades is a coroutine or a validation rule, and that
+        the synchronous facades' database methods are not inherited.
+        """
+        for facade, sync_facade, validation in ((self.vacation_facade, VacationFacade, VacationValidation),
+                                                (self.user_facade, UserFacade, UserValidation)):
+            for name in dir(sync_facade):
+                if name.startswith('_') or hasattr(validation, name):
+                    continue
+                with self.subTest(method=name):
+                    if hasattr(facade, name):
+                        self.assertTrue(inspect.iscoroutinefunction(getattr(facade, name)))
+
+        for name in ('search', 'print_vacations_page', 'print_most_liked_vacations', 'print_upcoming_per_destination',
+                     'add_vacations', 'upsert_vacations'):
+            self.assertFalse(hasattr(self.vacation_facade, name))
+        self.assertFalse(hasattr(self.user_facade, 'print_liked_vacations'))
+
+    async def test_validate_vacations_is_shared(self) -> None:
+        """
+        Tests that the asynchronous facade validates batches with the synchronous facade's rules.
+        """
+        vacations = [('20', '6', 'Vacation in Sydney', '2030-11-20', '2030-11-29', 3800, 'sydney.jpg'),
+                     ('21', '6', 'Vacation in Sydney', '2030-11-20', '2030-11-19', 3800, 'sydney.jpg')]
+        report = self.vacation_facade.validate_vacations(vacations)
+        self.assertEqual([(error.index, error.message) for error in VacationFacade(DB_CONFIG_TESTS).validate_vacations(vacations).errors],
+                         [(error.index, error.message) for error in report.errors])
+        self.assertEqual(['20'], [vacation.vacation_id for vacation in report.valid])
+
+    async def test_async_pool_is_opened_once_and_dropped_with_its_loop(self) -> None:
+        """
+        Tests that concurrent first calls share one pool, and that a pool whose event loop shut down without
+        close_async_pools is closed and forgotten.
+        """
+        pools = await asyncio.gather(*(get_async_pool(DB_CONFIG_TESTS) for _ in range(5)))
+        self.assertEqual(1, len({id(pool) for pool in pools}))
+
+        other_pool = await asyncio.to_thread(asyncio.run, get_async_pool(DB_CONFIG_TESTS))
+        self.assertIsNot(pools[0], other_pool)
+        self.assertTrue(other_pool.closed)
+        self.assertIs(pools[0], await get_async_pool(DB_CONFIG_TESTS))
+        self.assertEqual([asyncio.get_running_loop()], [loop for _, loop in connection_pool._async_pools])
@@ -0,0 +1,33 @@
+from src.dal.cache import QueryCache, estimate_size
+
+
+import unittest
+
+
+class QueryCacheTests(unittest.TestCase):
+    """
+    Test suite for the limits of the in-process query cache.
+    """
+
+    def test_update_respects_memory_budget(self) -> None:
+        """
+        Tests that a result growing through update evicts older results to stay within the memory budget,
+        and is dropped once it alone exceeds the budget.
+        """
+        small = frozenset(range(10))
+        cache = QueryCache(max_entries=10, ttl=60, max_bytes=4 * estimate_size(small))
+        for key in ('a', 'b'):
+            cache.get_or_load(key, lambda: small)
+
+        self.assertTrue(cache.update('b', lambda liked: liked | frozenset(range(10, 40))))
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], cache.max_bytes)
+        self.assertEqual((1, 1), (stats['entries'], stats['evictions']))
+
+        self.assertTrue(cache.update('b', lambda liked: liked | frozenset(range(40, 1000))))
+        self.assertEqual((0, 0), (cache.stats()['entries'], cache.stats()['bytes']))
+        self.assertEqual(small, cache.get_or_load('b', lambda: small))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+from src.bll.catalogue_transfer import CatalogueTransfer, REJECTS_SUFFIX
+from src.bll import password_hashing
+from tests.database import DB_CONFIG_TESTS, DatabaseTestCase
+
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class CatalogueTransferTests(DatabaseTestCase):
+    """
+    Test suite for the CSV and JSON Lines import and export of the catalogue.
+    """
+
+    def setUp(self) -> None:
+        """
+        Opens the test transaction and creates a temporary directory for the files.
+        """
+        super().setUp()
+        self.transfer = CatalogueTransfer(DB_CONFIG_TESTS)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _vacations(self) -> list:
+        return self.connection.execute('SELECT * FROM vacations ORDER BY vacation_id;').fetchall()
+
+    def test_export_import_round_trip(self) -> None:
+        """
+        Tests that vacations exported to CSV and to JSON Lines import back unchanged.
+        """
+        vacations = self._vacations()
+        for file_format in ('csv', 'jsonl'):
+            path = os.path.join(self.directory, f'vacations.{file_format}')
+            self.assertGreater(self.transfer.export('vacations', path), 0)
+            self.connection.execute('DELETE FROM vacations;')
+            checkpoint = self.transfer.import_file('vacations', path, batch_size=5, allow_past_dates=True)
+            self.assertEqual((len(vacations), len(vacations), 0, True),
+                             (checkpoint.rows_done, checkpoint.imported, checkpoint.rejected, checkpoint.completed))
+            self.assertEqual(vacations, self._vacations())
+
+    def test_import_rejects_invalid_rows(self) -> None:
+        """
+        Tests that invalid rows are reported in the rejects file while the valid ones are imported.
+        """
+        path = os.path.join(self.directory, 'vacations.jsonl')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({'vacation_id': 100, 'country_id': 1, 'vacation_description': 'Dead Sea',
+                                   'beginning_date': '2099-01-01', 'end_date': '2099-01-05', 'price': 900,
+                                   'picture_file_name': 'sea.jpg'}) + '\n')
+            file.write(json.dumps({'vacation_id': 101, 'country_id': 1, 'vacation_description': 'Too pricey',
+                                   'beginning_date': '2099-01-01', 'end_date': '2099-01-05', 'price': 20000,
+                                   'picture_file_name': 'gold.jpg'}) + '\n')
+            file.write('{not json\n')
+        checkpoint = self.transfer.import_file('vacations', path)
+        self.assertEqual((3, 1, 2), (checkpoint.rows_done, checkpoint.imported, checkpoint.rejected))
+        with open(path + REJECTS_SUFFIX, 'r', encoding='utf-8') as file:
+            rejects = [json.loads(line) for line in file]
+        self.assertEqual([2, 3], [reject['row'] for reject in rejects])
+        self.assertEqual('Vacation cannot be priced higher than 10,000', rejects[0]['error'])
+
+    def test_interrupted_import_resumes(self) -> None:
+        """
+        Tests that an import interrupted after a batch resumes after it, loading every row once.
+        """
+        path = os.path.join(self.directory, 'countries.csv')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('country_id,country_name\n' + ''.join(f'{100 + i},Country {i}\n' for i in range(5)))
+
+        def interrupt(checkpoint, fraction):
+            raise KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            self.transfer.import_file('countries', path, batch_size=2, progress=interrupt)
+        self.assertEqual(2, self.transfer.checkpoints_dao.print_by_source(os.path.abspath(path)).rows_done)
+
+        checkpoint = self.transfer.import_file('countries', path, batch_size=2)
+        self.assertEqual((5, 5, True), (checkpoint.rows_done, checkpoint.imported, checkpoint.completed))
+        self.assertEqual(5, self.connection.execute('SELECT COUNT(*) FROM countries WHERE country_id >= 100;').fetchone()[0])
+        self.assertEqual(checkpoint, self.transfer.import_file('countries', path))
+
+    def test_rejects_follow_committed_batches(self) -> None:
+        """
+        Tests that a resumed import drops the rejects of a batch that did not commit, and that a restarted
+        import starts a new rejects file instead of appending to the old one.
+        """
+        path = os.path.join(self.directory, 'countries.csv')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('country_id,country_name\n100,Country 0\nabc,Country 1\n102,\n103,Country 3\n')
+
+        def interrupt(checkpoint, fraction):
+            raise KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            self.transfer.import_file('countries', path, batch_size=2, progress=interrupt)
+        with open(path + REJECTS_SUFFIX, 'a', encoding='utf-8') as file:
+            file.write(json.dumps({'row': 3, 'error': 'Written by a batch that never committed.', 'record': {}}) + '\n')
+
+        def rejects():
+            with open(path + REJECTS_SUFFIX, 'r', encoding='utf-8') as file:
+                return [(reject['row'], reject['error']) for reject in map(json.loads, file)]
+        expected = [(2, 'Country ID must be a whole number.'), (3, 'All fields are required.')]
+        self.assertEqual(2, self.transfer.import_file('countries', path, batch_size=2).rejected)
+        self.assertEqual(expected, rejects())
+
+        self.connection.execute('DELETE FROM countries WHERE country_id >= 100;')
+        self.assertEqual(2, self.transfer.import_file('countries', path, batch_size=2, restart=True).rejected)
+        self.assertEqual(expected, rejects())
+
+    def test_import_users_hashes_passwords_and_rejects_admins(self) -> None:
+        """
+        Tests that imported plain text passwords are hashed, stored hashes are kept and admins are rejected.
+        """
+        stored_hash = password_hashing.hash_password('secret1', 1000)
+        path = os.path.join(self.directory, 'users.csv')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('user_id,first_name,last_name,email,password,role_id\n'
+                       '10,Dana,Cohen,dana@example.com,secret2,2\n'
+                       f'11,Noa,Levi,noa@example.com,{stored_hash},2\n'
+                       '12,Root,Admin,root@example.com,secret3,1\n')
+        checkpoint = self.transfer.import_file('users', path)
+        self.assertEqual((2, 1), (checkpoint.imported, checkpoint.rejected))
+        passwords = dict(self.connection.execute('SELECT user_id, password FROM users WHERE user_id >= 10;').fetchall())
+        self.assertTrue(password_hashing.verify_password('secret2', passwords[10]))
+        self.assertEqual(stored_hash, passwords[11])
+
+
+    def test_users_export_leaves_out_credentials(self) -> None:
+        """
+        Tests that a users export has no passwords unless credentials are asked for, and then imports back.
+        """
+        path = os.path.join(self.directory, 'users.jsonl')
+        self.transfer.export('users', path)
+        with open(path, 'r', encoding='utf-8') as file:
+            users = [json.loads(line) for line in file]
+        self.assertTrue(users)
+        self.assertFalse([user for user in users if 'password' in user])
+
+        stored = self.connection.execute("SELECT * FROM users WHERE role_id <> 1 ORDER BY user_id;").fetchall()
+        self.transfer.export('users', path, include_credentials=True)
+        self.connection.execute('DELETE FROM users WHERE role_id <> 1;')
+        checkpoint = self.transfer.import_file('users', path)
+        self.assertEqual(len(stored), checkpoint.imported)
+        self.assertEqual(stored, self.connection.execute("SELECT * FROM users WHERE role_id <> 1 ORDER BY user_id;").fetchall())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+from src import config
+from src.bll import password_hashing
+from src.dal.connection_pool import close_pools, get_pool
+from tests.database import DB_CONFIG_TESTS
+
+
+import dataclasses
+import json
+import os
+import tempfile
+import unittest
+
+
+class ConfigTests(unittest.TestCase):
+    """
+    Test suite for loading and applying the settings.
+    """
+
+    def setUp(self) -> None:
+        """
+        Remembers the current settings so each test can change them.
+        """
+        self.settings = config.settings
+
+    def tearDown(self) -> None:
+        """
+        Restores the settings and closes the pools created with the changed ones.
+        """
+        config.apply_settings(self.settings)
+        close_pools()
+
+    def test_environment_overrides_defaults(self) -> None:
+        """
+        Tests that prefixed environment variables override the defaults, converted to the setting's type.
+        """
+        settings = config.load_settings(environ={'VACATIONS_POOL_MAX_SIZE': '20',
+                                                 'VACATIONS_LIKES_CACHE_TTL': '12.5',
+                                                 'VACATIONS_QUERY_HISTOGRAM_BUCKETS_MS': '1, 5,10'})
+        self.assertEqual(20, settings.pool_max_size)
+        self.assertEqual(12.5, settings.likes_cache_ttl)
+        self.assertEqual((1.0, 5.0, 10.0), settings.query_histogram_buckets_ms)
+        self.assertEqual(config.Settings().copy_batch_size, settings.copy_batch_size)
+
+    def test_replicas_with_multi_host_connection_details(self) -> None:
+        """
+        Tests that replica connection details keep their commas, e.g. several hosts and ports, whether the list
+        is separated by semicolons or written in JSON.
+        """
+        replicas = ('host=a,b port=5432,5433 dbname=vacations', 'postgresql://c:5432,d:5433/vacations')
+        for value in (';'.join(replicas), f' {replicas[0]} ; {replicas[1]} ;', json.dumps(replicas)):
+            with self.subTest(value=value):
+                settings = config.load_settings(environ={'VACATIONS_DB_REPLICAS': value})
+                self.assertEqual(replicas, settings.db_replicas)
+
+    def test_environment_overrides_file(self) -> None:
+        """
+        Tests that a settings file overrides the defaults and the environment overrides the file.
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as file:
+            json.dump({'pool_min_size': 2, 'pool_max_size': 8, 'statement_timeout_ms': 5000}, file)
+        self.addCleanup(os.remove, file.name)
+        settings = config.load_settings(environ={'VACATIONS_CONFIG_FILE': file.name, 'VACATIONS_POOL_MAX_SIZE': '16'})
+        self.assertEqual((2, 16, 5000), (settings.pool_min_size, settings.pool_max_size, settings.statement_timeout_ms))
+
+    def test_invalid_settings(self) -> None:
+        """
+        Tests that unknown settings and values of the wrong type raise a ValueError.
+        """
+        with self.assertRaises(ValueError) as context:
+            config.load_settings(environ={'VACATIONS_POOL_MAX_SIZE': 'many'})
+        self.assertEqual("Invalid value for setting VACATIONS_POOL_MAX_SIZE: 'many'.", str(context.exception))
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as file:
+            json.dump({'pool_max_sizes': 8}, file)
+        self.addCleanup(os.remove, file.name)
+        with self.assertRaises(ValueError):
+            config.load_settings(file.name, environ={})
+
+    def test_applied_settings_reach_new_pools(self) -> None:
+        """
+        Tests that applied settings become config.settings, leaving the default constants alone, and
+        configure the pools created afterwards.
+        """
+        config.apply_settings(dataclasses.replace(self.settings, statement_timeout_ms=1234, pool_max_size=3))
+        self.assertEqual(1234, config.settings.statement_timeout_ms)
+        self.assertEqual(config.Settings().statement_timeout_ms, config.STATEMENT_TIMEOUT_MS)
+        pool = get_pool(f'{DB_CONFIG_TESTS} application_name=config_tests')
+        self.assertEqual(3, pool.max_size)
+        with pool.connection() as connection:
+            self.assertEqual('1234ms', connection.execute('SHOW statement_timeout;').fetchone()[0])
+
+
+    def test_applied_settings_reach_existing_objects(self) -> None:
+        """
+        Tests that settings applied after a module read its configuration are used from then on.
+        """
+        stored_password = password_hashing.hash_password('secret1')
+        self.assertFalse(password_hashing.needs_rehash(stored_password))
+        config.apply_settings(dataclasses.replace(self.settings, password_hash_iterations=self.settings.password_hash_iterations + 1))
+        self.assertTrue(password_hashing.needs_rehash(stored_password))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+from src.dal.cache import reset_shared_caches
+from src.dal.connection_pool import bind_connection
+from src.dal.migrate import migrate
+from src import config
+
+
+from contextlib import ExitStack, redirect_stdout
+import io
+import os
+import unittest
+
+
+import psycopg as pg
+
+
+# The test database of the loaded settings, e.g. a parallel worker's own database set in VACATIONS_DB_CONFIG_TESTS.
+DB_CONFIG_TESTS = config.settings.db_config_tests
+SEED_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'init_test_database.sql')
+
+
+def reset_database(dsn: str) -> None:
+    """
+    Drops the schema of a database, recreates it with the migrations and loads the test data.
+
+    Args:
+        dsn (str): The connection details of the database to reset.
+    """
+    with pg.connect(dsn, autocommit=True) as connection:
+        connection.execute('DROP SCHEMA public CASCADE; CREATE SCHEMA public;')
+    # The migrations report every version they apply, which would repeat for every reset.
+    with redirect_stdout(io.StringIO()):
+        migrate(dsn)
+    with open(SEED_FILE, 'r', encoding='utf-8-sig') as file:
+        sql_commands = file.read()
+    with pg.connect(dsn) as connection:
+        connection.execute(sql_commands)
+    reset_shared_caches()
+
+
+def execute_sql_file() -> None:
+    """
+    Resets the test database to the schema of the migrations and the data of the test data file.
+    """
+    reset_database(DB_CONFIG_TESTS)
+
+
+def execute_committed(query: str) -> None:
+    """
+    Runs a statement on a connection of its own and commits it, e.g. to undo what a test committed from
+    another connection.
+    """
+    with pg.connect(DB_CONFIG_TESTS, autocommit=True) as connection:
+        connection.execute(query)
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """
+    A test case running every test in one transaction on a connection shared by the whole class, rolled back
+    when the test ends, so each test starts from the data of the test data file without reloading it.
+
+    The database is reset once before the first test of the class. Every DAO built with DB_CONFIG_TESTS runs
+    its statements on the shared connection, so tests must not check their data through other connections.
+    """
+
+    connection: pg.Connection
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Resets the database and opens the connection shared by the tests of the class.
+        """
+        execute_sql_file()
+        cls.connection = pg.connect(DB_CONFIG_TESTS)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Closes the shared connection.
+        """
+        cls.connection.close()
+
+    def setUp(self) -> None:
+        """
+        Opens the transaction of the test and binds the shared connection to DB_CONFIG_TESTS. The shared caches
+        are reset when the test ends, as they may hold what it wrote before rolling back.
+        """
+        stack = ExitStack()
+        self.addCleanup(reset_shared_caches)
+        self.addCleanup(stack.close)
+        stack.enter_context(self.connection.transaction(force_rollback=True))
+        stack.enter_context(bind_connection(DB_CONFIG_TESTS, self.connection))
+
+
+class CommittedDatabaseTestCase(unittest.TestCase):
+    """
+    A test case for tests whose changes must be committed, e.g. because they use other connections or
+    change the schema. The database is reset before the first test and after every test.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Resets the database before the first test of the class.
+        """
+        execute_sql_file()
+
+    def tearDown(self) -> None:
+        """
+        Resets the database after each test.
+        """
+        execute_sql_file()
@@ -0,0 +1,100 @@
+from src.dal import migrate
+from tests.database import DB_CONFIG_TESTS, CommittedDatabaseTestCase
+
+
+import unittest
+
+
+import psycopg as pg
+from psycopg.conninfo import make_conninfo
+
+
+# The schema and some data of a database created before the migrations existed, likes liked twice included.
+LEGACY_DATABASE = """
+DROP SCHEMA public CASCADE;
+CREATE SCHEMA public;
+CREATE TABLE roles(role_id SERIAL PRIMARY KEY, role_name VARCHAR(6) UNIQUE);
+CREATE TABLE users(user_id INT PRIMARY KEY, first_name VARCHAR(20), last_name VARCHAR(20), email VARCHAR(50) UNIQUE NOT NULL, password VARCHAR(20) NOT NULL, role_id INT REFERENCES roles(role_id));
+CREATE TABLE countries(country_id INT UNIQUE PRIMARY KEY, country_name VARCHAR(50) UNIQUE NOT NULL);
+CREATE TABLE vacations(vacation_id INT UNIQUE PRIMARY KEY, country_id INT REFERENCES countries(country_id), vacation_description TEXT, beginning_date DATE, end_date DATE, price INT, picture_file_name TEXT);
+CREATE TABLE likes(user_id INT REFERENCES users(user_id) ON DELETE CASCADE, vacation_id INT REFERENCES vacations(vacation_id) ON DELETE CASCADE);
+INSERT INTO roles(role_name) VALUES('admin'), ('user');
+INSERT INTO users VALUES(1, 'Asaf', 'Lotz', 'asaflotz@gmail.com', '4567889', 1);
+INSERT INTO countries VALUES(1, 'Israel'), (2, 'Mexico');
+INSERT INTO vacations VALUES(1, 1, 'Tel Aviv', '2030-09-01', '2030-09-10', 2500, 'tel_aviv.jpg'),
+                            (2, 2, 'Cancun', '2030-09-20', '2030-09-27', 3000, 'cancun.jpg');
+INSERT INTO likes VALUES(1, 1), (1, 1), (1, 2);
+"""
+
+
+class MigrationsTests(CommittedDatabaseTestCase):
+    """
+    Test suite for the schema migration runner and the query plan check.
+    """
+
+    def test_migrate_empty_database(self) -> None:
+        """
+        Tests that an empty database gets every migration, and that running them again applies nothing.
+        """
+        with pg.connect(DB_CONFIG_TESTS) as connection:
+            connection.execute('DROP SCHEMA public CASCADE; CREATE SCHEMA public;')
+        versions = [migration.version for migration in migrate.load_migrations()]
+        self.assertEqual(versions, migrate.migrate(DB_CONFIG_TESTS))
+        self.assertEqual([], migrate.migrate(DB_CONFIG_TESTS))
+        with pg.connect(DB_CONFIG_TESTS) as connection:
+            indexes = {row[0] for row in connection.execute("SELECT indexname FROM pg_indexes WHERE schemaname = 'public';")}
+        self.assertTrue({'users_email_key', 'likes_pkey', 'likes_vacation_id_idx',
+                         'vacations_beginning_date_vacation_id_idx'} <= indexes)
+
+    def test_migrate_up_to_target(self) -> None:
+        """
+        Tests that only the migrations up to the target version are applied.
+        """
+        with pg.connect(DB_CONFIG_TESTS) as connection:
+            connection.execute('DROP SCHEMA public CASCADE; CREATE SCHEMA public;')
+        self.assertEqual([1, 2], migrate.migrate(DB_CONFIG_TESTS, target=2))
+        self.assertEqual([3, 4], migrate.migrate(DB_CONFIG_TESTS)[:2])
+
+    def test_migrate_adopts_existing_database(self) -> None:
+        """
+        Tests that a database created before the migrations existed is adopted without losing its data, and
+        that a like stored twice is kept once.
+        """
+        with pg.connect(DB_CONFIG_TESTS) as connection:
+            connection.execute(LEGACY_DATABASE)
+        migrate.migrate(DB_CONFIG_TESTS)
+        with pg.connect(DB_CONFIG_TESTS) as connection:
+            self.assertEqual(2, connection.execute('SELECT COUNT(*) FROM likes;').fetchone()[0])
+            self.assertEqual(2, connection.execute(
+                'SELECT COALESCE(SUM(like_count), 0) FROM vacation_like_counts;').fetchone()[0])
+            self.assertEqual(*connection.execute(
+                'SELECT (SELECT COUNT(*) FROM vacations), (SELECT SUM(vacation_count) FROM vacation_day_summaries);').fetchone())
+
+    def test_check_finds_no_sequential_scans(self) -> None:
+        """
+        Tests that every hot DAO statement is served by an index.
+        """
+        self.assertEqual({}, migrate.find_sequential_scans(DB_CONFIG_TESTS))
+
+    def test_check_only_explains_statements(self) -> None:
+        """
+        Tests that the check explains the DAO writes without running them, so it passes on a read-only connection.
+        """
+        shapes = migrate.query_shapes()
+        self.assertIn('UPDATE vacations SET price = %s WHERE vacation_id = %s RETURNING 1;', shapes)
+        self.assertIn('DELETE FROM likes WHERE user_id = %s AND vacation_id = %s RETURNING vacation_id;', shapes)
+        read_only = make_conninfo(DB_CONFIG_TESTS, options='-c default_transaction_read_only=on')
+        self.assertEqual({}, migrate.find_sequential_scans(read_only))
+
+    def test_check_flags_missing_index(self) -> None:
+        """
+        Tests that dropping an index a DAO statement needs is reported as a sequential scan.
+        """
+        with pg.connect(DB_CONFIG_TESTS) as connection:
+            connection.execute('DROP INDEX likes_vacation_id_idx;')
+        findings = migrate.find_sequential_scans(DB_CONFIG_TESTS)
+        self.assertIn('DELETE FROM likes WHERE vacation_id = %s;', findings)
+
+
+if __name__ == '__main__':
+    unittest.main()
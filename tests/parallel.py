@@ -0,0 +1,158 @@
+"""
+Runs the test suite across several processes, each against its own database on the local Postgres server.
+
+The worker databases are named after the test database with a _worker<N> suffix, created on first use and
+kept for later runs; every test class resets the schema of its database before its first test.
+
+Usage:
+    python -m tests.parallel [--workers 4] [--dsn "<test database connection details>"]
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import multiprocessing
+import os
+import time
+import traceback
+import unittest
+
+
+import psycopg as pg
+from psycopg import sql
+from psycopg.conninfo import conninfo_to_dict, make_conninfo
+
+
+DSN_VARIABLE = 'VACATIONS_DB_CONFIG_TESTS'
+
+
+def worker_dsn(dsn: str, worker: int) -> str:
+    """
+    Returns the connection details of the database of one worker.
+    """
+    return make_conninfo(dsn, dbname=f"{conninfo_to_dict(dsn)['dbname']}_worker{worker}")
+
+
+def provision_databases(dsn: str, workers: int) -> List[str]:
+    """
+    Creates the worker databases that do not exist yet.
+
+    Args:
+        dsn (str): The connection details of the test database; the workers use the same server and user.
+        workers (int): The number of workers.
+
+    Returns:
+        List[str]: The connection details of every worker database.
+    """
+    dsns = [worker_dsn(dsn, worker) for worker in range(workers)]
+    with pg.connect(make_conninfo(dsn, dbname='postgres'), autocommit=True) as connection:
+        existing = {row[0] for row in connection.execute('SELECT datname FROM pg_database;')}
+        for database in (conninfo_to_dict(worker)['dbname'] for worker in dsns):
+            if database not in existing:
+                connection.execute(sql.SQL('CREATE DATABASE {};').format(sql.Identifier(database)))
+    return dsns
+
+
+def test_ids() -> List[str]:
+    """
+    Lists the ids of every test of the suite built by tests.test_all, in suite order.
+    """
+    from tests.test_all import build_suite
+
+    def flatten(suite: unittest.TestSuite) -> List[str]:
+        ids = []
+        for test in suite:
+            ids.extend(flatten(test) if isinstance(test, unittest.TestSuite) else [test.id()])
+        return ids
+    return flatten(build_suite())
+
+
+def run_shard(dsn: str, ids: List[str]) -> Dict[str, Any]:
+    """
+    Runs some tests against one worker database. Called in a fresh process, so the test modules read the
+    worker's connection details from the environment when they are imported.
+
+    Args:
+        dsn (str): The connection details of the worker database.
+        ids (List[str]): The ids of the tests to run.
+
+    Returns:
+        Dict[str, Any]: The number of tests run and skipped, the failures and errors as (test id, traceback)
+            pairs, and the run time of the shard.
+    """
+    os.environ[DSN_VARIABLE] = dsn
+    start = time.perf_counter()
+    result = unittest.TestResult()
+    try:
+        unittest.TestLoader().loadTestsFromNames(ids).run(result)
+    except Exception:
+        result.errors.append((None, traceback.format_exc()))
+    return {
+        'tests_run': result.testsRun,
+        'skipped': len(result.skipped),
+        'failures': [(str(test), trace) for test, trace in result.failures],
+        'errors': [(str(test), trace) for test, trace in result.errors],
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def run_parallel(dsn: str, workers: int) -> Dict[str, Any]:
+    """
+    Shards the tests round robin across the workers, runs the shards in parallel and merges their results.
+
+    Round robin spreads the slow tests of one class, such as the password hashing ones, over every worker.
+
+    Args:
+        dsn (str): The connection details of the test database the worker databases are named after.
+        workers (int): The number of worker processes.
+
+    Returns:
+        Dict[str, Any]: The merged results, with the run time of every shard under 'shard_seconds'.
+    """
+    ids = test_ids()
+    workers = max(1, min(workers, len(ids)))
+    dsns = provision_databases(dsn, workers)
+    shards = [ids[worker::workers] for worker in range(workers)]
+
+    # Spawned processes import the test modules afresh, after run_shard set the worker's connection details.
+    with multiprocessing.get_context('spawn').Pool(workers, maxtasksperchild=1) as pool:
+        results = pool.starmap(run_shard, zip(dsns, shards))
+    return {
+        'tests_run': sum(result['tests_run'] for result in results),
+        'skipped': sum(result['skipped'] for result in results),
+        'failures': [failure for result in results for failure in result['failures']],
+        'errors': [error for result in results for error in result['errors']],
+        'shard_seconds': [result['seconds'] for result in results],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the suite in parallel and prints a unittest style summary.
+
+    Returns:
+        int: The process exit code, 1 if any test failed or raised.
+    """
+    from src import config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='number of worker processes')
+    parser.add_argument('--dsn', default=config.settings.db_config_tests, help='connection details of the test database')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run_parallel(args.dsn, args.workers)
+    for kind in ('failures', 'errors'):
+        for test, trace in results[kind]:
+            print('=' * 70)
+            print(f"{'FAIL' if kind == 'failures' else 'ERROR'}: {test}")
+            print('-' * 70)
+            print(trace)
+    print('-' * 70)
+    print(f"Ran {results['tests_run']} tests in {time.perf_counter() - start:.3f}s on "
+          f"{len(results['shard_seconds'])} workers (slowest shard {max(results['shard_seconds']):.3f}s)")
+    failed = len(results['failures']) + len(results['errors'])
+    print(f"FAILED (failures={len(results['failures'])}, errors={len(results['errors'])})" if failed else 'OK')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
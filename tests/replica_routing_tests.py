@@ -0,0 +1,152 @@
+from src import config
+from src.bll.user_facade import UserFacade
+from src.dal.DAO.countries_dao import CountriesDAO
+from src.dal.connection_pool import check_replicas, close_pools, configure_replicas, read_connection_for, unit_of_work
+from tests.database import DB_CONFIG_TESTS, CommittedDatabaseTestCase, reset_database
+
+
+import contextvars
+import dataclasses
+import time
+import unittest
+
+
+import psycopg as pg
+from psycopg import sql
+from psycopg.conninfo import conninfo_to_dict, make_conninfo
+
+
+# A database of the test server standing in for a replica, holding one country fewer than the primary.
+STAND_IN_REPLICA = make_conninfo(DB_CONFIG_TESTS, dbname=f"{conninfo_to_dict(DB_CONFIG_TESTS)['dbname']}_replica")
+UNREACHABLE_REPLICA = make_conninfo(DB_CONFIG_TESTS, port='1')
+
+
+def reset_stand_in_replica() -> None:
+    """
+    Creates the stand-in replica database if needed and loads it with the data of the primary but France.
+    """
+    with pg.connect(make_conninfo(DB_CONFIG_TESTS, dbname='postgres'), autocommit=True) as connection:
+        database = conninfo_to_dict(STAND_IN_REPLICA)['dbname']
+        if not connection.execute('SELECT 1 FROM pg_database WHERE datname = %s;', (database,)).fetchone():
+            connection.execute(sql.SQL('CREATE DATABASE {};').format(sql.Identifier(database)))
+    reset_database(STAND_IN_REPLICA)
+    with pg.connect(STAND_IN_REPLICA) as connection:
+        connection.execute("DELETE FROM vacations WHERE country_id = 4; DELETE FROM countries WHERE country_name = 'France';")
+
+
+def in_new_request(function, *args):
+    """
+    Runs a function in an empty context, as a new request would, so earlier writes of the test thread do
+    not keep its reads on the primary.
+    """
+    return contextvars.Context().run(function, *args)
+
+
+class ReplicaRoutingTests(CommittedDatabaseTestCase):
+    """
+    Test suite for routing reads to read replicas.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Resets the primary and the stand-in replica.
+        """
+        super().setUpClass()
+        reset_stand_in_replica()
+
+    def setUp(self) -> None:
+        """
+        Remembers the replica settings each test may shorten.
+        """
+        self.settings = config.settings
+        self.countries_dao = CountriesDAO(DB_CONFIG_TESTS)
+
+    def tearDown(self) -> None:
+        """
+        Sends reads to the primary again and closes the pools opened for the replicas.
+        """
+        configure_replicas(DB_CONFIG_TESTS, ())
+        config.apply_settings(self.settings)
+        close_pools()
+        super().tearDown()
+
+    def _country_names(self) -> set:
+        return {country.country_name for country in self.countries_dao.print_all()}
+
+    def test_reads_go_to_replicas_round_robin(self) -> None:
+        """
+        Tests that routed reads are served by the replicas, taking turns.
+        """
+        replicas = [make_conninfo(STAND_IN_REPLICA, application_name=name) for name in ('replica_a', 'replica_b')]
+        configure_replicas(DB_CONFIG_TESTS, replicas)
+        self.assertNotIn('France', in_new_request(self._country_names))
+
+        def application_name() -> str:
+            with read_connection_for(DB_CONFIG_TESTS) as connection:
+                return connection.execute('SHOW application_name;').fetchone()[0]
+        names = [in_new_request(application_name) for _ in range(4)]
+        self.assertEqual(2, len(set(names)))
+        self.assertEqual(names[:2], names[2:])
+
+    def test_writes_and_units_of_work_stay_on_primary(self) -> None:
+        """
+        Tests that reads inside a unit of work, and reads following a write, see the primary.
+        """
+        configure_replicas(DB_CONFIG_TESTS, [STAND_IN_REPLICA])
+
+        def read_in_unit_of_work() -> set:
+            with unit_of_work(DB_CONFIG_TESTS):
+                return self._country_names()
+        self.assertIn('France', in_new_request(read_in_unit_of_work))
+
+        def read_own_write() -> set:
+            self.countries_dao.add(('country_id', 'country_name'), (20, 'Peru'))
+            return self._country_names()
+        self.assertIn('Peru', in_new_request(read_own_write))
+
+    def test_failed_replica_is_skipped(self) -> None:
+        """
+        Tests that a replica refusing connections is skipped, and that reads go to the primary when no
+        replica is left.
+        """
+        config.apply_settings(dataclasses.replace(self.settings, replica_timeout=0.2))
+        configure_replicas(DB_CONFIG_TESTS, [UNREACHABLE_REPLICA, STAND_IN_REPLICA])
+        self.assertNotIn('France', in_new_request(self._country_names))
+        self.assertNotIn('France', in_new_request(self._country_names))
+
+        configure_replicas(DB_CONFIG_TESTS, [UNREACHABLE_REPLICA])
+        self.assertIn('France', in_new_request(self._country_names))
+
+    def test_check_replicas(self) -> None:
+        """
+        Tests that the health check rejects replicas that refuse connections or are not replicating.
+        """
+        config.apply_settings(dataclasses.replace(self.settings, replica_timeout=0.2))
+        configure_replicas(DB_CONFIG_TESTS, [UNREACHABLE_REPLICA, STAND_IN_REPLICA])
+        self.assertEqual({UNREACHABLE_REPLICA: False, STAND_IN_REPLICA: False}, check_replicas(DB_CONFIG_TESTS))
+        self.assertIn('France', in_new_request(self._country_names))
+
+    @unittest.skipUnless(config.settings.db_replicas_tests, 'needs streaming replicas of the test database in DB_REPLICAS_TESTS')
+    def test_streaming_replicas(self) -> None:
+        """
+        Tests login lookups against real streaming replicas: they are healthy, and a registered user can
+        log in right away on the primary and later on the replicas.
+        """
+        configure_replicas(DB_CONFIG_TESTS, config.settings.db_replicas_tests)
+        facade = UserFacade(DB_CONFIG_TESTS)
+        self.assertTrue(all(check_replicas(DB_CONFIG_TESTS).values()))
+
+        def register_and_log_in():
+            facade.register_user('30', 'Maya', 'Katz', 'maya@example.com', 'secret1', '2')
+            return facade.log_in('maya@example.com', 'secret1')
+        self.assertEqual((30, 2), in_new_request(register_and_log_in))
+
+        deadline = time.monotonic() + 10
+        while not in_new_request(facade.users_dao.print_login_by_email, 'maya@example.com') and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(30, in_new_request(facade.users_dao.print_login_by_email, 'maya@example.com').user_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
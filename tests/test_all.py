@@ -3,13 +3,30 @@
 
 from tests.vacation_facade_tests import VacationFacadeTests
 from tests.user_facade_tests import UserFacadeTests
+from tests.async_facade_tests import AsyncFacadeTests
+from tests.migrations_tests import MigrationsTests
+from tests.config_tests import ConfigTests
+from tests.catalogue_transfer_tests import CatalogueTransferTests
+from tests.replica_routing_tests import ReplicaRoutingTests
+from tests.vacation_summary_tests import VacationSummaryTests
+from tests.cache_tests import QueryCacheTests
 
 import unittest
 
-def test_all():
+def build_suite() -> unittest.TestSuite:
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
     suite.addTests(loader.loadTestsFromTestCase(VacationFacadeTests))
     suite.addTests(loader.loadTestsFromTestCase(UserFacadeTests))
+    suite.addTests(loader.loadTestsFromTestCase(AsyncFacadeTests))
+    suite.addTests(loader.loadTestsFromTestCase(MigrationsTests))
+    suite.addTests(loader.loadTestsFromTestCase(ConfigTests))
+    suite.addTests(loader.loadTestsFromTestCase(CatalogueTransferTests))
+    suite.addTests(loader.loadTestsFromTestCase(ReplicaRoutingTests))
+    suite.addTests(loader.loadTestsFromTestCase(VacationSummaryTests))
+    suite.addTests(loader.loadTestsFromTestCase(QueryCacheTests))
+    return suite
+
+def test_all():
     runner = unittest.TextTestRunner(verbosity=2)
-    runner.run(suite)
+    runner.run(build_suite())
@@ -1,56 +1,37 @@
 
 
 from src.bll.user_facade import UserFacade
+from src.dal import instrumentation
 from src.dal.DAO.users_dao import UsersDAO
-from src.config import DB_CONFIG_TESTS
+from tests.database import DB_CONFIG_TESTS, DatabaseTestCase, execute_committed
 
 
+import contextvars
+import threading
 import unittest
 
 
 import psycopg as pg
 
 
-def execute_sql_file() -> None:
-    """
-    Executes the SQL commands in the initialization file to reset the test database.
-    """
-    with open(r"src\init_test_database.sql", 'r') as file:
-        sql_commands = file.read()
-
-    with pg.connect(DB_CONFIG_TESTS) as connection:
-        with connection.cursor() as cursor:
-            for command in sql_commands.split(";"):
-                if command.strip():
-                    cursor.execute(command)
-            connection.commit()
-
-
-class UserFacadeTests(unittest.TestCase):
+class UserFacadeTests(DatabaseTestCase):
     """
     Test suite for the UserFacade class.
     """
 
     def setUp(self) -> None:
         """
-        Sets up the test environment for each test case by resetting the database and initializing the facade.
+        Sets up the test environment for each test case by opening its rolled back transaction and initializing the facade.
         """
+        super().setUp()
         self.user_facade = UserFacade(DB_CONFIG_TESTS)
         self.user_dao = UsersDAO(DB_CONFIG_TESTS)
-        execute_sql_file()
-
-    def tearDown(self) -> None:
-        """
-        Cleans up the test environment after each test case by resetting the database.
-        """
-        execute_sql_file()
 
     def test_log_in_success(self) -> None:
         """
         Tests successful login with valid credentials.
         """
-        self.user_facade.log_in('asaflotz@gmail.com', '4567889')
-        self.assertTrue(self.user_dao.print_user_by_email_and_password('asaflotz@gmail.com', '4567889'))
+        self.assertEqual((1, 1), self.user_facade.log_in('asaflotz@gmail.com', '4567889'))
 
     def test_log_in_wrong_password(self) -> None:
         """
@@ -66,10 +47,11 @@ class UserFacadeTests(unittest.TestCase):
         """
         self.user_facade.register_user('3', 'Jane', 'Smith', 'jane.smith@example.com', 'anotherPassword', '2')
 
-        results = self.user_facade.log_in('jane.smith@example.com', 'anotherPassword')
-        results = [(str(r[0]), str(r[1]), r[2], str(r[3]), str(r[4]), int(r[5])) for r in results]
+        self.assertEqual((3, 2), self.user_facade.log_in('jane.smith@example.com', 'anotherPassword'))
 
-        self.assertEqual(results, [('3', 'Jane', 'Smith', 'jane.smith@example.com', 'anotherPassword', 2)])
+        results = self.user_dao.print_wanted_column_value_by_id('first_name, last_name, email, password', '3')
+        self.assertEqual(results[0][:3], ('Jane', 'Smith', 'jane.smith@example.com'))
+        self.assertNotEqual(results[0][3], 'anotherPassword')
 
     def test_register_invalid_email(self) -> None:
         """
@@ -111,3 +93,151 @@ class UserFacadeTests(unittest.TestCase):
         with self.assertRaises(ValueError) as context:
             self.user_facade.unlike_vacation(2, 5)
         self.assertEqual('Cannot unlike a vacation that was not liked.', str(context.exception))
+
+    def test_like_vacation_twice(self) -> None:
+        """
+        Tests that liking the same vacation twice keeps a single like and reports it was already liked.
+        """
+        self.assertTrue(self.user_facade.like_vacation(1, 10))
+        self.assertFalse(self.user_facade.like_vacation(1, 10))
+        self.assertEqual(self.user_dao.likes_print_wanted_column_value_by_id(1, 10), [(1, 10)])
+
+    def test_unlike_all_vacations_of_user(self) -> None:
+        """
+        Tests removing every like of a user by unliking without a vacation ID.
+        """
+        self.user_facade.like_vacation(2, 5)
+        self.user_facade.like_vacation(2, 6)
+        self.user_facade.unlike_vacation(2, None)
+        self.assertFalse(self.user_dao.likes_print_wanted_column_value_by_id(2, 5))
+        self.assertFalse(self.user_dao.likes_print_wanted_column_value_by_id(2, 6))
+        with self.assertRaises(ValueError):
+            self.user_facade.unlike_vacation(2, None)
+
+    def test_register_user_existing_email(self) -> None:
+        """
+        Tests registering a user with an email that is already registered.
+        """
+        with self.assertRaises(Exception) as context:
+            self.user_facade.register_user('3', 'Jane', 'Smith', 'asaflotz@gmail.com', 'anotherPassword', '2')
+        self.assertEqual("Cannot register with an email that is already registered.", str(context.exception))
+
+    def test_concurrent_registration_with_same_email(self) -> None:
+        """
+        Tests that registering an email a concurrent transaction is registering reports it as registered
+        once that transaction commits.
+        """
+        self.addCleanup(execute_committed, 'DELETE FROM users WHERE user_id = 40;')
+        errors = []
+
+        def register():
+            try:
+                self.user_facade.register_user('41', 'Dana', 'Cohen', 'dana@example.com', 'secret2', '2')
+            except Exception as e:
+                errors.append(e)
+        with pg.connect(DB_CONFIG_TESTS) as registering:
+            registering.execute("INSERT INTO users (user_id, first_name, last_name, email, password, role_id) "
+                                "VALUES (40, 'Dana', 'Levi', 'dana@example.com', 'secret1', 2);")
+            thread = threading.Thread(target=contextvars.copy_context().run, args=(register,))
+            thread.start()
+            thread.join(0.3)
+            self.assertTrue(thread.is_alive())
+            registering.commit()
+            thread.join()
+        self.assertEqual(["Cannot register with an email that is already registered."], [str(error) for error in errors])
+
+    def test_unit_of_work_rolls_back_on_error(self) -> None:
+        """
+        Tests that statements run inside a unit of work are rolled back together when it raises.
+        """
+        with self.assertRaises(RuntimeError):
+            with self.user_dao.unit_of_work():
+                self.user_facade.like_vacation(1, 10)
+                self.user_facade.like_vacation(1, 11)
+                raise RuntimeError()
+        self.assertFalse(self.user_dao.likes_print_wanted_column_value_by_id(1, 10))
+        self.assertFalse(self.user_dao.likes_print_wanted_column_value_by_id(1, 11))
+
+    def test_log_in_unknown_email(self) -> None:
+        """
+        Tests login with an email that is not registered.
+        """
+        self.assertFalse(self.user_facade.log_in('nobody@example.com', '4567889'))
+
+    def test_log_in_rehashes_plain_text_password(self) -> None:
+        """
+        Tests that a legacy plain text password still logs in and is replaced by a hash.
+        """
+        self.user_dao.update(('password',), ('4567889',), '1')
+        self.assertEqual((1, 1), self.user_facade.log_in('asaflotz@gmail.com', '4567889'))
+        stored_password = self.user_dao.print_wanted_column_value_by_id('password', '1')[0][0]
+        self.assertTrue(stored_password.startswith('pbkdf2_sha256$'))
+        self.assertEqual((1, 1), self.user_facade.log_in('asaflotz@gmail.com', '4567889'))
+
+    def test_log_in_is_instrumented(self) -> None:
+        """
+        Tests that the login lookup is recorded under its DAO method and exported in Prometheus format.
+        """
+        histograms = instrumentation.add_listener(instrumentation.QueryHistograms())
+        try:
+            self.user_facade.log_in('asaflotz@gmail.com', '4567889')
+        finally:
+            instrumentation.remove_listener(histograms)
+        self.assertEqual(1, histograms.snapshot()['UsersDAO.print_login_by_email']['execute']['count'])
+        self.assertIn('dao_query_rows_total{method="UsersDAO.print_login_by_email"} 1', histograms.to_prometheus())
+
+    def test_print_liked_vacations(self) -> None:
+        """
+        Tests the batch check of which vacations a user liked.
+        """
+        self.user_facade.like_vacation(1, 10)
+        self.user_facade.like_vacation(1, 11)
+        self.user_facade.like_vacation(2, 12)
+        self.assertEqual({10, 11}, self.user_facade.print_liked_vacations(1, ['10', 11, 12, 1]))
+        self.assertEqual(set(), self.user_facade.print_liked_vacations(1, []))
+        with self.assertRaises(ValueError):
+            self.user_facade.print_liked_vacations(1, ['ten'])
+
+    def test_cached_liked_vacations_follow_likes(self) -> None:
+        """
+        Tests that the cached liked set is kept up to date by like and unlike without reloading.
+        """
+        user_facade = UserFacade(DB_CONFIG_TESTS, cache_likes=True)
+        user_facade.like_vacation(1, 10)
+        self.assertEqual({10}, user_facade.print_liked_vacations(1, [10, 11]))
+        user_facade.like_vacation(1, '11')
+        self.assertEqual({10, 11}, user_facade.print_liked_vacations(1, [10, 11]))
+        user_facade.unlike_vacation(1, 10)
+        self.assertEqual({11}, user_facade.print_liked_vacations(1, [10, 11]))
+        self.assertEqual(1, user_facade.users_dao.cache_stats()['misses'])
+
+    def test_rolled_back_likes_do_not_reach_cache(self) -> None:
+        """
+        Tests that a liked set read inside a unit of work that rolls back is not left in the cache.
+        """
+        user_facade = UserFacade(DB_CONFIG_TESTS, cache_likes=True)
+        with self.assertRaises(RuntimeError):
+            with user_facade.users_dao.unit_of_work():
+                user_facade.like_vacation(1, 10)
+                self.assertEqual({10}, user_facade.print_liked_vacations(1, [10]))
+                raise RuntimeError('roll back')
+        self.assertEqual(set(), user_facade.print_liked_vacations(1, [10]))
+        self.assertEqual(set(), user_facade.print_liked_vacations(1, [10]))
+
+    def test_validate_users_reports_every_invalid_row(self) -> None:
+        """
+        Tests that batch validation keeps the valid users and reports each invalid one by index,
+        including emails repeated within the batch.
+        """
+        report = self.user_facade.validate_users([
+            ('3', 'Jane', 'Smith', 'jane@example.com', 'password', '2'),
+            ('4', 'John', 'Smith', 'john@example', 'password', '2'),
+            {'user_id': '5', 'first_name': 'Jane', 'last_name': 'Smith', 'email': 'jane@example.com',
+             'password': 'password', 'role_id': '2'},
+            ('6', 'J4ne', 'Smith', 'jane6@example.com', 'password', '2'),
+        ])
+        self.assertEqual(['3'], [user.user_id for user in report.valid])
+        self.assertEqual([(1, 'Invalid email format'),
+                          (2, 'Cannot register with an email that is already registered.'),
+                          (3, 'Both first name and last name can contain alphabet letters only.')],
+                         [(error.index, error.message) for error in report.errors])
@@ -1,32 +1,23 @@
 
+from src.bll.user_facade import UserFacade
 
 from src.bll.vacation_facade import VacationFacade
 from src.dal.DAO.vacations_dao import VacationsDAO
-from src.config import DB_CONFIG_TESTS
+from src.models.vacations_dto import VacationDTO
+from tests.database import DB_CONFIG_TESTS, DatabaseTestCase, execute_committed
 
 
+import contextvars
+import dataclasses
+import datetime
+import threading
 import unittest
 
 
 import psycopg as pg
 
 
-def execute_sql_file() -> None:
-    """
-    Executes SQL commands from the initialization file to reset the test database.
-    This ensures a clean database state before each test case.
-    """
-    with open(r"src\init_test_database.sql", 'r') as file:
-        sql_commands = file.read()
-    with pg.connect(DB_CONFIG_TESTS) as connection:
-        with connection.cursor() as cursor:
-            for command in sql_commands.split(";"):
-                if command.strip():
-                    cursor.execute(command)
-            connection.commit()
-
-
-class VacationFacadeTests(unittest.TestCase):
+class VacationFacadeTests(DatabaseTestCase):
     """
     Test suite for the VacationFacade class, covering scenarios for adding, updating, 
     and deleting vacation records.
@@ -35,18 +26,12 @@ class VacationFacadeTests(unittest.TestCase):
     def setUp(self) -> None:
         """
         Prepares the test environment before each test.
-        This includes resetting the database and initializing the VacationFacade and VacationsDAO instances.
+        This includes opening the transaction rolled back after the test and initializing the VacationFacade
+        and VacationsDAO instances.
         """
+        super().setUp()
         self.vacation_facade = VacationFacade(DB_CONFIG_TESTS)
         self.vacations_dao = VacationsDAO(DB_CONFIG_TESTS)
-        execute_sql_file()
-
-    def tearDown(self) -> None:
-        """
-        Cleans up the test environment after each test.
-        This is done by resetting the test database.
-        """
-        execute_sql_file()
 
     def test_add_vacation_success(self) -> None:
         """
@@ -245,4 +230,372 @@ class VacationFacadeTests(unittest.TestCase):
         """
         results_1 = self.vacation_facade.print_all_vacation_ordered_by_beginning_date()
         results_2 = self.vacations_dao.print_all('ORDER BY beginning_date')
-        self.assertEqual(results_1, results_2)
\ No newline at end of file
+        self.assertEqual(results_1, results_2)
+
+    def test_add_vacations_success(self) -> None:
+        """
+        Tests adding several vacations in small batches.
+        """
+        beginning_date = datetime.date.today() + datetime.timedelta(days=30)
+        end_date = beginning_date + datetime.timedelta(days=7)
+        vacations = (
+            (str(vacation_id), "1", "Bulk vacation in Israel", str(beginning_date), str(end_date), 2000, "israel.jpg")
+            for vacation_id in range(13, 18)
+        )
+        self.assertEqual(5, self.vacation_facade.add_vacations(vacations, batch_size=2))
+        results = self.vacations_dao.print_wanted_column_value_by_id('vacation_id, beginning_date', '17')
+        self.assertEqual([(17, beginning_date)], results)
+
+    def test_add_vacations_invalid_vacation(self) -> None:
+        """
+        Tests that adding vacations stops with a ValueError at the first invalid vacation.
+        """
+        beginning_date = datetime.date.today() + datetime.timedelta(days=30)
+        vacations = [
+            {"vacation_id": "13", "country_id": "1", "vacation_description": "Bulk vacation", "beginning_date": str(beginning_date),
+             "end_date": str(beginning_date), "price": 2000, "picture_file_name": "israel.jpg"},
+            {"vacation_id": "14", "country_id": "1", "vacation_description": "Bulk vacation", "beginning_date": str(beginning_date),
+             "end_date": str(beginning_date), "price": 20000, "picture_file_name": "israel.jpg"},
+        ]
+        with self.assertRaises(ValueError) as context:
+            self.vacation_facade.add_vacations(vacations)
+        self.assertEqual(str(context.exception), "Vacation cannot be priced higher than 10,000")
+        self.assertEqual([], self.vacations_dao.print_wanted_column_value_by_id('vacation_id', '13'))
+
+    def test_copy_vacations_from_dtos(self) -> None:
+        """
+        Tests loading vacation DTOs with COPY.
+        """
+        beginning_date = datetime.date(2030, 1, 1)
+        vacations = (
+            VacationDTO(vacation_id, 2, "Copied vacation in Mexico", beginning_date, beginning_date, 1500, "cancun.jpg")
+            for vacation_id in range(100, 110)
+        )
+        self.assertEqual(10, self.vacations_dao.copy_from(vacations, batch_size=4))
+        results = self.vacations_dao.print_wanted_column_value_by_id('vacation_description', '109')
+        self.assertEqual([("Copied vacation in Mexico",)], results)
+
+    def test_print_vacations_pages(self):
+        """
+        Tests that walking every page returns all vacations in beginning date order.
+        """
+        pages = []
+        rows, cursor = self.vacation_facade.print_vacations_page(5)
+        pages.append(rows)
+        while cursor is not None:
+            rows, cursor = self.vacation_facade.print_vacations_page(5, cursor)
+            pages.append(rows)
+        self.assertEqual([5, 5, 2], [len(page) for page in pages])
+        self.assertEqual(self.vacations_dao.print_all('ORDER BY beginning_date, vacation_id'), [row for page in pages for row in page])
+
+    def test_print_vacations_page_invalid_cursor(self):
+        """
+        Tests that an invalid page cursor raises a ValueError.
+        """
+        with self.assertRaises(ValueError) as context:
+            self.vacation_facade.print_vacations_page(5, 'not-a-cursor')
+        self.assertEqual("Invalid page cursor.", str(context.exception))
+
+    def test_iter_vacations_by_date(self):
+        """
+        Tests that streaming all vacations matches printing them all ordered by beginning date.
+        """
+        results = list(self.vacation_facade.iter_vacations_ordered_by_beginning_date(batch_size=3))
+        self.assertEqual(self.vacations_dao.print_all('ORDER BY beginning_date, vacation_id'), results)
+
+    def test_cached_lookup_invalidated_by_update(self):
+        """
+        Tests that repeated lookups are served from the cache and that updating the vacation invalidates them.
+        """
+        cached_dao = self.vacation_facade.vacation_dao
+        self.assertEqual([(3800,)], cached_dao.print_wanted_column_value_by_id('price', '6'))
+        self.assertEqual([(3800,)], cached_dao.print_wanted_column_value_by_id('price', '6'))
+        self.assertEqual(1, cached_dao.cache_stats()['hits'])
+
+        self.vacation_facade.update_vacation('6', '6', 'Vacation in Sydney', '2025-11-20', '2025-11-29', 4100)
+        self.assertEqual([(4100,)], cached_dao.print_wanted_column_value_by_id('price', '6'))
+
+    def test_update_through_another_facade_invalidates_cache(self):
+        """
+        Tests that facades with the same connection details share their cache, so an update made through
+        one of them is seen by the cached reads of the other.
+        """
+        reader = VacationFacade(DB_CONFIG_TESTS)
+        self.assertEqual([(3800,)], reader.vacation_dao.print_wanted_column_value_by_id('price', '6'))
+        self.vacation_facade.update_vacation('6', '6', 'Vacation in Sydney', '2025-11-20', '2025-11-29', 4100)
+        self.assertEqual([(4100,)], reader.vacation_dao.print_wanted_column_value_by_id('price', '6'))
+
+    def test_countries_served_from_shared_cache(self):
+        """
+        Tests that the countries are served from a cache shared by the facades and invalidated by their writes,
+        and that a facade without caching always reads the database.
+        """
+        reader = VacationFacade(DB_CONFIG_TESTS)
+        self.assertIn('France', [country.country_name for country in reader.print_all_countries()])
+        reader.print_all_countries()
+        self.assertEqual(1, reader.countries_dao.cache_stats()['hits'])
+
+        self.vacation_facade.countries_dao.update(('country_name',), ('Frankreich',), '4')
+        self.assertIn('Frankreich', [country.country_name for country in reader.print_all_countries()])
+
+        uncached = VacationFacade(DB_CONFIG_TESTS, cache_reads=False)
+        self.connection.execute("UPDATE countries SET country_name = 'France' WHERE country_id = 4;")
+        self.assertIn('France', [country.country_name for country in uncached.print_all_countries()])
+        self.assertFalse(hasattr(uncached.vacation_dao, 'cache'))
+
+    def test_rolled_back_update_does_not_reach_cache(self):
+        """
+        Tests that a lookup made inside a unit of work that rolls back does not cache its uncommitted value.
+        """
+        cached_dao = self.vacation_facade.vacation_dao
+        with self.assertRaises(RuntimeError):
+            with cached_dao.unit_of_work():
+                cached_dao.update(('price',), (4100,), '6')
+                self.assertEqual([(4100,)], cached_dao.print_wanted_column_value_by_id('price', '6'))
+                raise RuntimeError('roll back')
+        self.assertEqual([(3800,)], cached_dao.print_wanted_column_value_by_id('price', '6'))
+        self.assertEqual([(3800,)], cached_dao.print_wanted_column_value_by_id('price', '6'))
+
+    def test_update_of_concurrently_deleted_vacation(self):
+        """
+        Tests that updating a vacation deleted by a concurrent transaction reports that it does not exist,
+        once that transaction commits, instead of silently updating nothing.
+        """
+        with pg.connect(DB_CONFIG_TESTS, autocommit=True) as connection:
+            connection.execute("INSERT INTO vacations (vacation_id, country_id, beginning_date, end_date, price) "
+                               "VALUES (99, 1, '2030-01-01', '2030-01-05', 1000);")
+        self.addCleanup(execute_committed, "DELETE FROM vacation_day_summaries WHERE beginning_date = '2030-01-01';")
+        errors = []
+
+        def update():
+            try:
+                self.vacation_facade.update_vacation('99', '1', 'Vacation in Eilat', '2030-01-01', '2030-01-05', 1200)
+            except ValueError as e:
+                errors.append(e)
+        with pg.connect(DB_CONFIG_TESTS) as deleting:
+            deleting.execute('DELETE FROM vacations WHERE vacation_id = 99;')
+            thread = threading.Thread(target=contextvars.copy_context().run, args=(update,))
+            thread.start()
+            thread.join(0.3)
+            self.assertTrue(thread.is_alive())
+            deleting.commit()
+            thread.join()
+        self.assertEqual(['Vacation with ID 99 does not exist.'], [str(error) for error in errors])
+
+    def test_existence_check_bypasses_cache(self):
+        """
+        Tests that the existence check of the cached DAO sees a vacation deleted by another writer.
+        """
+        cached_dao = self.vacation_facade.vacation_dao
+        self.assertTrue(cached_dao.exists_by_id('6'))
+        self.connection.execute('DELETE FROM vacations WHERE vacation_id = 6;')
+        self.assertFalse(cached_dao.exists_by_id('6'))
+        with self.assertRaises(ValueError):
+            self.vacation_facade.delete_vacation('6')
+
+    def test_exists_and_projection_by_id(self):
+        """
+        Tests the existence check and the typed projection of a vacation record.
+        """
+        dao = VacationsDAO(DB_CONFIG_TESTS)
+        self.assertTrue(dao.exists_by_id('6'))
+        self.assertFalse(dao.exists_by_id('999'))
+        projection = dao.print_projection_by_id(('country_id', 'price'), '6')
+        self.assertEqual((6, 3800), (projection.country_id, projection.price))
+        self.assertIsNone(dao.print_projection_by_id(('price',), '999'))
+
+    def test_print_all_returns_frozen_dtos(self):
+        """
+        Tests that vacation reads are mapped to immutable VacationDTOs.
+        """
+        vacations = self.vacations_dao.print_all('ORDER BY vacation_id')
+        self.assertTrue(all(isinstance(vacation, VacationDTO) for vacation in vacations))
+        self.assertEqual((6, 3800), (vacations[5].vacation_id, vacations[5].vacation_price))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            vacations[0].vacation_price = 1
+
+    def test_like_counters(self):
+        """
+        Tests that the like counters follow likes, unlikes and deleted vacations.
+        """
+        user_facade = UserFacade(DB_CONFIG_TESTS)
+        user_facade.like_vacation(1, 6)
+        user_facade.like_vacation(2, 6)
+        user_facade.like_vacation(2, 6)
+        user_facade.like_vacation(2, 12)
+        user_facade.like_vacation(1, 3)
+        self.assertEqual({6: 2, 12: 1, 3: 1, 1: 0}, self.vacation_facade.print_like_counts(['6', 12, 3, 1]))
+
+        most_liked = self.vacation_facade.print_most_liked_vacations(2)
+        self.assertEqual([(6, 2), (3, 1)], [(vacation.vacation_id, likes) for vacation, likes in most_liked])
+        self.assertEqual((6, 'Australia', 3), self.vacation_facade.print_likes_per_destination()[0])
+
+        user_facade.unlike_vacation(2, None)
+        self.vacation_facade.delete_vacation('3')
+        self.assertEqual({6: 1, 12: 0, 3: 0}, self.vacation_facade.print_like_counts([6, 12, 3]))
+
+    def test_like_counts_invalid_id(self):
+        """
+        Tests that like counts are refused for IDs that are not numbers.
+        """
+        with self.assertRaises(ValueError) as context:
+            self.vacation_facade.print_like_counts(['six'])
+        self.assertEqual('Vacation IDs must be numbers.', str(context.exception))
+
+    def test_search_filters(self):
+        """
+        Tests searching vacations by text, date range overlap, price, country and with pagination.
+        """
+        def ids(rows):
+            return [vacation.vacation_id for vacation in rows]
+
+        self.assertEqual([1, 2, 6, 8], ids(self.vacation_facade.search(text='beaches')[0]))
+        self.assertEqual([7, 8], ids(self.vacation_facade.search(date_from='2025-12-05', date_to='2025-12-20')[0]))
+        self.assertEqual([6, 12], ids(self.vacation_facade.search(country_id='6')[0]))
+        self.assertEqual([6], ids(self.vacation_facade.search(country_id='6', text='beaches', max_price=3800)[0]))
+
+        page, cursor = self.vacation_facade.search(min_price=3000, max_price=3300, page_size=2)
+        self.assertEqual([2, 5], ids(page))
+        page, cursor = self.vacation_facade.search(min_price=3000, max_price=3300, page_size=2, cursor=cursor)
+        self.assertEqual([8, 9], ids(page))
+        self.assertIsNone(cursor)
+
+    def test_search_upcoming_and_active(self):
+        """
+        Tests the upcoming only and active now filters.
+        """
+        today = datetime.date.today()
+        self.vacations_dao.add(('vacation_id', 'country_id', 'vacation_description', 'beginning_date', 'end_date', 'price', 'picture_file_name'),
+                               (13, 2, 'Upcoming vacation', today + datetime.timedelta(days=10), today + datetime.timedelta(days=20), 2000, 'a.jpg'))
+        self.vacations_dao.add(('vacation_id', 'country_id', 'vacation_description', 'beginning_date', 'end_date', 'price', 'picture_file_name'),
+                               (14, 2, 'Current vacation', today - datetime.timedelta(days=1), today + datetime.timedelta(days=1), 2000, 'b.jpg'))
+        self.assertEqual([13], [vacation.vacation_id for vacation in self.vacation_facade.search(upcoming_only=True)[0]])
+        self.assertEqual([14], [vacation.vacation_id for vacation in self.vacation_facade.search(active_now=True)[0]])
+
+    def test_search_invalid_filters(self):
+        """
+        Tests that contradictory or malformed search filters are refused.
+        """
+        with self.assertRaises(ValueError) as context:
+            self.vacation_facade.search(upcoming_only=True, active_now=True)
+        self.assertEqual('A vacation cannot be both upcoming and active now.', str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            self.vacation_facade.search(min_price=4000, max_price=3000)
+        self.assertEqual('Minimum price cannot be higher than maximum price.', str(context.exception))
+        with self.assertRaises(ValueError):
+            self.vacation_facade.search(date_from='2025-13-01')
+
+    def test_validate_vacations_reports_every_invalid_row(self):
+        """
+        Tests that batch validation keeps the valid vacations and reports each invalid one by index.
+        """
+        report = self.vacation_facade.validate_vacations([
+            ('13', '2', 'Vacation in Mexico', '2030-1-5', '2030-01-12', 1500, 'cancun.jpg'),
+            ('14', '2', 'Vacation in Mexico', '2030-02-30', '2030-03-05', 1500, 'cancun.jpg'),
+            {'vacation_id': '15', 'country_id': '2', 'vacation_description': 'Vacation in Mexico',
+             'beginning_date': '2030-01-10', 'end_date': '2030-01-12', 'price': 20000, 'picture_file_name': 'cancun.jpg'},
+            ('16', '2', 'Vacation in Mexico', '20300110', '2030-01-12', 1500, 'cancun.jpg'),
+        ])
+        self.assertFalse(report.ok)
+        self.assertEqual([datetime.date(2030, 1, 5)], [vacation.vacation_beginning_date for vacation in report.valid])
+        self.assertEqual([(1, "Invalid date format: 2030-02-30. Please use 'YYYY-MM-DD'."),
+                          (2, 'Vacation cannot be priced higher than 10,000'),
+                          (3, "Invalid date format: 20300110. Please use 'YYYY-MM-DD'.")],
+                         [(error.index, error.message) for error in report.errors])
+
+    def _ctid(self, vacation_id: int) -> str:
+        return self.connection.execute('SELECT ctid::text FROM vacations WHERE vacation_id = %s;', (vacation_id,)).fetchone()[0]
+
+    def test_upsert_vacation(self):
+        """
+        Tests that an upsert inserts a new vacation, leaves an identical one untouched and rewrites a changed one.
+        """
+        vacation = ('13', '2', 'Vacation in Cancun', '2030-01-05', '2030-01-12', 1500, 'cancun.jpg')
+        self.assertEqual(1, self.vacation_facade.upsert_vacation(*vacation).inserted)
+        ctid = self._ctid(13)
+        self.assertEqual(1, self.vacation_facade.upsert_vacation(*vacation).unchanged)
+        self.assertEqual(ctid, self._ctid(13))
+        self.assertEqual(1, self.vacation_facade.upsert_vacation(*vacation[:5], 1700, 'cancun.jpg').updated)
+        self.assertEqual(1700, self.vacations_dao.print_projection_by_id(('price',), '13').price)
+        with self.assertRaises(ValueError):
+            self.vacation_facade.upsert_vacation(*vacation[:5], 0, 'cancun.jpg')
+
+    def test_upsert_vacations_rewrites_only_changed_rows(self):
+        """
+        Tests that a bulk upsert counts inserted, updated, unchanged and invalid vacations, and that sending
+        the same catalogue again writes nothing.
+        """
+        catalogue = [(str(vacation_id), '3', f'Vacation number {vacation_id}', '2030-03-01', '2030-03-08', 1000 + vacation_id, 'usa.jpg')
+                     for vacation_id in range(100, 110)]
+        report = self.vacation_facade.upsert_vacations(catalogue, batch_size=4)
+        self.assertEqual((10, 0, 0, []), (report.inserted, report.updated, report.unchanged, report.errors))
+
+        ctids = [self._ctid(vacation_id) for vacation_id in range(100, 110)]
+        catalogue[2] = catalogue[2][:5] + (999, 'usa.jpg')
+        catalogue.append(('110', '3', 'Vacation number 110', '2030-03-01', '2030-03-08', 20000, 'usa.jpg'))
+        report = self.vacation_facade.upsert_vacations(catalogue, batch_size=4)
+        self.assertEqual((0, 1, 9), (report.inserted, report.updated, report.unchanged))
+        self.assertEqual([(10, 'Vacation cannot be priced higher than 10,000')],
+                         [(error.index, error.message) for error in report.errors])
+        self.assertEqual(ctids[:2] + ctids[3:], [self._ctid(vacation_id) for vacation_id in range(100, 110) if vacation_id != 102])
+
+    def test_upsert_vacations_repeated_in_a_batch(self):
+        """
+        Tests that a vacation repeated within one batch is written once with its last values, whether it is
+        inserted or updated.
+        """
+        def vacation(vacation_id, price):
+            return (vacation_id, '3', 'Repeated vacation', '2030-03-01', '2030-03-08', price, 'usa.jpg')
+        report = self.vacation_facade.upsert_vacations([vacation('100', 1100), vacation('101', 1200), vacation('0100', 1500)])
+        self.assertEqual((2, 0, 1, []), (report.inserted, report.updated, report.unchanged, report.errors))
+        self.assertEqual([(1500,)], self.vacations_dao.print_wanted_column_value_by_id('price', '100'))
+
+        report = self.vacation_facade.upsert_vacations([vacation('100', 1600), vacation('100', 1700)])
+        self.assertEqual((0, 1, 1), (report.inserted, report.updated, report.unchanged))
+        self.assertEqual([(1700,)], self.vacations_dao.print_wanted_column_value_by_id('price', '100'))
+
+    def _upcoming_from_vacations(self, today: datetime.date) -> list:
+        return self.connection.execute(
+            'SELECT c.country_id, c.country_name, COUNT(*)::INT, MIN(v.price), MIN(v.beginning_date) FROM vacations v '
+            'JOIN countries c USING (country_id) WHERE v.beginning_date >= %s GROUP BY c.country_id, c.country_name '
+            'ORDER BY c.country_name;', (today,)).fetchall()
+
+    def test_upcoming_per_destination_follows_writes(self):
+        """
+        Tests that the upcoming vacations per country match an aggregation of the vacations after inserts,
+        bulk loads, updates moving one or many vacations between countries and days, and deletes.
+        """
+        today = datetime.date(2025, 10, 1)
+
+        def assert_summaries_match():
+            self.assertEqual(self._upcoming_from_vacations(today),
+                             [dataclasses.astuple(summary) for summary in self.vacation_facade.print_upcoming_per_destination(today)])
+        assert_summaries_match()
+        self.vacations_dao.add(('vacation_id', 'country_id', 'beginning_date', 'end_date', 'price'), (13, 4, '2025-10-15', '2025-10-20', 1200))
+        self.vacations_dao.copy_from([VacationDTO(vacation_id, 2, 'Cancun', datetime.date(2026, 3, 1), datetime.date(2026, 3, 5), 900 + vacation_id, 'cancun.jpg')
+                                      for vacation_id in range(100, 105)])
+        assert_summaries_match()
+        self.vacations_dao.update(('country_id', 'beginning_date'), (2, '2026-03-01'), 13)
+        self.vacations_dao.update(('price',), (5000,), 100)
+        self.vacations_dao.delete_by_id(4)
+        assert_summaries_match()
+        self.connection.execute("UPDATE vacations SET country_id = 1 + vacation_id % 5, beginning_date = beginning_date + vacation_id "
+                                "WHERE vacation_id % 2 = 1;")
+        assert_summaries_match()
+        self.vacation_facade.delete_vacation(13)
+        self.connection.execute('DELETE FROM vacations WHERE country_id = 2;')
+        assert_summaries_match()
+        self.assertNotIn('Mexico', [summary.country_name for summary in self.vacation_facade.print_upcoming_per_destination(today)])
+
+    def test_refresh_destination_summaries(self):
+        """
+        Tests that a full refresh repairs summaries changed by hand, drops days left without vacations and
+        rewrites nothing when the summaries are up to date.
+        """
+        self.vacations_dao.delete_by_id(3)
+        self.connection.execute('UPDATE vacation_day_summaries SET vacation_count = 7 WHERE country_id = 1;')
+        self.assertEqual(3, self.vacation_facade.refresh_destination_summaries())
+        self.assertEqual(0, self.vacation_facade.refresh_destination_summaries())
+        self.assertEqual(self._upcoming_from_vacations(datetime.date.min),
+                         [dataclasses.astuple(summary) for summary in self.vacation_facade.print_upcoming_per_destination(datetime.date.min)])
+        self.assertEqual(0, self.connection.execute('SELECT COUNT(*) FROM vacation_day_summaries WHERE vacation_count = 0;').fetchone()[0])
@@ -0,0 +1,76 @@
+from src.bll.vacation_facade import VacationFacade
+from tests.database import DB_CONFIG_TESTS, CommittedDatabaseTestCase
+
+
+import datetime
+import threading
+import unittest
+
+
+import psycopg as pg
+
+
+class VacationSummaryTests(CommittedDatabaseTestCase):
+    """
+    Test suite for the per-country vacation summaries under concurrent writes and refreshes.
+    """
+
+    def setUp(self) -> None:
+        """
+        Initializes the VacationFacade whose summaries are read.
+        """
+        self.vacation_facade = VacationFacade(DB_CONFIG_TESTS)
+        self.today = datetime.date(2025, 1, 1)
+
+    def _summary(self, country_name: str):
+        summaries = {summary.country_name: summary for summary in self.vacation_facade.print_upcoming_per_destination(self.today)}
+        return summaries.get(country_name)
+
+    def test_concurrent_writes_to_one_day(self) -> None:
+        """
+        Tests that two transactions adding vacations to the same country and day both get counted, the
+        second one waiting for the first to commit.
+        """
+        insert = ("INSERT INTO vacations (vacation_id, country_id, beginning_date, end_date, price) "
+                  "VALUES (%s, 4, '2025-10-15', '2025-10-20', %s);")
+        with pg.connect(DB_CONFIG_TESTS) as first, pg.connect(DB_CONFIG_TESTS) as second:
+            first.execute(insert, (13, 1000))
+            thread = threading.Thread(target=lambda: (second.execute(insert, (14, 900)), second.commit()))
+            thread.start()
+            thread.join(0.3)
+            self.assertTrue(thread.is_alive())
+            first.commit()
+            thread.join()
+        summary = self._summary('France')
+        self.assertEqual((3, 900), (summary.vacation_count, summary.min_price))
+
+    def test_refresh_does_not_block_reads(self) -> None:
+        """
+        Tests that readers get the previous summaries while a full refresh is in progress, and the repaired
+        ones once it committed.
+        """
+        with pg.connect(DB_CONFIG_TESTS) as connection:
+            connection.execute('UPDATE vacation_day_summaries SET vacation_count = 0 WHERE country_id = 4;')
+        refreshed, release = threading.Event(), threading.Event()
+
+        def refresh_and_wait():
+            with self.vacation_facade.vacation_dao.unit_of_work():
+                self.assertEqual(1, self.vacation_facade.refresh_destination_summaries())
+                refreshed.set()
+                release.wait(5)
+        thread = threading.Thread(target=refresh_and_wait)
+        thread.start()
+        try:
+            self.assertTrue(refreshed.wait(5))
+            with pg.connect(DB_CONFIG_TESTS, options='-c statement_timeout=1000') as reader:
+                self.assertEqual(0, reader.execute(
+                    'SELECT SUM(vacation_count) FROM vacation_day_summaries WHERE country_id = 4;').fetchone()[0])
+            self.assertIsNone(self._summary('France'))
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(1, self._summary('France').vacation_count)
+
+
+if __name__ == '__main__':
+    unittest.main()